@@ -0,0 +1,74 @@
+"""Make user emails unique whatever their case, with an index on lower(email)
+
+Revision ID: 3b7e91d4c2a6
+Revises: fbf691c672d9
+Create Date: 2026-10-18 19:03:27.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e91d4c2a6'
+down_revision = 'fbf691c672d9'
+branch_labels = None
+depends_on = None
+
+# Emails of the users that only differ in case, the unique index can't be built
+# while they exist
+CONFLICTING_EMAILS = sa.text(
+    """
+    SELECT string_agg(email, ', ' ORDER BY email) AS emails
+    FROM "user"
+    GROUP BY lower(email)
+    HAVING count(*) > 1
+    ORDER BY lower(email)
+    """
+)
+
+
+def upgrade():
+    # Which accounts to keep is not for a migration to decide
+    conflicts = op.get_bind().execute(CONFLICTING_EMAILS).scalars().all()
+    if conflicts:
+        raise RuntimeError(
+            'Users have emails that only differ in case: '
+            + '; '.join(conflicts)
+            + '. Review them with `python -m app.merge_duplicate_users`, merge '
+            'them with its --apply option or change the emails, then run the '
+            'migration again.'
+        )
+
+    with op.get_context().autocommit_block():
+        # A build that failed, on a duplicate added meanwhile, leaves an invalid
+        # index behind
+        op.drop_index(
+            'ix_user_email_lower',
+            table_name='user',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.create_index(
+            'ix_user_email_lower',
+            'user',
+            [sa.text('lower(email)')],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_user_email', table_name='user', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_email',
+            'user',
+            ['email'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_user_email_lower', table_name='user', postgresql_concurrently=True
+        )
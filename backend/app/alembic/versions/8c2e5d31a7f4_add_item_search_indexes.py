@@ -0,0 +1,111 @@
+"""Add full-text search vector and trigram index on item
+
+The search vector is a plain column kept current by a trigger and filled in
+for existing rows in batches, no step locks the item table for long.
+
+Revision ID: 8c2e5d31a7f4
+Revises: 4f1c2a7e9b30
+Create Date: 2026-10-18 14:03:27.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5d31a7f4'
+down_revision = '4f1c2a7e9b30'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def search_vector(row):
+    return (
+        f"setweight(to_tsvector('english', coalesce({row}title, '')), 'A')"
+        f" || setweight(to_tsvector('english', coalesce({row}description, '')), 'B')"
+    )
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # A plain nullable column doesn't rewrite the item table. A generated column
+    # would, under an ACCESS EXCLUSIVE lock
+    op.add_column(
+        'item', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True)
+    )
+    op.execute(
+        f"""
+        CREATE FUNCTION set_item_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {search_vector('NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        'CREATE TRIGGER item_set_search_vector '
+        'BEFORE INSERT OR UPDATE OF title, description ON item '
+        'FOR EACH ROW EXECUTE FUNCTION set_item_search_vector()'
+    )
+
+    connection = op.get_bind()
+    with op.get_context().autocommit_block():
+        # Rows written from now on get their vector from the trigger. Fill in
+        # the others in batches walked by id, each commits on its own so rows
+        # stay locked for one batch only
+        last_id = None
+        while True:
+            statement = 'SELECT id FROM item'
+            if last_id is not None:
+                statement += ' WHERE id > :last_id'
+            statement += ' ORDER BY id LIMIT :limit'
+            ids = connection.execute(
+                sa.text(statement), {'last_id': last_id, 'limit': BATCH_SIZE}
+            ).scalars().all()
+            if not ids:
+                break
+            connection.execute(
+                sa.text(
+                    f'UPDATE item SET search_vector = {search_vector("")} '
+                    'WHERE id = ANY(:ids) AND search_vector IS NULL'
+                ),
+                {'ids': list(ids)},
+            )
+            last_id = ids[-1]
+
+        # Build without holding a write lock on a large item table
+        op.create_index(
+            'ix_item_search_vector',
+            'item',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_item_title_trgm',
+            'item',
+            ['title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_item_title_trgm', table_name='item', postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_item_search_vector', table_name='item', postgresql_concurrently=True
+        )
+    op.execute('DROP TRIGGER item_set_search_vector ON item')
+    op.execute('DROP FUNCTION set_item_search_vector()')
+    op.drop_column('item', 'search_vector')
@@ -0,0 +1,78 @@
+import uuid
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.models import BulkItemError, Item, ItemBulkUpdate, UserAuth
+
+# Columns of the item table that a bulk update can't set to null
+NOT_NULL_COLUMNS = frozenset(
+    column.name
+    for column in Item.__table__.columns  # type: ignore[attr-defined]
+    if not column.nullable
+)
+
+
+def check_bulk_size(size: int) -> None:
+    if size > settings.ITEMS_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.ITEMS_BULK_MAX_SIZE} items per request",
+        )
+
+
+def authorize_bulk_rows(
+    *,
+    ids: list[uuid.UUID],
+    owners: dict[uuid.UUID, uuid.UUID],
+    current_user: UserAuth,
+) -> tuple[list[int], list[BulkItemError]]:
+    """
+    Split the rows of a bulk request into the indexes `current_user` may change
+    and errors for the rest, `owners` maps the ids that exist to their owner.
+    """
+    allowed: list[int] = []
+    errors: list[BulkItemError] = []
+    seen: set[uuid.UUID] = set()
+    for index, id in enumerate(ids):
+        if id in seen:
+            detail = "Duplicate item in request"
+        elif id not in owners:
+            detail = "Item not found"
+        elif not current_user.is_superuser and owners[id] != current_user.id:
+            detail = "Not enough permissions"
+        else:
+            allowed.append(index)
+            seen.add(id)
+            continue
+        errors.append(BulkItemError(index=index, id=id, detail=detail))
+    return allowed, errors
+
+
+def validate_bulk_updates(
+    *, items_in: list[ItemBulkUpdate], allowed: list[int]
+) -> tuple[list[int], list[BulkItemError]]:
+    """
+    Keep the `allowed` indexes of rows the item table accepts and return errors
+    for the others, one such row would otherwise fail the UPDATE of all rows.
+    """
+    valid: list[int] = []
+    errors: list[BulkItemError] = []
+    for index in allowed:
+        item_in = items_in[index]
+        fields = item_in.model_dump(exclude_unset=True)
+        if nulls := sorted(
+            name
+            for name, value in fields.items()
+            if value is None and name in NOT_NULL_COLUMNS
+        ):
+            errors.append(
+                BulkItemError(
+                    index=index,
+                    id=item_in.id,
+                    detail=f"{', '.join(nulls)} can't be null",
+                )
+            )
+        else:
+            valid.append(index)
+    return valid, errors
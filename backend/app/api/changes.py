@@ -0,0 +1,73 @@
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import HTTPException, Response
+
+from app.api.pagination import decode_change_cursor, encode_change_cursor
+from app.api.responses import FastJSONResponse, page_response
+from app.core.config import settings
+from app.models import ItemPublic
+
+# Sorts before every id with the same timestamp
+FIRST_ID = uuid.UUID(int=0)
+# Changes sent by one response at most
+CHANGES_MAX_LIMIT = 1_000
+
+
+def sync_position(
+    *, since: datetime | None, cursor: str | None
+) -> tuple[datetime, uuid.UUID]:
+    """
+    The `(changed_at, id)` position changes are read after, from the `cursor`
+    of a previous response or from the start of `since`.
+    """
+    if cursor:
+        position = decode_change_cursor(cursor)
+    elif since:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        position = (since, FIRST_ID)
+    else:
+        raise HTTPException(status_code=400, detail="Pass since or cursor")
+    retention = timedelta(days=settings.ITEM_TOMBSTONE_RETENTION_DAYS)
+    if position[0] < datetime.now(timezone.utc) - retention:
+        raise HTTPException(
+            status_code=410,
+            detail="Deleted items are not known that far back, fetch all items",
+        )
+    return position
+
+
+def changes_response(
+    response: Response,
+    rows: Sequence[Any],
+    *,
+    position: tuple[datetime, uuid.UUID],
+    limit: int,
+) -> FastJSONResponse:
+    """
+    Send the first `limit` of `rows`, `(changed_at, id, item)` rows read with
+    a limit of `limit + 1` to know whether more follow.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        position = (rows[-1].changed_at, rows[-1].id)
+    if not has_more:
+        # A transaction that started before the last change may still commit
+        # rows with an earlier `updated_at`, the next sync reads them again
+        overlap = timedelta(seconds=settings.ITEM_CHANGES_OVERLAP_SECONDS)
+        horizon = (datetime.now(timezone.utc) - overlap, FIRST_ID)
+        position = min(position, horizon)
+    items = [item for _changed_at, _id, item in rows if item is not None]
+    deleted = [id for _changed_at, id, item in rows if item is None]
+    return page_response(
+        response,
+        items,
+        ItemPublic,
+        deleted=deleted,
+        next_cursor=encode_change_cursor(*position),
+        has_more=has_more,
+    )
@@ -1,43 +1,181 @@
-from collections.abc import Generator
+import logging
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
-import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy.exc import OperationalError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app import crud
 from app.core import security
+from app.core.cache import build_cache
 from app.core.config import settings
-from app.core.db import engine
-from app.models import TokenPayload, User
+from app.core.db import async_engine, async_replicas, engine, replicas
+from app.models import TokenPayload, User, UserAuth
+
+logger = logging.getLogger(__name__)
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Users who sent a request that may write, their reads stay on the primary
+recent_writers = build_cache(
+    prefix="recent-writers",
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
+
+
+def token_subject(request: Request) -> str | None:
+    """
+    Return the user id of the request's access token, `None` without a valid
+    one.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return str(security.decode_access_token(token).sub)
+    except (InvalidTokenError, ValidationError):
+        return None
+
+
+def note_writer(request: Request) -> None:
+    if not settings.DB_READ_YOUR_WRITES_SECONDS or request.method in SAFE_METHODS:
+        return
+    if subject := token_subject(request):
+        recent_writers.set(subject, "1")
+
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+def reads_from_primary(request: Request) -> bool:
+    if not settings.DB_READ_YOUR_WRITES_SECONDS:
+        return False
+    subject = token_subject(request)
+    return subject is not None and recent_writers.get(subject) is not None
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    # Before anything is written, so a read racing this request already goes
+    # to the primary
+    note_writer(request)
+    # Objects keep their state after a commit, so returning what was just
+    # written doesn't cost another SELECT
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    note_writer(request)
+    # Like get_db, and expiring on commit would make attribute access after it
+    # do implicit IO
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
 
+def open_replica_session() -> Session | None:
+    for replica in replicas.candidates():
+        session = Session(replica, expire_on_commit=False)
+        try:
+            # Checks out a connection, so a replica that is down fails here
+            # rather than in the middle of the route
+            session.connection()
+        except OperationalError:
+            session.close()
+            replicas.mark_down(replica)
+            logger.warning(f"Read replica {replica.url!r} is down, trying the next")
+            continue
+        return session
+    return None
+
+
+async def open_async_replica_session() -> AsyncSession | None:
+    for replica in async_replicas.candidates():
+        session = AsyncSession(replica, expire_on_commit=False)
+        try:
+            await session.connection()
+        except OperationalError:
+            await session.close()
+            async_replicas.mark_down(replica)
+            logger.warning(f"Read replica {replica.url!r} is down, trying the next")
+            continue
+        return session
+    return None
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Session for routes that only read, on a read replica unless none is up
+    or the caller wrote within `DB_READ_YOUR_WRITES_SECONDS`.
+    """
+    session = None if reads_from_primary(request) else open_replica_session()
+    with session or Session(engine, expire_on_commit=False) as read_session:
+        yield read_session
+
+
+async def get_async_read_db(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    session = (
+        None if reads_from_primary(request) else await open_async_replica_session()
+    )
+    async with session or AsyncSession(
+        async_engine, expire_on_commit=False
+    ) as read_session:
+        yield read_session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+async def get_token_payload(token: TokenDep) -> TokenPayload:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        token_data = security.decode_access_token(token)
     except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    return token_data
+
+
+TokenPayloadDep = Annotated[TokenPayload, Depends(get_token_payload)]
+
+
+def check_not_revoked(session: Session, token_data: TokenPayload) -> None:
+    if token_data.sid and crud.is_token_revoked(
+        session=session, token_id=token_data.sid
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+
+
+async def check_not_revoked_async(
+    session: AsyncSession, token_data: TokenPayload
+) -> None:
+    if token_data.sid and await crud.is_token_revoked_async(
+        session=session, token_id=token_data.sid
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+
+
+def get_current_user(session: SessionDep, token_data: TokenPayloadDep) -> User:
+    check_not_revoked(session, token_data)
     user = session.get(User, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -49,7 +187,64 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+def get_current_user_auth(session: SessionDep, token_data: TokenPayloadDep) -> UserAuth:
+    """
+    Like `get_current_user`, for routes that only need the id and flags of the
+    user, served from the user auth cache without a DB round trip on hits.
+    """
+    check_not_revoked(session, token_data)
+    user = crud.get_user_auth(session=session, user_id=str(token_data.sub))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+
+CurrentUserAuth = Annotated[UserAuth, Depends(get_current_user_auth)]
+
+
+def get_current_active_superuser(current_user: CurrentUserAuth) -> UserAuth:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="The user doesn't have enough privileges"
+        )
+    return current_user
+
+
+async def get_current_user_async(
+    session: AsyncSessionDep, token_data: TokenPayloadDep
+) -> User:
+    await check_not_revoked_async(session, token_data)
+    user = await session.get(User, token_data.sub)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
+
+
+async def get_current_user_auth_async(
+    session: AsyncSessionDep, token_data: TokenPayloadDep
+) -> UserAuth:
+    await check_not_revoked_async(session, token_data)
+    user = await crud.get_user_auth_async(session=session, user_id=str(token_data.sub))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+
+AsyncCurrentUserAuth = Annotated[UserAuth, Depends(get_current_user_auth_async)]
+
+
+async def get_current_active_superuser_async(
+    current_user: AsyncCurrentUserAuth,
+) -> UserAuth:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine, engine
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _encode_rows(
+    rows: Sequence[Sequence[Any]], columns: list[str], format: ExportFormat
+) -> str:
+    buffer = io.StringIO()
+    if format == "csv":
+        csv.writer(buffer).writerows(rows)
+    else:
+        for row in rows:
+            buffer.write(json.dumps(dict(zip(columns, row, strict=True)), default=str))
+            buffer.write("\n")
+    return buffer.getvalue()
+
+
+def _header(columns: list[str], format: ExportFormat) -> str:
+    if format != "csv":
+        return ""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue()
+
+
+def _response(
+    content: Iterator[str] | AsyncIterator[str], format: ExportFormat, name: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
+
+
+def export_response(
+    statement: Select[Any], *, format: ExportFormat, name: str
+) -> StreamingResponse:
+    """
+    Stream the rows of `statement` from a server-side cursor, only one batch of
+    `EXPORT_BATCH_SIZE` rows is held in memory at a time.
+    """
+    columns = list(statement.selected_columns.keys())
+
+    def content() -> Iterator[str]:
+        # Its own session, the request's one may be closed before the stream ends
+        with Session(engine) as session:
+            result = session.execute(
+                statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+            )
+            yield _header(columns, format)
+            for rows in result.partitions():
+                yield _encode_rows(rows, columns, format)
+
+    return _response(content(), format, name)
+
+
+def export_response_async(
+    statement: Select[Any], *, format: ExportFormat, name: str
+) -> StreamingResponse:
+    columns = list(statement.selected_columns.keys())
+
+    async def content() -> AsyncIterator[str]:
+        async with AsyncSession(async_engine) as session:
+            result = await session.stream(
+                statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+            )
+            yield _header(columns, format)
+            async for rows in result.partitions():
+                yield _encode_rows(rows, columns, format)
+
+    return _response(content(), format, name)
@@ -0,0 +1,37 @@
+import hashlib
+from collections.abc import Callable
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def cache_control(policy: str) -> Callable[[Request, Response], None]:
+    """
+    Router dependency that sends `Cache-Control: {policy}` with the responses to
+    its GET requests.
+    """
+
+    def set_cache_control(request: Request, response: Response) -> None:
+        if request.method in ("GET", "HEAD"):
+            response.headers["Cache-Control"] = policy
+
+    return set_cache_control
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Send `etag` with the response, return the 304 to send instead when the
+    client's `If-None-Match` shows it already has this version.
+    """
+    response.headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
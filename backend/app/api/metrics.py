@@ -0,0 +1,95 @@
+import hmac
+import time
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import MultiprocessStore, registry, render_prometheus
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Seconds from receiving each request to sending the end of its response.",
+    ["method", "route", "status"],
+)
+requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "Requests being handled.", ["method"]
+)
+
+metrics_store = (
+    MultiprocessStore(
+        settings.METRICS_MULTIPROCESS_DIR, flush_seconds=settings.METRICS_FLUSH_SECONDS
+    )
+    if settings.METRICS_MULTIPROCESS_DIR
+    else None
+)
+
+
+class MetricsMiddleware:
+    """
+    Time each request by the path template of the route that handled it, so
+    `/items/{id}` is one series however many items there are.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        # Stays 500 when the app fails before starting a response
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Set by the router on the scope once a route matched
+            route = getattr(scope.get("route"), "path_format", "unmatched")
+            request_duration.labels(method, route, str(status)).observe(
+                time.perf_counter() - start
+            )
+            if metrics_store and metrics_store.flush_due():
+                await run_in_threadpool(metrics_store.write, registry.collect())
+
+
+def collect_all_workers() -> dict[str, Any]:
+    collected = registry.collect()
+    if metrics_store is None:
+        return collected
+    metrics_store.write(collected)
+    return metrics_store.read()
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> PlainTextResponse:
+    """
+    Metrics of all workers in the Prometheus text format.
+    """
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not hmac.compare_digest(
+            authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+        ):
+            raise HTTPException(status_code=401, detail="Not authenticated")
+    return PlainTextResponse(
+        render_prometheus(collect_all_workers()),
+        media_type="text/plain; version=0.0.4",
+    )
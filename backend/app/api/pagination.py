@@ -0,0 +1,37 @@
+import base64
+import struct
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(last_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(last_id.bytes).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return uuid.UUID(bytes=base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_change_cursor(changed_at: datetime, last_id: uuid.UUID) -> str:
+    # Microseconds, the precision of a PostgreSQL timestamp
+    micros = (changed_at - EPOCH) // timedelta(microseconds=1)
+    data = struct.pack(">q", micros) + last_id.bytes
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_change_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = base64.urlsafe_b64decode(padded)
+        (micros,) = struct.unpack(">q", data[:8])
+        return EPOCH + timedelta(microseconds=micros), uuid.UUID(bytes=data[8:])
+    except (ValueError, struct.error, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
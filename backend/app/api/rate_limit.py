@@ -0,0 +1,53 @@
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimit, build_rate_limit_backend
+
+rate_limit_backend = build_rate_limit_backend(
+    prefix="rate-limit", maxsize=settings.RATE_LIMIT_MAX_KEYS
+)
+login_ip_limit = RateLimit(
+    name="login-ip",
+    limit=settings.LOGIN_RATE_LIMIT_PER_IP,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    backend=rate_limit_backend,
+)
+login_account_limit = RateLimit(
+    name="login-account",
+    limit=settings.LOGIN_RATE_LIMIT_PER_ACCOUNT,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    backend=rate_limit_backend,
+)
+password_recovery_ip_limit = RateLimit(
+    name="password-recovery-ip",
+    limit=settings.PASSWORD_RECOVERY_RATE_LIMIT_PER_IP,
+    window=settings.PASSWORD_RECOVERY_RATE_LIMIT_WINDOW_SECONDS,
+    backend=rate_limit_backend,
+)
+password_recovery_account_limit = RateLimit(
+    name="password-recovery-account",
+    limit=settings.PASSWORD_RECOVERY_RATE_LIMIT_PER_ACCOUNT,
+    window=settings.PASSWORD_RECOVERY_RATE_LIMIT_WINDOW_SECONDS,
+    backend=rate_limit_backend,
+)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def enforce_rate_limits(*hits: tuple[RateLimit, str]) -> None:
+    """
+    Count a hit on each `(limit, key)` and reject the request with a 429 and a
+    `Retry-After` header when one of them is over its limit.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    for limit, key in hits:
+        retry_after = limit.hit(key)
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(retry_after)},
+            )
@@ -1,48 +1,236 @@
 import uuid
-from typing import Any
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, col, select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app import crud
+from app.api.bulk import (
+    authorize_bulk_rows,
+    check_bulk_size,
+    validate_bulk_updates,
+)
+from app.api.changes import CHANGES_MAX_LIMIT, changes_response, sync_position
+from app.api.deps import CurrentUserAuth, ReadSessionDep, SessionDep
+from app.api.export import ExportFormat, export_response
+from app.api.http_cache import cache_control, make_etag, not_modified
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.responses import page_response
+from app.core.config import settings
+from app.core.statement_budget import statement_budget
+from app.models import (
+    Item,
+    ItemBulkUpdate,
+    ItemChanges,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkDeleted,
+    ItemsBulkPublic,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
 
-router = APIRouter(prefix="/items", tags=["items"])
+router = APIRouter(
+    prefix="/items",
+    tags=["items"],
+    dependencies=[Depends(cache_control(settings.ITEMS_CACHE_CONTROL))],
+)
 
 
 @router.get("/", response_model=ItemsPublic)
+@statement_budget(5)
 def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: ReadSessionDep,
+    current_user: CurrentUserAuth,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    q: str | None = None,
 ) -> Any:
     """
     Retrieve items.
+
+    Pass the `next_cursor` of a page as `cursor` to fetch the following page by
+    keyset instead of `skip`, this stays fast no matter how deep the page is.
+
+    Pass `q` to search titles and descriptions, matches come best first and are
+    paged with `skip`.
     """
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = select(Item).offset(skip).limit(limit)
-        items = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
+    if q and cursor:
+        raise HTTPException(
+            status_code=400, detail="Search results are paged with skip"
         )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
+    owner_id = None if current_user.is_superuser else current_user.id
+    count, count_type = crud.count_items(session=session, owner_id=owner_id, q=q)
+    if q:
+        items = crud.search_items(
+            session=session, q=q, owner_id=owner_id, skip=skip, limit=limit
         )
-        items = session.exec(statement).all()
+        next_cursor = None
+    else:
+        items, next_cursor = read_items_page(
+            session, owner_id=owner_id, skip=skip, limit=limit, cursor=cursor
+        )
+    etag = make_etag(
+        count, count_type, next_cursor, [(item.id, item.version) for item in items]
+    )
+    if cached := not_modified(request, response, etag):
+        return cached
+    return page_response(
+        response,
+        items,
+        ItemPublic,
+        count=count,
+        count_type=count_type,
+        next_cursor=next_cursor,
+    )
+
+
+def read_items_page(
+    session: Session,
+    *,
+    owner_id: uuid.UUID | None,
+    skip: int,
+    limit: int,
+    cursor: str | None,
+) -> tuple[Sequence[Item], str | None]:
+    statement = select(Item).order_by(col(Item.id)).limit(limit)
+    if owner_id:
+        statement = statement.where(Item.owner_id == owner_id)
+    if cursor:
+        statement = statement.where(col(Item.id) > decode_cursor(cursor))
+    else:
+        statement = statement.offset(skip)
+    items = session.exec(statement).all()
+    next_cursor = encode_cursor(items[-1].id) if items and len(items) == limit else None
+    return items, next_cursor
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_items(
+    current_user: CurrentUserAuth, format: ExportFormat = "ndjson"
+) -> StreamingResponse:
+    """
+    Stream all items as NDJSON or CSV, memory use doesn't grow with the number
+    of items.
+    """
+    statement = select(Item.id, Item.title, Item.description, Item.owner_id)
+    if not current_user.is_superuser:
+        statement = statement.where(Item.owner_id == current_user.id)
+    return export_response(
+        statement.order_by(col(Item.id)), format=format, name="items"
+    )
 
-    return ItemsPublic(data=items, count=count)
+
+@router.get("/changes", response_model=ItemChanges)
+def read_item_changes(
+    # The primary, a replica behind it could move the cursor past changes
+    session: SessionDep,
+    current_user: CurrentUserAuth,
+    response: Response,
+    since: datetime | None = None,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=CHANGES_MAX_LIMIT)] = 100,
+) -> Any:
+    """
+    Items created or updated since `since`, and the ids of the items deleted
+    since then, oldest change first.
+
+    Pass the `next_cursor` of the response as `cursor` to get the following
+    changes, right away when `has_more` or in the next sync. The last minute of
+    changes can be sent again, apply them by id.
+    """
+    position = sync_position(since=since, cursor=cursor)
+    owner_id = None if current_user.is_superuser else current_user.id
+    rows = crud.get_item_changes(
+        session=session, owner_id=owner_id, after=position, limit=limit + 1
+    )
+    return changes_response(response, rows, position=position, limit=limit)
+
+
+@router.post("/bulk", response_model=ItemsBulkPublic)
+def create_items_bulk(
+    *, session: SessionDep, current_user: CurrentUserAuth, items_in: list[ItemCreate]
+) -> Any:
+    """
+    Create many items in one transaction.
+    """
+    check_bulk_size(len(items_in))
+    items = crud.create_items_bulk(
+        session=session, items_in=items_in, owner_id=current_user.id
+    )
+    return ItemsBulkPublic(data=items)
+
+
+@router.patch("/bulk", response_model=ItemsBulkPublic)
+def update_items_bulk(
+    *,
+    session: SessionDep,
+    current_user: CurrentUserAuth,
+    items_in: list[ItemBulkUpdate],
+) -> Any:
+    """
+    Update many items in one transaction, items that can't be updated are
+    reported in `errors` by their position in the request.
+    """
+    check_bulk_size(len(items_in))
+    ids = [item_in.id for item_in in items_in]
+    owners = crud.get_item_owners(session=session, ids=ids)
+    allowed, errors = authorize_bulk_rows(
+        ids=ids, owners=owners, current_user=current_user
+    )
+    allowed, invalid = validate_bulk_updates(items_in=items_in, allowed=allowed)
+    errors = sorted(errors + invalid, key=lambda error: error.index)
+    items = crud.update_items_bulk(
+        session=session, items_in=[items_in[index] for index in allowed]
+    )
+    return ItemsBulkPublic(data=items, errors=errors)
+
+
+@router.delete("/bulk", response_model=ItemsBulkDeleted)
+def delete_items_bulk(
+    *,
+    session: SessionDep,
+    current_user: CurrentUserAuth,
+    ids: Annotated[list[uuid.UUID], Body()],
+) -> Any:
+    """
+    Delete many items in one transaction, items that can't be deleted are
+    reported in `errors` by their position in the request.
+    """
+    check_bulk_size(len(ids))
+    owners = crud.get_item_owners(session=session, ids=ids)
+    allowed, errors = authorize_bulk_rows(
+        ids=ids, owners=owners, current_user=current_user
+    )
+    allowed_ids = [ids[index] for index in allowed]
+    crud.delete_items_bulk(session=session, ids=allowed_ids)
+    return ItemsBulkDeleted(ids=allowed_ids, errors=errors)
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_item(
+    session: ReadSessionDep,
+    current_user: CurrentUserAuth,
+    request: Request,
+    response: Response,
+    id: uuid.UUID,
+) -> Any:
     """
     Get item by ID.
     """
@@ -51,28 +239,26 @@ def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) ->
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    if cached := not_modified(request, response, make_etag(item.id, item.version)):
+        return cached
     return item
 
 
 @router.post("/", response_model=ItemPublic)
 def create_item(
-    *, session: SessionDep, current_user: CurrentUser, item_in: ItemCreate
+    *, session: SessionDep, current_user: CurrentUserAuth, item_in: ItemCreate
 ) -> Any:
     """
     Create new item.
     """
-    item = Item.model_validate(item_in, update={"owner_id": current_user.id})
-    session.add(item)
-    session.commit()
-    session.refresh(item)
-    return item
+    return crud.create_item(session=session, item_in=item_in, owner_id=current_user.id)
 
 
 @router.put("/{id}", response_model=ItemPublic)
 def update_item(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentUserAuth,
     id: uuid.UUID,
     item_in: ItemUpdate,
 ) -> Any:
@@ -88,13 +274,12 @@ def update_item(
     item.sqlmodel_update(update_dict)
     session.add(item)
     session.commit()
-    session.refresh(item)
     return item
 
 
 @router.delete("/{id}")
 def delete_item(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+    session: SessionDep, current_user: CurrentUserAuth, id: uuid.UUID
 ) -> Message:
     """
     Delete an item.
@@ -104,6 +289,8 @@ def delete_item(
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    owner_id = item.owner_id
     session.delete(item)
     session.commit()
+    crud.invalidate_item_count(owner_id=owner_id)
     return Message(message="Item deleted successfully")
@@ -0,0 +1,309 @@
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.api.bulk import (
+    authorize_bulk_rows,
+    check_bulk_size,
+    validate_bulk_updates,
+)
+from app.api.changes import CHANGES_MAX_LIMIT, changes_response, sync_position
+from app.api.deps import (
+    AsyncCurrentUserAuth,
+    AsyncReadSessionDep,
+    AsyncSessionDep,
+)
+from app.api.export import ExportFormat, export_response_async
+from app.api.http_cache import cache_control, make_etag, not_modified
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.responses import page_response
+from app.core.config import settings
+from app.core.statement_budget import statement_budget
+from app.models import (
+    Item,
+    ItemBulkUpdate,
+    ItemChanges,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkDeleted,
+    ItemsBulkPublic,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
+
+# Same routes as app.api.routes.items, served from the async engine
+router = APIRouter(
+    prefix="/items",
+    tags=["items"],
+    dependencies=[Depends(cache_control(settings.ITEMS_CACHE_CONTROL))],
+)
+
+
+@router.get("/", response_model=ItemsPublic)
+@statement_budget(5)
+async def read_items(
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentUserAuth,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    q: str | None = None,
+) -> Any:
+    """
+    Retrieve items.
+
+    Pass the `next_cursor` of a page as `cursor` to fetch the following page by
+    keyset instead of `skip`, this stays fast no matter how deep the page is.
+
+    Pass `q` to search titles and descriptions, matches come best first and are
+    paged with `skip`.
+    """
+
+    if q and cursor:
+        raise HTTPException(
+            status_code=400, detail="Search results are paged with skip"
+        )
+    owner_id = None if current_user.is_superuser else current_user.id
+    count, count_type = await crud.count_items_async(
+        session=session, owner_id=owner_id, q=q
+    )
+    if q:
+        items = await crud.search_items_async(
+            session=session, q=q, owner_id=owner_id, skip=skip, limit=limit
+        )
+        next_cursor = None
+    else:
+        items, next_cursor = await read_items_page(
+            session, owner_id=owner_id, skip=skip, limit=limit, cursor=cursor
+        )
+    etag = make_etag(
+        count, count_type, next_cursor, [(item.id, item.version) for item in items]
+    )
+    if cached := not_modified(request, response, etag):
+        return cached
+    return page_response(
+        response,
+        items,
+        ItemPublic,
+        count=count,
+        count_type=count_type,
+        next_cursor=next_cursor,
+    )
+
+
+async def read_items_page(
+    session: AsyncSession,
+    *,
+    owner_id: uuid.UUID | None,
+    skip: int,
+    limit: int,
+    cursor: str | None,
+) -> tuple[Sequence[Item], str | None]:
+    statement = select(Item).order_by(col(Item.id)).limit(limit)
+    if owner_id:
+        statement = statement.where(Item.owner_id == owner_id)
+    if cursor:
+        statement = statement.where(col(Item.id) > decode_cursor(cursor))
+    else:
+        statement = statement.offset(skip)
+    items = (await session.exec(statement)).all()
+    next_cursor = encode_cursor(items[-1].id) if items and len(items) == limit else None
+    return items, next_cursor
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_items(
+    current_user: AsyncCurrentUserAuth, format: ExportFormat = "ndjson"
+) -> StreamingResponse:
+    """
+    Stream all items as NDJSON or CSV, memory use doesn't grow with the number
+    of items.
+    """
+    statement = select(Item.id, Item.title, Item.description, Item.owner_id)
+    if not current_user.is_superuser:
+        statement = statement.where(Item.owner_id == current_user.id)
+    return export_response_async(
+        statement.order_by(col(Item.id)), format=format, name="items"
+    )
+
+
+@router.get("/changes", response_model=ItemChanges)
+async def read_item_changes(
+    # The primary, a replica behind it could move the cursor past changes
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUserAuth,
+    response: Response,
+    since: datetime | None = None,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=CHANGES_MAX_LIMIT)] = 100,
+) -> Any:
+    """
+    Items created or updated since `since`, and the ids of the items deleted
+    since then, oldest change first.
+
+    Pass the `next_cursor` of the response as `cursor` to get the following
+    changes, right away when `has_more` or in the next sync. The last minute of
+    changes can be sent again, apply them by id.
+    """
+    position = sync_position(since=since, cursor=cursor)
+    owner_id = None if current_user.is_superuser else current_user.id
+    rows = await crud.get_item_changes_async(
+        session=session, owner_id=owner_id, after=position, limit=limit + 1
+    )
+    return changes_response(response, rows, position=position, limit=limit)
+
+
+@router.post("/bulk", response_model=ItemsBulkPublic)
+async def create_items_bulk(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUserAuth,
+    items_in: list[ItemCreate],
+) -> Any:
+    """
+    Create many items in one transaction.
+    """
+    check_bulk_size(len(items_in))
+    items = await crud.create_items_bulk_async(
+        session=session, items_in=items_in, owner_id=current_user.id
+    )
+    return ItemsBulkPublic(data=items)
+
+
+@router.patch("/bulk", response_model=ItemsBulkPublic)
+async def update_items_bulk(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUserAuth,
+    items_in: list[ItemBulkUpdate],
+) -> Any:
+    """
+    Update many items in one transaction, items that can't be updated are
+    reported in `errors` by their position in the request.
+    """
+    check_bulk_size(len(items_in))
+    ids = [item_in.id for item_in in items_in]
+    owners = await crud.get_item_owners_async(session=session, ids=ids)
+    allowed, errors = authorize_bulk_rows(
+        ids=ids, owners=owners, current_user=current_user
+    )
+    allowed, invalid = validate_bulk_updates(items_in=items_in, allowed=allowed)
+    errors = sorted(errors + invalid, key=lambda error: error.index)
+    items = await crud.update_items_bulk_async(
+        session=session, items_in=[items_in[index] for index in allowed]
+    )
+    return ItemsBulkPublic(data=items, errors=errors)
+
+
+@router.delete("/bulk", response_model=ItemsBulkDeleted)
+async def delete_items_bulk(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUserAuth,
+    ids: Annotated[list[uuid.UUID], Body()],
+) -> Any:
+    """
+    Delete many items in one transaction, items that can't be deleted are
+    reported in `errors` by their position in the request.
+    """
+    check_bulk_size(len(ids))
+    owners = await crud.get_item_owners_async(session=session, ids=ids)
+    allowed, errors = authorize_bulk_rows(
+        ids=ids, owners=owners, current_user=current_user
+    )
+    allowed_ids = [ids[index] for index in allowed]
+    await crud.delete_items_bulk_async(session=session, ids=allowed_ids)
+    return ItemsBulkDeleted(ids=allowed_ids, errors=errors)
+
+
+@router.get("/{id}", response_model=ItemPublic)
+async def read_item(
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentUserAuth,
+    request: Request,
+    response: Response,
+    id: uuid.UUID,
+) -> Any:
+    """
+    Get item by ID.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    if cached := not_modified(request, response, make_etag(item.id, item.version)):
+        return cached
+    return item
+
+
+@router.post("/", response_model=ItemPublic)
+async def create_item(
+    *, session: AsyncSessionDep, current_user: AsyncCurrentUserAuth, item_in: ItemCreate
+) -> Any:
+    """
+    Create new item.
+    """
+    return await crud.create_item_async(
+        session=session, item_in=item_in, owner_id=current_user.id
+    )
+
+
+@router.put("/{id}", response_model=ItemPublic)
+async def update_item(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUserAuth,
+    id: uuid.UUID,
+    item_in: ItemUpdate,
+) -> Any:
+    """
+    Update an item.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    update_dict = item_in.model_dump(exclude_unset=True)
+    item.sqlmodel_update(update_dict)
+    session.add(item)
+    await session.commit()
+    return item
+
+
+@router.delete("/{id}")
+async def delete_item(
+    session: AsyncSessionDep, current_user: AsyncCurrentUserAuth, id: uuid.UUID
+) -> Message:
+    """
+    Delete an item.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    owner_id = item.owner_id
+    await session.delete(item)
+    await session.commit()
+    crud.invalidate_item_count(owner_id=owner_id)
+    return Message(message="Item deleted successfully")
@@ -1,46 +1,138 @@
-from datetime import timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from jwt.exceptions import InvalidTokenError
+from pydantic import ValidationError
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    TokenPayloadDep,
+    get_current_active_superuser,
+)
+from app.api.rate_limit import (
+    client_ip,
+    enforce_rate_limits,
+    login_account_limit,
+    login_ip_limit,
+    password_recovery_account_limit,
+    password_recovery_ip_limit,
+)
 from app.core import security
 from app.core.config import settings
-from app.core.security import get_password_hash
-from app.models import Message, NewPassword, Token, UserPublic
+from app.core.security import get_password_hash_async, verify_password_async
+from app.models import Message, NewPassword, RefreshTokenRequest, Token, UserPublic
 from app.utils import (
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
     verify_password_reset_token,
 )
 
 router = APIRouter(tags=["login"])
 
 
+def create_tokens(user_id: uuid.UUID, session_id: uuid.UUID) -> Token:
+    return Token(
+        access_token=security.create_access_token(
+            user_id,
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            session_id=session_id,
+        ),
+        refresh_token=security.create_refresh_token(
+            user_id,
+            expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            session_id=session_id,
+        ),
+    )
+
+
+def session_expires_at() -> datetime:
+    # The latest expiry of any refresh token of a session revoked now
+    return datetime.now(timezone.utc) + timedelta(
+        days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+    )
+
+
 @router.post("/login/access-token")
-def login_access_token(
-    session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+async def login_access_token(
+    request: Request,
+    session: SessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.authenticate(
-        session=session, email=form_data.username, password=form_data.password
+    # Counted in Redis when it's configured, a blocking round trip
+    await run_in_threadpool(
+        enforce_rate_limits,
+        (login_ip_limit, client_ip(request)),
+        (login_account_limit, form_data.username.lower()),
     )
-    if not user:
+    user = await run_in_threadpool(
+        crud.get_user_by_email, session=session, email=form_data.username
+    )
+    if not user or not await verify_password_async(
+        form_data.password, user.hashed_password
+    ):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return Token(
-        access_token=security.create_access_token(
-            user.id, expires_delta=access_token_expires
-        )
+    return create_tokens(user.id, session_id=uuid.uuid4())
+
+
+@router.post("/login/refresh-token")
+def refresh_access_token(session: SessionDep, body: RefreshTokenRequest) -> Token:
+    """
+    Exchange a refresh token for a new access token and refresh token, a
+    refresh token can only be used once
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Could not validate credentials",
     )
+    try:
+        token_data = security.decode_refresh_token(body.refresh_token)
+    except (InvalidTokenError, ValidationError):
+        raise invalid
+    if crud.is_token_revoked(session=session, token_id=token_data.sid):
+        raise invalid
+    expires_at = datetime.fromtimestamp(token_data.exp, timezone.utc)
+    if not crud.revoke_token(
+        session=session, token_id=token_data.jti, expires_at=expires_at
+    ):
+        # A used refresh token came back, it was leaked or replayed: end the
+        # whole session, including whoever holds its latest tokens
+        crud.revoke_token(
+            session=session,
+            token_id=token_data.sid,
+            expires_at=session_expires_at(),
+        )
+        raise invalid
+    user = crud.get_user_auth(session=session, user_id=token_data.sub)
+    if not user or not user.is_active:
+        raise invalid
+    return create_tokens(user.id, session_id=token_data.sid)
+
+
+@router.post("/logout")
+def logout(session: SessionDep, token_data: TokenPayloadDep) -> Message:
+    """
+    End the login session of the access token, its access and refresh tokens
+    stop working
+    """
+    if token_data.sid:
+        crud.revoke_token(
+            session=session,
+            token_id=token_data.sid,
+            expires_at=session_expires_at(),
+        )
+    return Message(message="Logged out")
 
 
 @router.post("/login/test-token", response_model=UserPublic)
@@ -52,10 +144,14 @@ def test_token(current_user: CurrentUser) -> Any:
 
 
 @router.post("/password-recovery/{email}")
-def recover_password(email: str, session: SessionDep) -> Message:
+def recover_password(email: str, request: Request, session: SessionDep) -> Message:
     """
     Password Recovery
     """
+    enforce_rate_limits(
+        (password_recovery_ip_limit, client_ip(request)),
+        (password_recovery_account_limit, email.lower()),
+    )
     user = crud.get_user_by_email(session=session, email=email)
 
     if not user:
@@ -67,7 +163,8 @@ def recover_password(email: str, session: SessionDep) -> Message:
     email_data = generate_reset_password_email(
         email_to=user.email, email=email, token=password_reset_token
     )
-    send_email(
+    crud.enqueue_email(
+        session=session,
         email_to=user.email,
         subject=email_data.subject,
         html_content=email_data.html_content,
@@ -76,14 +173,14 @@ def recover_password(email: str, session: SessionDep) -> Message:
 
 
 @router.post("/reset-password/")
-def reset_password(session: SessionDep, body: NewPassword) -> Message:
+async def reset_password(session: SessionDep, body: NewPassword) -> Message:
     """
     Reset password
     """
     email = verify_password_reset_token(token=body.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid token")
-    user = crud.get_user_by_email(session=session, email=email)
+    user = await run_in_threadpool(crud.get_user_by_email, session=session, email=email)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -91,10 +188,10 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
         )
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    hashed_password = get_password_hash(password=body.new_password)
+    hashed_password = await get_password_hash_async(password=body.new_password)
     user.hashed_password = hashed_password
     session.add(user)
-    session.commit()
+    await run_in_threadpool(session.commit)
     return Message(message="Password updated successfully")
 
 
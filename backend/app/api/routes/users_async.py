@@ -0,0 +1,304 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import col, delete, select
+
+from app import crud
+from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncCurrentUserAuth,
+    AsyncReadSessionDep,
+    AsyncSessionDep,
+    get_current_active_superuser_async,
+)
+from app.api.export import ExportFormat, export_response_async
+from app.api.http_cache import cache_control, make_etag, not_modified
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.responses import page_response
+from app.core.config import settings
+from app.core.security import get_password_hash_async, verify_password_async
+from app.core.statement_budget import statement_budget
+from app.models import (
+    Item,
+    Message,
+    UpdatePassword,
+    User,
+    UserCreate,
+    UserPublic,
+    UserRegister,
+    UsersPublic,
+    UserUpdate,
+    UserUpdateMe,
+)
+from app.utils import generate_new_account_email
+
+# Same routes as app.api.routes.users, served from the async engine
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    dependencies=[Depends(cache_control(settings.USERS_CACHE_CONTROL))],
+)
+
+
+@router.get(
+    "/",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UsersPublic,
+)
+@statement_budget(5)
+async def read_users(
+    session: AsyncReadSessionDep,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> Any:
+    """
+    Retrieve users.
+
+    Pass the `next_cursor` of a page as `cursor` to fetch the following page by
+    keyset instead of `skip`.
+    """
+
+    count, count_type = await crud.count_users_async(session=session)
+
+    statement = select(User).order_by(col(User.id)).limit(limit)
+    if cursor:
+        statement = statement.where(col(User.id) > decode_cursor(cursor))
+    else:
+        statement = statement.offset(skip)
+    users = (await session.exec(statement)).all()
+
+    next_cursor = encode_cursor(users[-1].id) if users and len(users) == limit else None
+    return page_response(
+        response,
+        users,
+        UserPublic,
+        count=count,
+        count_type=count_type,
+        next_cursor=next_cursor,
+    )
+
+
+@router.post(
+    "/",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UserPublic,
+)
+async def create_user(*, session: AsyncSessionDep, user_in: UserCreate) -> Any:
+    """
+    Create new user.
+    """
+    user = await crud.get_user_by_email_async(session=session, email=user_in.email)
+    if user:
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system.",
+        )
+
+    user = await crud.create_user_async(session=session, user_create=user_in)
+    if settings.emails_enabled and user_in.email:
+        email_data = generate_new_account_email(
+            email_to=user_in.email, username=user_in.email, password=user_in.password
+        )
+        await crud.enqueue_email_async(
+            session=session,
+            email_to=user_in.email,
+            subject=email_data.subject,
+            html_content=email_data.html_content,
+        )
+    return user
+
+
+@router.patch("/me", response_model=UserPublic)
+async def update_user_me(
+    *, session: AsyncSessionDep, user_in: UserUpdateMe, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Update own user.
+    """
+
+    if user_in.email:
+        existing_user = await crud.get_user_by_email_async(
+            session=session, email=user_in.email
+        )
+        if existing_user and existing_user.id != current_user.id:
+            raise HTTPException(
+                status_code=409, detail="User with this email already exists"
+            )
+    user_data = user_in.model_dump(exclude_unset=True)
+    current_user.sqlmodel_update(user_data)
+    session.add(current_user)
+    await session.commit()
+    crud.invalidate_user_auth(user_id=current_user.id)
+    return current_user
+
+
+@router.patch("/me/password", response_model=Message)
+async def update_password_me(
+    *, session: AsyncSessionDep, body: UpdatePassword, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Update own password.
+    """
+    if not await verify_password_async(
+        body.current_password, current_user.hashed_password
+    ):
+        raise HTTPException(status_code=400, detail="Incorrect password")
+    if body.current_password == body.new_password:
+        raise HTTPException(
+            status_code=400, detail="New password cannot be the same as the current one"
+        )
+    hashed_password = await get_password_hash_async(body.new_password)
+    current_user.hashed_password = hashed_password
+    session.add(current_user)
+    await session.commit()
+    return Message(message="Password updated successfully")
+
+
+@router.get("/me", response_model=UserPublic)
+async def read_user_me(
+    current_user: AsyncCurrentUser, request: Request, response: Response
+) -> Any:
+    """
+    Get current user.
+    """
+    etag = make_etag(current_user.id, current_user.version)
+    if cached := not_modified(request, response, etag):
+        return cached
+    return current_user
+
+
+@router.delete("/me", response_model=Message)
+async def delete_user_me(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Delete own user.
+    """
+    if current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="Super users are not allowed to delete themselves"
+        )
+    user_id = current_user.id
+    await session.delete(current_user)
+    await session.commit()
+    crud.invalidate_item_count(owner_id=user_id)
+    crud.invalidate_user_auth(user_id=user_id)
+    return Message(message="User deleted successfully")
+
+
+@router.post("/signup", response_model=UserPublic)
+async def register_user(session: AsyncSessionDep, user_in: UserRegister) -> Any:
+    """
+    Create new user without the need to be logged in.
+    """
+    user = await crud.get_user_by_email_async(session=session, email=user_in.email)
+    if user:
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system",
+        )
+    user_create = UserCreate.model_validate(user_in)
+    user = await crud.create_user_async(session=session, user_create=user_create)
+    return user
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_class=StreamingResponse,
+)
+async def export_users(format: ExportFormat = "ndjson") -> StreamingResponse:
+    """
+    Stream all users as NDJSON or CSV, memory use doesn't grow with the number
+    of users.
+    """
+    # sqlmodel's select() has no overload for five columns
+    statement = select(  # type: ignore
+        User.id, User.email, User.is_active, User.is_superuser, User.full_name
+    )
+    return export_response_async(
+        statement.order_by(col(User.id)), format=format, name="users"
+    )
+
+
+@router.get("/{user_id}", response_model=UserPublic)
+async def read_user_by_id(
+    user_id: uuid.UUID,
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentUserAuth,
+) -> Any:
+    """
+    Get a specific user by id.
+    """
+    user = await session.get(User, user_id)
+    if user and user.id == current_user.id:
+        return user
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403,
+            detail="The user doesn't have enough privileges",
+        )
+    return user
+
+
+@router.patch(
+    "/{user_id}",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UserPublic,
+)
+async def update_user(
+    *,
+    session: AsyncSessionDep,
+    user_id: uuid.UUID,
+    user_in: UserUpdate,
+) -> Any:
+    """
+    Update a user.
+    """
+
+    db_user = await session.get(User, user_id)
+    if not db_user:
+        raise HTTPException(
+            status_code=404,
+            detail="The user with this id does not exist in the system",
+        )
+    if user_in.email:
+        existing_user = await crud.get_user_by_email_async(
+            session=session, email=user_in.email
+        )
+        if existing_user and existing_user.id != user_id:
+            raise HTTPException(
+                status_code=409, detail="User with this email already exists"
+            )
+
+    db_user = await crud.update_user_async(
+        session=session, db_user=db_user, user_in=user_in
+    )
+    return db_user
+
+
+@router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser_async)])
+async def delete_user(
+    session: AsyncSessionDep, current_user: AsyncCurrentUserAuth, user_id: uuid.UUID
+) -> Message:
+    """
+    Delete a user.
+    """
+    user = await session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user.id == current_user.id:
+        raise HTTPException(
+            status_code=403, detail="Super users are not allowed to delete themselves"
+        )
+    statement = delete(Item).where(col(Item.owner_id) == user_id)
+    await session.exec(statement)  # type: ignore
+    await session.delete(user)
+    await session.commit()
+    crud.invalidate_item_count(owner_id=user_id)
+    crud.invalidate_user_auth(user_id=user_id)
+    return Message(message="User deleted successfully")
@@ -1,9 +1,14 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
-from app.api.deps import get_current_active_superuser
+from app import crud
+from app.api.deps import SessionDep, get_current_active_superuser
+from app.core.db import pool_stats
+from app.core.security import hashing_pool
 from app.models import Message
-from app.utils import generate_test_email, send_email
+from app.utils import generate_test_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -13,12 +18,13 @@ router = APIRouter(prefix="/utils", tags=["utils"])
     dependencies=[Depends(get_current_active_superuser)],
     status_code=201,
 )
-def test_email(email_to: EmailStr) -> Message:
+def test_email(session: SessionDep, email_to: EmailStr) -> Message:
     """
     Test emails.
     """
     email_data = generate_test_email(email_to=email_to)
-    send_email(
+    crud.enqueue_email(
+        session=session,
         email_to=email_to,
         subject=email_data.subject,
         html_content=email_data.html_content,
@@ -26,6 +32,28 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/password-hashing-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def password_hashing_stats() -> dict[str, int]:
+    """
+    Queue depth and throughput of the password hashing pool.
+    """
+    return hashing_pool.stats()
+
+
+@router.get(
+    "/db-pool-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def db_pool_stats() -> dict[str, Any]:
+    """
+    Connections in use and checkout wait times of the database pools.
+    """
+    return pool_stats()
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, Protocol, TypeVar
+
+from app.core.config import settings
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe in-process LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class RedisCache:
+    """
+    Cache shared by every worker and host, entries expire after `ttl` seconds.
+
+    Needs the optional `redis` package.
+    """
+
+    def __init__(self, *, url: str, prefix: str, ttl: float) -> None:
+        try:
+            import redis  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_REDIS_URL is set but the redis package is not installed, "
+                "install the redis extra"
+            ) from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key: str) -> str | None:
+        value = self._client.get(f"{self.prefix}:{key}")
+        return None if value is None else str(value)
+
+    def set(self, key: str, value: str) -> None:
+        self._client.set(f"{self.prefix}:{key}", value, px=int(self.ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(f"{self.prefix}:{key}")
+
+
+def build_cache(*, prefix: str, maxsize: int, ttl: float) -> CacheBackend:
+    """
+    Return the shared Redis cache when `CACHE_REDIS_URL` is set, otherwise a
+    cache local to this process.
+    """
+    if settings.CACHE_REDIS_URL:
+        return RedisCache(url=settings.CACHE_REDIS_URL, prefix=prefix, ttl=ttl)
+    cache: TTLCache[str, str] = TTLCache(maxsize=maxsize, ttl=ttl)
+    return cache
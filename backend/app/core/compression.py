@@ -0,0 +1,225 @@
+import zlib
+from collections.abc import Callable, Sequence
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes:
+        """
+        Return everything compressed so far, so a streamed chunk can be decoded
+        before the next one arrives.
+        """
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipCompressor:
+    def __init__(self, level: int) -> None:
+        # wbits 16 + 15 writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        import brotli  # type: ignore
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return bytes(self._compressor.process(data))
+
+    def flush(self) -> bytes:
+        return bytes(self._compressor.flush())
+
+    def finish(self) -> bytes:
+        return bytes(self._compressor.finish())
+
+
+class ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        import zstandard  # type: ignore[import-not-found, unused-ignore]
+
+        self._zstandard = zstandard
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return bytes(self._compressor.compress(data))
+
+    def flush(self) -> bytes:
+        return bytes(self._compressor.flush(self._zstandard.COMPRESSOBJ_FLUSH_BLOCK))
+
+    def finish(self) -> bytes:
+        return bytes(self._compressor.flush(self._zstandard.COMPRESSOBJ_FLUSH_FINISH))
+
+
+# Package each encoding needs, besides the standard library
+OPTIONAL_PACKAGES = {"br": "brotli", "zstd": "zstandard"}
+
+
+def compressor_factories(
+    *, encodings: Sequence[str], gzip_level: int, brotli_quality: int, zstd_level: int
+) -> dict[str, Callable[[], Compressor]]:
+    """
+    Return a factory of compressors for each of `encodings`, in the same order.
+    """
+    factories: dict[str, Callable[[], Compressor]] = {}
+    for encoding in encodings:
+        if package := OPTIONAL_PACKAGES.get(encoding):
+            try:
+                __import__(package)
+            except ImportError as e:
+                raise RuntimeError(
+                    f"COMPRESSION_ENCODINGS has {encoding} but the {package} "
+                    "package is not installed, install the compression extra"
+                ) from e
+        if encoding == "gzip":
+            factories[encoding] = lambda: GzipCompressor(gzip_level)
+        elif encoding == "br":
+            factories[encoding] = lambda: BrotliCompressor(brotli_quality)
+        elif encoding == "zstd":
+            factories[encoding] = lambda: ZstdCompressor(zstd_level)
+        else:
+            raise ValueError(f"Unknown encoding {encoding}")
+    return factories
+
+
+def choose_encoding(accept_encoding: str, available: Sequence[str]) -> str | None:
+    """
+    Return the first of `available` that `accept_encoding` accepts, `None` when
+    the response has to go out uncompressed.
+    """
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compress responses of the allowed content types for clients that accept one
+    of `encodings`, preferred in that order.
+
+    Responses sent in one piece are compressed only from `minimum_size` bytes,
+    below that the encoding overhead isn't worth it. Streamed responses are
+    compressed chunk by chunk and each chunk is flushed, so the client can
+    decode it before the stream ends.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        factories: dict[str, Callable[[], Compressor]],
+        minimum_size: int,
+        content_types: Sequence[str],
+    ) -> None:
+        self.app = app
+        self.factories = factories
+        self.minimum_size = minimum_size
+        self.content_types = frozenset(content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), list(self.factories)
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(
+        self, middleware: CompressionMiddleware, encoding: str, send: Send
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Message | None = None
+        self._compressor: Compressor | None = None
+        # Decided on the first body message
+        self._passthrough = False
+
+    def _compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").partition(";")[0].strip()
+        return media_type.lower() in self.middleware.content_types
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            status = message["status"]
+            if status < 200 or status in (204, 304) or not self._compressible(headers):
+                self._passthrough = True
+                await self._send(message)
+            else:
+                # Held back until the first body message shows the size
+                self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self._compressor is None:
+            assert self._start is not None
+            headers = MutableHeaders(raw=self._start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+            self._compressor = self.middleware.factories[self.encoding]()
+            headers["Content-Encoding"] = self.encoding
+            del headers["Content-Length"]
+            # The compressed bytes differ from the identity ones
+            if (etag := headers.get("etag")) and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if not more_body:
+                compressed = self._compressor.compress(body)
+                compressed += self._compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(self._start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            await self._send(self._start)
+
+        data = self._compressor.compress(body)
+        data += self._compressor.flush() if more_body else self._compressor.finish()
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
@@ -32,8 +32,21 @@ class Settings(BaseSettings):
     )
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
-    # 60 minutes * 24 hours * 8 days = 8 days
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    # Each refresh returns a new refresh token, a login session stays open as
+    # long as it's refreshed within this many days
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 8
+    # Verified access tokens remembered per worker, repeat requests with the same
+    # token skip the signature check until it expires
+    VERIFIED_TOKEN_CACHE_MAX_SIZE: int = 10_000
+    VERIFIED_TOKEN_CACHE_TTL_SECONDS: int = 300
+    # Bloom filter of revoked sessions and refresh tokens in each worker, reloaded
+    # from the database every TOKEN_REVOCATION_SYNC_SECONDS
+    TOKEN_REVOCATION_CAPACITY: int = 1_000_000
+    TOKEN_REVOCATION_ERROR_RATE: float = 0.01
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5
+    # Threads reserved for bcrypt hashing and verification
+    PASSWORD_HASH_WORKERS: int = 4
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -68,6 +81,100 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # How list endpoints fill in their `count`: an exact COUNT(*), the
+    # planner's row estimate, or no count at all
+    LIST_COUNT_STRATEGY: Literal["exact", "estimated", "none"] = "exact"
+    ITEM_COUNT_CACHE_TTL_SECONDS: int = 60
+    ITEM_COUNT_CACHE_MAX_SIZE: int = 10_000
+    # Cache-Control sent with the GET responses of each router, "no-cache" has
+    # clients revalidate with the ETag and get a 304 when nothing changed
+    ITEMS_CACHE_CONTROL: str = "private, no-cache"
+    USERS_CACHE_CONTROL: str = "private, no-cache"
+    # Compress responses for clients that accept one of these encodings, in this
+    # order of preference, "br" needs the brotli package and "zstd" zstandard
+    COMPRESSION_ENCODINGS: list[Literal["zstd", "br", "gzip"]] = ["gzip"]
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_CONTENT_TYPES: list[str] = [
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/html",
+        "text/plain",
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    # Prometheus metrics served at /metrics, scrapes must send
+    # `Authorization: Bearer {METRICS_TOKEN}` when it is set. Required outside
+    # the local environment
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str | None = None
+    # With several workers, each one writes its metrics to this directory every
+    # METRICS_FLUSH_SECONDS and /metrics adds them up, the directory should be
+    # emptied before the workers start
+    METRICS_MULTIPROCESS_DIR: str | None = None
+    METRICS_FLUSH_SECONDS: float = 5
+    # Rows accepted by one request to the /items/bulk endpoints
+    ITEMS_BULK_MAX_SIZE: int = 5_000
+    # Rows fetched per round trip by the streaming export endpoints
+    EXPORT_BATCH_SIZE: int = 1_000
+    # /items/changes sends again the changes of the last seconds when a sync
+    # catches up, for transactions that committed after it with an earlier
+    # `updated_at`. Writes taking longer than this can be missed
+    ITEM_CHANGES_OVERLAP_SECONDS: int = 60
+    # Deleted item ids are reported for this long, clients that last synced
+    # before have to fetch all items again. `python -m app.tombstone_worker`
+    # deletes older ones every ITEM_TOMBSTONE_PRUNE_SECONDS
+    ITEM_TOMBSTONE_RETENTION_DAYS: int = 30
+    ITEM_TOMBSTONE_PRUNE_SECONDS: float = 3600
+
+    # Shared cache for every worker, each worker keeps its own cache when unset
+    CACHE_REDIS_URL: str | None = None
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+
+    # Attempts per client IP and per account before login and password
+    # recovery answer 429, counted in CACHE_REDIS_URL when set
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_ACCOUNT: int = 10
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    PASSWORD_RECOVERY_RATE_LIMIT_PER_IP: int = 10
+    PASSWORD_RECOVERY_RATE_LIMIT_PER_ACCOUNT: int = 3
+    PASSWORD_RECOVERY_RATE_LIMIT_WINDOW_SECONDS: int = 3600
+
+    # Serve the items and users routes from the async engine and sessions
+    USE_ASYNC_DB: bool = False
+
+    # Connection pool of each worker process, size it so that
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    # Seconds before a connection is replaced, -1 keeps them forever
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Connect through an external pooler such as PgBouncer in transaction mode:
+    # no local pool and no server-side prepared statements
+    DB_EXTERNAL_POOLER: bool = False
+    # Read replicas as postgresql+psycopg:// URIs, routes that take a
+    # ReadSessionDep read from them in turn. Empty reads from the primary
+    DB_REPLICA_URIS: list[PostgresDsn] = []
+    # Seconds a replica that failed to connect is skipped before trying it again
+    DB_REPLICA_RETRY_SECONDS: float = 30
+    # After a request that may write, the same user reads from the primary for
+    # this long so they see their own writes, 0 turns it off
+    DB_READ_YOUR_WRITES_SECONDS: float = 5
+    # Statements slower than this are logged with their duration, 0 turns it off
+    DB_SLOW_QUERY_SECONDS: float = 0.5
+    # SQL statements one request may send, routes declare their own with
+    # @statement_budget. Requests over it are logged, or fail with "raise"
+    SQL_STATEMENT_BUDGET: int = 10
+    SQL_STATEMENT_BUDGET_ACTION: Literal["log", "raise"] = "log"
+    # A SELECT sent this many times by one request is reported as an N+1 load
+    SQL_REPEATED_SELECT_THRESHOLD: int = 5
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -76,6 +183,9 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = None
     EMAILS_FROM_EMAIL: EmailStr | None = None
     EMAILS_FROM_NAME: str | None = None
+    # Open SMTP sessions kept for reuse, idle ones are closed after the timeout
+    SMTP_POOL_SIZE: int = 2
+    SMTP_POOL_MAX_IDLE_SECONDS: float = 30
 
     @model_validator(mode="after")
     def _set_default_emails_from(self) -> Self:
@@ -84,6 +194,17 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # Emails are queued in the outbox table and sent by `python -m app.email_worker`,
+    # failed sends are retried with exponential backoff up to the max attempts
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 1.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = 30
+    EMAIL_OUTBOX_MAX_BACKOFF_SECONDS: float = 3600
+    # Sent emails, and emails that failed the max attempts, are deleted this long
+    # after by the worker, which looks for them every EMAIL_OUTBOX_PRUNE_SECONDS
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7
+    EMAIL_OUTBOX_PRUNE_SECONDS: float = 3600
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -115,5 +236,18 @@ class Settings(BaseSettings):
 
         return self
 
+    @model_validator(mode="after")
+    def _require_metrics_token(self) -> Self:
+        if (
+            self.METRICS_ENABLED
+            and not self.METRICS_TOKEN
+            and self.ENVIRONMENT != "local"
+        ):
+            raise ValueError(
+                "METRICS_TOKEN is not set, anyone could read /metrics. Set it, "
+                "or set METRICS_ENABLED=False, for deployments."
+            )
+        return self
+
 
 settings = Settings()  # type: ignore
@@ -1,10 +1,203 @@
-from sqlmodel import Session, create_engine, select
+import itertools
+import logging
+import time
+from collections.abc import Sequence
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+from sqlalchemy.pool.base import ConnectionPoolEntry
+from sqlmodel import Session, create_engine
 
 from app import crud
 from app.core.config import settings
-from app.models import User, UserCreate
+from app.core.metrics import registry
+from app.core.statement_budget import record_statement
+from app.models import UserCreate
+
+logger = logging.getLogger(__name__)
+
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Seconds each checkout waited for a connection.",
+    ["engine"],
+)
+pool_connections = registry.gauge(
+    "db_pool_connections", "Connections of the pool by state.", ["engine", "state"]
+)
+queries = registry.counter("db_queries_total", "SQL statements sent.", ["engine"])
+query_duration = registry.histogram(
+    "db_query_duration_seconds", "Seconds each SQL statement took.", ["engine"]
+)
+
+# Longer statements, such as multi-row inserts, are cut in the slow query log
+SLOW_QUERY_LOG_CHARS = 1000
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    engine_name = "sync"
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.labels(self.engine_name).observe(
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    engine_name = "async"
+
+
+def engine_options(*, is_async: bool) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if settings.DB_EXTERNAL_POOLER:
+        # Transaction pooling hands each transaction a different server
+        # connection, prepared statements would not be there on the next one
+        options["poolclass"] = NullPool
+        options["connect_args"] = {"prepare_threshold": None}
+    else:
+        options["poolclass"] = (
+            InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool
+        )
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+        options["pool_timeout"] = settings.DB_POOL_TIMEOUT
+    return options
+
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options(is_async=False)
+)
+# psycopg 3 drives both, the async engine only opens connections when used
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options(is_async=True)
+)
+
+
+def instrument_queries(sync_engine: Engine, name: str) -> None:
+    """
+    Count and time the statements `sync_engine` sends, and log the ones slower
+    than `DB_SLOW_QUERY_SECONDS` without their parameters.
+    """
+    count = queries.labels(name)
+    duration = query_duration.labels(name)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn: Any, *_args: Any) -> None:
+        # A connection runs one statement at a time
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def record(conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("query_start")
+        count.inc()
+        duration.observe(elapsed)
+        threshold = settings.DB_SLOW_QUERY_SECONDS
+        if threshold and elapsed >= threshold:
+            logger.warning(
+                f"Slow query on the {name} engine took {elapsed:.3f}s: "
+                f"{statement[:SLOW_QUERY_LOG_CHARS]}"
+            )
+
+
+def instrument(sync_engine: Engine, name: str) -> None:
+    instrument_queries(sync_engine, name)
+    event.listen(sync_engine, "before_cursor_execute", record_statement)
+
+
+E = TypeVar("E")
+
+
+class ReplicaSet(Generic[E]):
+    """
+    Read replica engines taken in turn. A replica that failed to connect is
+    skipped for `retry_seconds`, then tried again.
+    """
+
+    def __init__(self, engines: Sequence[E], *, retry_seconds: float) -> None:
+        self.engines = list(engines)
+        self.retry_seconds = retry_seconds
+        self._down_until = [0.0] * len(self.engines)
+        self._turns = itertools.count()
+
+    def candidates(self) -> list[E]:
+        """
+        Return the replicas not known to be down, starting with the one whose
+        turn it is.
+        """
+        if not self.engines:
+            return []
+        start = next(self._turns) % len(self.engines)
+        now = time.monotonic()
+        order = [*range(start, len(self.engines)), *range(start)]
+        return [self.engines[i] for i in order if self._down_until[i] <= now]
+
+    def mark_down(self, engine: E) -> None:
+        index = self.engines.index(engine)
+        self._down_until[index] = time.monotonic() + self.retry_seconds
+
+
+replicas = ReplicaSet(
+    [
+        create_engine(str(uri), **engine_options(is_async=False))
+        for uri in settings.DB_REPLICA_URIS
+    ],
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+async_replicas = ReplicaSet(
+    [
+        create_async_engine(str(uri), **engine_options(is_async=True))
+        for uri in settings.DB_REPLICA_URIS
+    ],
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
+instrument(engine, "sync")
+instrument(async_engine.sync_engine, "async")
+for index, replica in enumerate(replicas.engines):
+    instrument(replica, f"sync-replica{index}")
+for index, async_replica in enumerate(async_replicas.engines):
+    instrument(async_replica.sync_engine, f"async-replica{index}")
+
+
+def pool_stats() -> dict[str, dict[str, Any]]:
+    pools: dict[str, Pool] = {
+        "sync": engine.pool,
+        "async": async_engine.sync_engine.pool,
+    }
+    stats: dict[str, dict[str, Any]] = {}
+    for name, pool in pools.items():
+        entry: dict[str, Any] = {
+            "checkout_wait": pool_checkout_wait.labels(name).snapshot()
+        }
+        if isinstance(pool, QueuePool):
+            entry["size"] = pool.size()
+            entry["checked_in"] = pool.checkedin()
+            entry["checked_out"] = pool.checkedout()
+            entry["overflow"] = pool.overflow()
+        stats[name] = entry
+    return stats
+
+
+def update_pool_gauges() -> None:
+    for name, entry in pool_stats().items():
+        for state in ("checked_in", "checked_out"):
+            if state in entry:
+                pool_connections.labels(name, state).set(entry[state])
+
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+registry.on_collect(update_pool_gauges)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -21,9 +214,7 @@ def init_db(session: Session) -> None:
     # This works because the models are already imported and registered from app.models
     # SQLModel.metadata.create_all(engine)
 
-    user = session.exec(
-        select(User).where(User.email == settings.FIRST_SUPERUSER)
-    ).first()
+    user = crud.get_user_by_email(session=session, email=settings.FIRST_SUPERUSER)
     if not user:
         user_in = UserCreate(
             email=settings.FIRST_SUPERUSER,
@@ -0,0 +1,324 @@
+import bisect
+import copy
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import Any, Generic, Literal, Protocol, TypeVar
+
+# Seconds, from a fast local query up to a pool timeout
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+MetricType = Literal["counter", "gauge", "histogram"]
+
+
+class Histogram:
+    """
+    Thread-safe histogram with cumulative buckets, the way Prometheus exposes them.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # One extra slot for observations above the last bucket (+Inf)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+        cumulative: dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self.buckets, counts, strict=False):
+            running += count
+            cumulative[str(bound)] = running
+        running += counts[-1]
+        cumulative["+Inf"] = running
+        return {"buckets": cumulative, "count": running, "sum": total_sum}
+
+
+class Counter:
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"value": self._value}
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"value": self._value}
+
+
+class _Snapshot(Protocol):
+    def snapshot(self) -> dict[str, Any]: ...
+
+
+M = TypeVar("M", bound=_Snapshot)
+
+
+class Metric(Generic[M]):
+    """
+    Named metric with one `Counter`, `Gauge` or `Histogram` per combination of
+    label values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        type: MetricType,
+        labelnames: Sequence[str],
+        factory: Callable[[], M],
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: dict[tuple[str, ...], M] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> M:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def collect(self) -> dict[str, Any]:
+        with self._lock:
+            children = list(self._children.items())
+        return {
+            "help": self.documentation,
+            "type": self.type,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(values), child.snapshot()] for values, child in children],
+        }
+
+
+class Registry:
+    """
+    The metrics of this process, `collect` returns them as plain data that can
+    be written to JSON and merged with the metrics of other workers.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric[Any]] = {}
+        self._callbacks: list[Callable[[], None]] = []
+
+    def _register(self, metric: Metric[M]) -> Metric[M]:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Metric[Counter]:
+        return self._register(
+            Metric(
+                name,
+                documentation,
+                type="counter",
+                labelnames=labelnames,
+                factory=Counter,
+            )
+        )
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Metric[Gauge]:
+        return self._register(
+            Metric(
+                name, documentation, type="gauge", labelnames=labelnames, factory=Gauge
+            )
+        )
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Metric[Histogram]:
+        return self._register(
+            Metric(
+                name,
+                documentation,
+                type="histogram",
+                labelnames=labelnames,
+                factory=lambda: Histogram(buckets),
+            )
+        )
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        """
+        Call `callback` before each collection, for gauges read from elsewhere
+        such as the connection pools.
+        """
+        self._callbacks.append(callback)
+
+    def collect(self) -> dict[str, Any]:
+        for callback in self._callbacks:
+            callback()
+        return {name: metric.collect() for name, metric in self._metrics.items()}
+
+
+registry = Registry()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge(collections: Iterable[tuple[dict[str, Any], bool]]) -> dict[str, Any]:
+    """
+    Add up the metrics collected by several workers, given as pairs of metrics
+    and whether the worker is still running.
+
+    Counters and histograms of workers that exited still count, their gauges
+    describe a process that is gone so they are left out.
+    """
+    merged: dict[str, Any] = {}
+    totals: dict[tuple[str, tuple[str, ...]], dict[str, Any]] = {}
+    for collected, alive in collections:
+        for name, metric in collected.items():
+            if metric["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": []})
+            for values, sample in metric["samples"]:
+                key = (name, tuple(values))
+                total = totals.get(key)
+                if total is None:
+                    total = totals[key] = copy.deepcopy(sample)
+                    target["samples"].append([values, total])
+                elif metric["type"] == "histogram":
+                    for bound, count in sample["buckets"].items():
+                        total["buckets"][bound] = total["buckets"].get(bound, 0) + count
+                    total["count"] += sample["count"]
+                    total["sum"] += sample["sum"]
+                else:
+                    total["value"] += sample["value"]
+    return merged
+
+
+class MultiprocessStore:
+    """
+    Directory where each worker writes its metrics, so the worker that
+    answers a scrape can report all of them. Point it at a directory that is
+    emptied before the workers start, files left by a previous run would
+    still be counted.
+    """
+
+    def __init__(self, directory: str | Path, *, flush_seconds: float) -> None:
+        self.directory = Path(directory)
+        self.flush_seconds = flush_seconds
+        self._next_flush = 0.0
+        self._lock = threading.Lock()
+
+    def flush_due(self) -> bool:
+        return time.monotonic() >= self._next_flush
+
+    def write(self, collected: dict[str, Any]) -> None:
+        pid = os.getpid()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{pid}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with self._lock:
+            tmp_path.write_text(json.dumps({"pid": pid, "metrics": collected}))
+            # Readers see the previous file or this one, never a partial one
+            tmp_path.replace(path)
+            self._next_flush = time.monotonic() + self.flush_seconds
+
+    def read(self) -> dict[str, Any]:
+        collections = []
+        for path in self.directory.glob("*.json"):
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            collections.append((data["metrics"], _pid_alive(data["pid"])))
+        return merge(collections)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values, strict=True):
+        escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_prometheus(collected: dict[str, Any]) -> str:
+    """
+    Return collected metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for name, metric in collected.items():
+        documentation = metric["help"].replace("\\", "\\\\").replace("\n", "\\n")
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for values, sample in metric["samples"]:
+            labels = _format_labels(labelnames, values)
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{labels} {_format_value(sample['value'])}")
+                continue
+            for bound, count in sample["buckets"].items():
+                bucket_labels = _format_labels(
+                    [*labelnames, "le"], [*values, str(bound)]
+                )
+                lines.append(f"{name}_bucket{bucket_labels} {count}")
+            lines.append(f"{name}_sum{labels} {_format_value(sample['sum'])}")
+            lines.append(f"{name}_count{labels} {sample['count']}")
+    return "\n".join(lines) + "\n"
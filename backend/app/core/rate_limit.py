@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from app.core.config import settings
+
+
+class RateLimitBackend(Protocol):
+    def incr(self, key: str, ttl: float) -> int:
+        """
+        Add one to the counter `key` and return the new value, a new counter
+        expires after `ttl` seconds.
+        """
+        ...
+
+    def get(self, key: str) -> int: ...
+
+
+class MemoryRateLimitBackend:
+    """
+    Thread-safe counters local to this process, the least recently used are
+    dropped past `maxsize` counters.
+    """
+
+    def __init__(self, *, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def incr(self, key: str, ttl: float) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expires_at, count = self._data.get(key, (now + ttl, 0))
+            if expires_at <= now:
+                expires_at, count = now + ttl, 0
+            self._data[key] = (expires_at, count + 1)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return count + 1
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            expires_at, count = self._data.get(key, (0.0, 0))
+            return count if expires_at > time.monotonic() else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisRateLimitBackend:
+    """
+    Counters shared by every worker and host.
+
+    Needs the optional `redis` package.
+    """
+
+    def __init__(self, *, url: str, prefix: str) -> None:
+        try:
+            import redis  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_REDIS_URL is set but the redis package is not installed, "
+                "install the redis extra"
+            ) from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def incr(self, key: str, ttl: float) -> int:
+        key = f"{self.prefix}:{key}"
+        pipeline = self._client.pipeline()
+        # Only a new counter gets the expiry, INCR keeps it
+        pipeline.set(key, 0, px=int(ttl * 1000), nx=True)
+        pipeline.incr(key)
+        _, count = pipeline.execute()
+        return int(count)
+
+    def get(self, key: str) -> int:
+        value = self._client.get(f"{self.prefix}:{key}")
+        return 0 if value is None else int(value)
+
+
+def build_rate_limit_backend(*, prefix: str, maxsize: int) -> RateLimitBackend:
+    """
+    Return counters in Redis when `CACHE_REDIS_URL` is set, so the limits hold
+    across workers, otherwise counters local to this process.
+    """
+    if settings.CACHE_REDIS_URL:
+        return RedisRateLimitBackend(url=settings.CACHE_REDIS_URL, prefix=prefix)
+    return MemoryRateLimitBackend(maxsize=maxsize)
+
+
+class RateLimit:
+    """
+    Allow `limit` hits per `window` seconds for each key, as a sliding window
+    approximated from the counts of the current and the previous fixed window.
+    """
+
+    def __init__(
+        self, *, name: str, limit: int, window: float, backend: RateLimitBackend
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.backend = backend
+
+    def hit(self, key: str, *, now: float | None = None) -> int | None:
+        """
+        Count a hit for `key`, return the seconds to wait before retrying when
+        it goes over the limit, `None` when it's allowed.
+        """
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, self.window)
+        current = self.backend.incr(f"{self.name}:{key}:{index:.0f}", 2 * self.window)
+        previous = self.backend.get(f"{self.name}:{key}:{index - 1:.0f}")
+        # The part of the previous window still inside the sliding window
+        weight = 1 - elapsed / self.window
+        if previous * weight + current <= self.limit:
+            return None
+        # When the next hit would fit, if no other hits come meanwhile
+        spare = self.limit - current - 1
+        if spare >= 0:
+            # Once enough of the previous window has slid out
+            wait = self.window * (1 - spare / previous) - elapsed
+        else:
+            # Once enough of the current window has slid out, in the next one
+            wait = self.window - elapsed
+            wait += self.window * max(0, 1 - (self.limit - 1) / current)
+        return max(1, math.ceil(wait))
@@ -0,0 +1,112 @@
+import hashlib
+import math
+import threading
+import time
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+# Rows are visible to the sync once their transaction commits, which can be
+# after their revoked_at, so each sync looks back this far past the last one
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """
+    Set of keys that answers "maybe present" or "certainly absent", with about
+    `error_rate` false positives once it holds `capacity` keys.
+    """
+
+    def __init__(self, *, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: bytes) -> list[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        # Double hashing, the second hash is odd so it never cycles early
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key: bytes) -> None:
+        # Keys added again don't count toward the capacity
+        if key in self:
+            return
+        for position in self._positions(key):
+            self._bits[position // 8] |= 1 << (position % 8)
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(
+            self._bits[position // 8] & (1 << (position % 8))
+            for position in self._positions(key)
+        )
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+
+class RevocationStore:
+    """
+    In-process Bloom filter of the revoked token ids in the `revoked_token`
+    table, so most checks are answered without a query. A hit is confirmed
+    against the table since it may be a false positive.
+
+    Revocations made by this process are added right away, the ones made by
+    other workers are read from the table every `sync_seconds`.
+    """
+
+    def __init__(
+        self, *, capacity: int, error_rate: float, sync_seconds: float
+    ) -> None:
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(capacity=capacity, error_rate=error_rate)
+        self._lock = threading.Lock()
+        self._next_sync = 0.0
+        # When the table was last read, None until the first full read
+        self._synced_at: datetime | None = None
+
+    def add(self, token_id: uuid.UUID) -> None:
+        with self._lock:
+            self._bloom.add(token_id.bytes)
+
+    def might_contain(self, token_id: uuid.UUID) -> bool:
+        return token_id.bytes in self._bloom
+
+    def sync_due(self) -> bool:
+        return time.monotonic() >= self._next_sync
+
+    def sync_since(self) -> datetime | None:
+        """
+        Return the revoked_at from which to read the table, `None` to read it
+        all and start over.
+        """
+        with self._lock:
+            if self._synced_at is None or self._bloom.count > self._bloom.capacity:
+                return None
+            return self._synced_at - SYNC_OVERLAP
+
+    def apply_sync(
+        self, token_ids: Iterable[uuid.UUID], *, full: bool, synced_at: datetime
+    ) -> None:
+        """
+        Add the ids read from the table at `synced_at`, a `full` read replaces
+        what was there so the ids of pruned rows drop out.
+        """
+        with self._lock:
+            if full:
+                self._bloom.clear()
+            for token_id in token_ids:
+                self._bloom.add(token_id.bytes)
+            self._synced_at = synced_at
+            self._next_sync = time.monotonic() + self.sync_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bloom.clear()
+            self._synced_at = None
+            self._next_sync = 0.0
@@ -1,27 +1,151 @@
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.models import RefreshTokenPayload, TokenPayload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
 
-def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
+
+class HashingPool:
+    """
+    Bounded pool of threads dedicated to bcrypt.
+
+    bcrypt releases the GIL, so hashes run in parallel here without holding one
+    of Starlette's request threadpool slots for the whole hash.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self._queued += 1
+
+        def task() -> T:
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, task)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+            }
+
+
+hashing_pool = HashingPool(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+
+def create_access_token(
+    subject: str | Any,
+    expires_delta: timedelta,
+    session_id: uuid.UUID | None = None,
+) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "type": "access"}
+    if session_id:
+        to_encode["sid"] = str(session_id)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def create_refresh_token(
+    subject: str | Any, expires_delta: timedelta, session_id: uuid.UUID
+) -> str:
+    expire = datetime.now(timezone.utc) + expires_delta
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "sid": str(session_id),
+        "jti": str(uuid.uuid4()),
+        "type": "refresh",
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_refresh_token(token: str) -> RefreshTokenPayload:
+    """
+    Raises `InvalidTokenError` or `ValidationError` when the token isn't a
+    valid refresh token.
+    """
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    return RefreshTokenPayload.model_validate(payload)
+
+
+# SHA-256 of a verified token to its expiry and payload
+verified_tokens: TTLCache[bytes, tuple[float, TokenPayload]] = TTLCache(
+    maxsize=settings.VERIFIED_TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.VERIFIED_TOKEN_CACHE_TTL_SECONDS,
+)
+
+
+def decode_access_token(token: str) -> TokenPayload:
+    """
+    Verify `token` and return its payload, a token verified before skips the
+    signature check and the validation until its `exp`.
+
+    Raises `InvalidTokenError` or `ValidationError` when the token isn't valid.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = verified_tokens.get(digest)
+    if cached is not None:
+        expires_at, token_data = cached
+        if time.time() < expires_at:
+            return token_data
+        verified_tokens.delete(digest)
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    token_data = TokenPayload(**payload)
+    verified_tokens.set(digest, (payload.get("exp", float("inf")), token_data))
+    return token_data
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_pool.run(get_password_hash, password)
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from emails.backend.smtp import SMTPBackend  # type: ignore
+
+from app.core.config import settings
+
+
+def smtp_options() -> dict[str, Any]:
+    options: dict[str, Any] = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
+    if settings.SMTP_TLS:
+        options["tls"] = True
+    elif settings.SMTP_SSL:
+        options["ssl"] = True
+    if settings.SMTP_USER:
+        options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        options["password"] = settings.SMTP_PASSWORD
+    return options
+
+
+class SMTPPool:
+    """
+    Keep SMTP sessions open between sends, so connecting, the TLS handshake and
+    the login happen once per session instead of once per email.
+
+    Up to `size` idle sessions are kept, sessions idle for longer than
+    `max_idle_seconds` are closed instead of reused since most servers drop them
+    by then. A session the server drops while in use reconnects on the next send.
+    """
+
+    def __init__(self, *, size: int, max_idle_seconds: float) -> None:
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self._lock = threading.Lock()
+        # (last used, session), the most recently used last
+        self._idle: list[tuple[float, Any]] = []
+        # Sessions are only reused with the settings they were opened with
+        self._options: dict[str, Any] = {}
+        self.opened = 0
+
+    def _checkout(self, options: dict[str, Any]) -> Any:
+        now = time.monotonic()
+        stale = []
+        session = None
+        with self._lock:
+            if options != self._options:
+                stale = [idle for _, idle in self._idle]
+                self._idle.clear()
+                self._options = options
+            while self._idle:
+                last_used, idle = self._idle.pop()
+                if now - last_used <= self.max_idle_seconds:
+                    session = idle
+                    break
+                stale.append(idle)
+            if session is None:
+                self.opened += 1
+        for idle in stale:
+            idle.close()
+        return session or SMTPBackend(**options)
+
+    def _checkin(self, options: dict[str, Any], session: Any) -> None:
+        with self._lock:
+            if options == self._options and len(self._idle) < self.size:
+                self._idle.append((time.monotonic(), session))
+                return
+        session.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrow a session, an `emails` SMTP backend that connects on first use.
+        """
+        options = smtp_options()
+        session = self._checkout(options)
+        try:
+            yield session
+        except BaseException:
+            session.close()
+            raise
+        self._checkin(options, session)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, session in idle:
+            session.close()
+
+
+smtp_pool = SMTPPool(
+    size=settings.SMTP_POOL_SIZE, max_idle_seconds=settings.SMTP_POOL_MAX_IDLE_SECONDS
+)
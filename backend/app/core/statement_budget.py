@@ -0,0 +1,125 @@
+import logging
+from collections import Counter
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class StatementBudgetExceeded(Exception):
+    pass
+
+
+def statement_budget(budget: int) -> Callable[[F], F]:
+    """
+    Declare how many SQL statements a request to the decorated route may send,
+    in place of `SQL_STATEMENT_BUDGET`.
+    """
+
+    def decorate(endpoint: F) -> F:
+        endpoint.statement_budget = budget  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorate
+
+
+class RequestStatements:
+    """
+    SQL statements sent while handling one request, checked against the budget
+    of the route that handles it.
+    """
+
+    def __init__(self, scope: Scope) -> None:
+        self.scope = scope
+        self.count = 0
+        self.selects: Counter[str] = Counter()
+
+    @property
+    def route(self) -> str:
+        # Set by the router on the scope once a route matched, before any
+        # dependency runs
+        return getattr(self.scope.get("route"), "path_format", "unmatched")
+
+    @property
+    def budget(self) -> int:
+        endpoint = self.scope.get("endpoint")
+        budget: int = getattr(
+            endpoint, "statement_budget", settings.SQL_STATEMENT_BUDGET
+        )
+        return budget
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        # Lazy loads in a loop send the same SELECT with other parameters
+        if statement.lstrip()[:6].upper() == "SELECT":
+            self.selects[statement] += 1
+        if settings.SQL_STATEMENT_BUDGET_ACTION == "raise" and (
+            problem := self.problem()
+        ):
+            raise StatementBudgetExceeded(problem)
+
+    def problem(self) -> str | None:
+        request = f"{self.scope['method']} {self.route}"
+        if self.count > self.budget:
+            return (
+                f"{request} sent {self.count} SQL statements, "
+                f"its budget is {self.budget}"
+            )
+        if self.selects:
+            statement, repeats = self.selects.most_common(1)[0]
+            if repeats >= settings.SQL_REPEATED_SELECT_THRESHOLD:
+                return (
+                    f"{request} sent the same SELECT {repeats} times, likely an "
+                    f"N+1 load: {statement}"
+                )
+        return None
+
+
+current_statements: ContextVar[RequestStatements | None] = ContextVar(
+    "current_statements", default=None
+)
+
+
+def record_statement(_conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+    """
+    `before_cursor_execute` listener that counts `statement` toward the current
+    request, statements sent outside a request aren't counted.
+    """
+    if (statements := current_statements.get()) is not None:
+        statements.record(statement)
+
+
+class StatementBudgetMiddleware:
+    """
+    Count the SQL statements each request sends. Requests over their route's
+    budget, or that repeat a SELECT `SQL_REPEATED_SELECT_THRESHOLD` times, are
+    logged, or fail as soon as it happens when `SQL_STATEMENT_BUDGET_ACTION` is
+    "raise".
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        statements = RequestStatements(scope)
+        # Sync routes and dependencies run in the threadpool with a copy of
+        # this context, so they count toward the same object
+        token = current_statements.set(statements)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_statements.reset(token)
+        if settings.SQL_STATEMENT_BUDGET_ACTION == "log" and (
+            problem := statements.problem()
+        ):
+            logger.warning(problem)
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.core.config import settings
+
+EMAIL_TEMPLATES_DIR = Path(__file__).parent.parent / "email-templates" / "build"
+
+
+def create_template_environment(directory: Path, *, auto_reload: bool) -> Environment:
+    """
+    Templates are read and compiled once per process and kept in memory, the
+    compiled bytecode is also cached on disk so other workers and restarts skip
+    compiling. With `auto_reload` a changed template file is picked up on the
+    next render.
+    """
+    return Environment(
+        loader=FileSystemLoader(directory),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=auto_reload,
+    )
+
+
+# Reload rebuilt templates without a restart while developing
+email_templates = create_template_environment(
+    EMAIL_TEMPLATES_DIR, auto_reload=settings.ENVIRONMENT == "local"
+)
+
+
+def load_email_templates() -> None:
+    for name in email_templates.list_templates():
+        email_templates.get_template(name)
@@ -1,19 +1,84 @@
+import json
 import uuid
-from typing import Any
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
 
-from sqlmodel import Session, select
+from sqlalchemy import (
+    ColumnElement,
+    Dialect,
+    Row,
+    Select,
+    cast,
+    delete,
+    insert,
+    literal,
+    or_,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.core.cache import TTLCache, build_cache
+from app.core.config import settings
+from app.core.revocation import RevocationStore
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+from app.models import (
+    SEARCH_CONFIG,
+    CountType,
+    EmailOutbox,
+    Item,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemTombstone,
+    RevokedToken,
+    User,
+    UserAuth,
+    UserCreate,
+    UserUpdate,
+)
 
+# Columns the database fills in, left out of INSERT statements for it to do so
+SERVER_SET_FIELDS = {"created_at", "updated_at"}
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+# Exact item counts per owner, `None` holds the count of all items
+item_count_cache: TTLCache[uuid.UUID | None, int] = TTLCache(
+    maxsize=settings.ITEM_COUNT_CACHE_MAX_SIZE,
+    ttl=settings.ITEM_COUNT_CACHE_TTL_SECONDS,
+)
+user_auth_cache = build_cache(
+    prefix="user-auth",
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+revoked_tokens = RevocationStore(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+    sync_seconds=settings.TOKEN_REVOCATION_SYNC_SECONDS,
+)
+
+SelectT = TypeVar("SelectT", bound=Select[Any])
+
+
+def create_user(
+    *, session: Session, user_create: UserCreate, hashed_password: str | None = None
+) -> User:
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_create.password)
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": hashed_password}
     )
     session.add(db_obj)
     session.commit()
-    session.refresh(db_obj)
     return db_obj
 
 
@@ -27,16 +92,39 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
-    session.refresh(db_user)
+    invalidate_user_auth(user_id=db_user.id)
     return db_user
 
 
+def email_matches(email: str) -> ColumnElement[bool]:
+    """
+    Match the user with `email` in any case, served by the `lower(email)` index.
+    """
+    return func.lower(col(User.email)) == func.lower(email)
+
+
 def get_user_by_email(*, session: Session, email: str) -> User | None:
-    statement = select(User).where(User.email == email)
+    statement = select(User).where(email_matches(email))
     session_user = session.exec(statement).first()
     return session_user
 
 
+def get_user_auth(*, session: Session, user_id: uuid.UUID | str) -> UserAuth | None:
+    cached = user_auth_cache.get(str(user_id))
+    if cached is not None:
+        return UserAuth.model_validate_json(cached)
+    user = session.get(User, user_id)
+    if not user:
+        return None
+    user_auth = UserAuth.model_validate(user)
+    user_auth_cache.set(str(user_id), user_auth.model_dump_json())
+    return user_auth
+
+
+def invalidate_user_auth(*, user_id: uuid.UUID) -> None:
+    user_auth_cache.delete(str(user_id))
+
+
 def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
@@ -50,5 +138,495 @@ def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
     session.commit()
-    session.refresh(db_item)
+    invalidate_item_count(owner_id=owner_id)
     return db_item
+
+
+def create_items_bulk(
+    *, session: Session, items_in: list[ItemCreate], owner_id: uuid.UUID
+) -> list[Item]:
+    """
+    Insert all items with multi-row INSERT ... RETURNING statements, in one
+    transaction, the items come back in the order of `items_in`.
+    """
+    rows = [
+        Item.model_validate(item_in, update={"owner_id": owner_id}).model_dump(
+            exclude=SERVER_SET_FIELDS
+        )
+        for item_in in items_in
+    ]
+    statement = insert(Item).returning(Item, sort_by_parameter_order=True)
+    db_items = list(session.scalars(statement, rows))
+    # Detached, the commit doesn't expire them and they serialize without a
+    # SELECT per item
+    for db_item in db_items:
+        session.expunge(db_item)
+    session.commit()
+    invalidate_item_count(owner_id=owner_id)
+    return db_items
+
+
+def get_item_changes(
+    *,
+    session: Session,
+    owner_id: uuid.UUID | None,
+    after: tuple[datetime, uuid.UUID],
+    limit: int,
+) -> Sequence[Row[Any]]:
+    statement = _item_changes(owner_id=owner_id, after=after, limit=limit)
+    return session.execute(statement).all()
+
+
+def get_item_owners(
+    *, session: Session, ids: list[uuid.UUID]
+) -> dict[uuid.UUID, uuid.UUID]:
+    statement = select(Item.id, Item.owner_id).where(col(Item.id).in_(ids))
+    return dict(session.exec(statement).all())
+
+
+def _in_order(items: Sequence[Item], ids: list[uuid.UUID]) -> list[Item]:
+    # Items deleted meanwhile are left out
+    by_id = {item.id: item for item in items}
+    return [by_id[id] for id in ids if id in by_id]
+
+
+def update_items_bulk(
+    *, session: Session, items_in: list[ItemBulkUpdate]
+) -> list[Item]:
+    """
+    Update all items by primary key in one executemany UPDATE, each row only
+    sets the fields it was sent with. The items come back in the order of
+    `items_in`.
+    """
+    rows = [item_in.model_dump(exclude_unset=True) for item_in in items_in]
+    # Rows with nothing but the id have no columns to SET
+    if changed_rows := [row for row in rows if len(row) > 1]:
+        session.execute(update(Item), changed_rows)
+        session.commit()
+    ids = [row["id"] for row in rows]
+    statement = select(Item).where(col(Item.id).in_(ids))
+    return _in_order(session.exec(statement).all(), ids)
+
+
+def delete_items_bulk(*, session: Session, ids: list[uuid.UUID]) -> None:
+    statement = (
+        delete(Item)
+        .where(col(Item.id).in_(ids))
+        .returning(col(Item.owner_id))
+        .execution_options(synchronize_session=False)
+    )
+    owner_ids = set(session.scalars(statement))
+    session.commit()
+    for owner_id in owner_ids:
+        invalidate_item_count(owner_id=owner_id)
+
+
+def enqueue_email(
+    *, session: Session, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    """
+    Queue an email in the outbox, `app.email_worker` sends it.
+    """
+    assert settings.emails_enabled, "no provided configuration for email variables"
+    email = EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+    session.add(email)
+    session.commit()
+    return email
+
+
+def revoke_token(
+    *, session: Session, token_id: uuid.UUID, expires_at: datetime
+) -> bool:
+    """
+    Revoke a login session or a refresh token until `expires_at`, return
+    `False` when it already was revoked.
+    """
+    now = datetime.now(timezone.utc)
+    statement = (
+        pg_insert(RevokedToken)
+        .values(id=token_id, expires_at=expires_at, revoked_at=now)
+        .on_conflict_do_nothing()
+        .returning(col(RevokedToken.id))
+    )
+    revoked = session.execute(statement).first() is not None
+    # Rows only matter until the tokens they cover expire
+    session.execute(delete(RevokedToken).where(col(RevokedToken.expires_at) < now))
+    session.commit()
+    revoked_tokens.add(token_id)
+    return revoked
+
+
+def _revoked_since(since: datetime | None, now: datetime) -> Select[Any]:
+    statement = select(RevokedToken.id).where(col(RevokedToken.expires_at) > now)
+    if since is not None:
+        statement = statement.where(col(RevokedToken.revoked_at) >= since)
+    return statement
+
+
+def is_token_revoked(*, session: Session, token_id: uuid.UUID) -> bool:
+    """
+    Check `token_id` against the revocation store, only ids the Bloom filter
+    may hold cost a query.
+    """
+    if revoked_tokens.sync_due():
+        since = revoked_tokens.sync_since()
+        now = datetime.now(timezone.utc)
+        token_ids = session.execute(_revoked_since(since, now)).scalars().all()
+        revoked_tokens.apply_sync(token_ids, full=since is None, synced_at=now)
+    if not revoked_tokens.might_contain(token_id):
+        return False
+    return session.get(RevokedToken, token_id) is not None
+
+
+def _explain(statement: Select[Any], dialect: Dialect) -> tuple[str, dict[str, Any]]:
+    # Sent as the driver's SQL with bound parameters, search terms and other user
+    # input never end up inlined in the statement
+    compiled = statement.compile(dialect=dialect)
+    return f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+
+
+def _plan_rows(plan: Any) -> int:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_rows(*, session: Session, statement: Select[Any]) -> int:
+    """
+    Return the planner's row estimate for `statement` without running it.
+    """
+    explain, params = _explain(statement, session.get_bind().dialect)
+    return _plan_rows(
+        session.connection().exec_driver_sql(explain, params).scalar_one()
+    )
+
+
+def _search_query(q: str) -> ColumnElement[Any]:
+    return func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), q)
+
+
+def _item_changes(
+    *, owner_id: uuid.UUID | None, after: tuple[datetime, uuid.UUID], limit: int
+) -> Select[Any]:
+    """
+    Items updated and tombstones of items deleted after the `(changed_at, id)`
+    position `after`, in that order, with the item or `None` for a deletion.
+    """
+    position = tuple_(literal(after[0]), literal(after[1]))
+    updated: Select[Any] = select(
+        col(Item.updated_at).label("changed_at"), col(Item.id).label("id")
+    ).where(tuple_(col(Item.updated_at), col(Item.id)) > position)
+    deleted: Select[Any] = select(
+        col(ItemTombstone.deleted_at).label("changed_at"),
+        col(ItemTombstone.id).label("id"),
+    ).where(tuple_(col(ItemTombstone.deleted_at), col(ItemTombstone.id)) > position)
+    if owner_id:
+        updated = updated.where(col(Item.owner_id) == owner_id)
+        deleted = deleted.where(col(ItemTombstone.owner_id) == owner_id)
+    changes = union_all(updated, deleted).subquery()
+    return (
+        select(changes.c.changed_at, changes.c.id, Item)
+        .outerjoin(Item, col(Item.id) == changes.c.id)
+        .order_by(changes.c.changed_at, changes.c.id)
+        .limit(limit)
+    )
+
+
+def prune_item_tombstones(*, session: Session) -> None:
+    """
+    Delete the tombstones older than `ITEM_TOMBSTONE_RETENTION_DAYS`, run
+    periodically by `app.tombstone_worker`.
+    """
+    retention = timedelta(days=settings.ITEM_TOMBSTONE_RETENTION_DAYS)
+    cutoff = datetime.now(timezone.utc) - retention
+    statement = delete(ItemTombstone).where(col(ItemTombstone.deleted_at) < cutoff)
+    session.exec(statement)  # type: ignore
+    session.commit()
+
+
+def item_search_filter(q: str) -> ColumnElement[bool]:
+    """
+    Match items with the words of `q` in their title or description, or with a
+    title that starts with `q` or is close to it, each one served by a GIN index.
+    """
+    return or_(
+        col(Item.search_vector).bool_op("@@")(_search_query(q)),
+        col(Item.title).bool_op("%")(q),
+        col(Item.title).istartswith(q, autoescape=True),
+    )
+
+
+def item_search_rank(q: str) -> ColumnElement[Any]:
+    return func.ts_rank_cd(col(Item.search_vector), _search_query(q)) + func.similarity(
+        col(Item.title), q
+    )
+
+
+def _filter_items(
+    statement: SelectT, *, owner_id: uuid.UUID | None, q: str | None
+) -> SelectT:
+    if owner_id:
+        statement = statement.where(col(Item.owner_id) == owner_id)
+    if q:
+        statement = statement.where(item_search_filter(q))
+    return statement
+
+
+def search_items(
+    *,
+    session: Session,
+    q: str,
+    owner_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Sequence[Item]:
+    """
+    Return the items matching `q`, best matches first.
+    """
+    statement = _filter_items(select(Item), owner_id=owner_id, q=q)
+    statement = statement.order_by(item_search_rank(q).desc(), col(Item.id))
+    return session.exec(statement.offset(skip).limit(limit)).all()
+
+
+def count_items(
+    *, session: Session, owner_id: uuid.UUID | None = None, q: str | None = None
+) -> tuple[int | None, CountType]:
+    if settings.LIST_COUNT_STRATEGY == "none":
+        return None, "none"
+    if settings.LIST_COUNT_STRATEGY == "estimated":
+        statement = _filter_items(select(Item.id), owner_id=owner_id, q=q)
+        return estimate_rows(session=session, statement=statement), "estimated"
+    count_statement = _filter_items(
+        select(func.count()).select_from(Item), owner_id=owner_id, q=q
+    )
+    if q:
+        # Searches vary too much for their counts to be worth caching
+        return session.exec(count_statement).one(), "exact"
+    count = item_count_cache.get(owner_id)
+    if count is None:
+        count = session.exec(count_statement).one()
+        item_count_cache.set(owner_id, count)
+    return count, "exact"
+
+
+def invalidate_item_count(*, owner_id: uuid.UUID) -> None:
+    item_count_cache.delete(owner_id)
+    item_count_cache.delete(None)
+
+
+def count_users(*, session: Session) -> tuple[int | None, CountType]:
+    if settings.LIST_COUNT_STRATEGY == "none":
+        return None, "none"
+    if settings.LIST_COUNT_STRATEGY == "estimated":
+        statement = select(User.id)
+        return estimate_rows(session=session, statement=statement), "estimated"
+    count = session.exec(select(func.count()).select_from(User)).one()
+    return count, "exact"
+
+
+# Async versions of the functions above, for the async database engine
+
+
+async def create_user_async(*, session: AsyncSession, user_create: UserCreate) -> User:
+    hashed_password = await get_password_hash_async(user_create.password)
+    db_obj = User.model_validate(
+        user_create, update={"hashed_password": hashed_password}
+    )
+    session.add(db_obj)
+    await session.commit()
+    return db_obj
+
+
+async def update_user_async(
+    *, session: AsyncSession, db_user: User, user_in: UserUpdate
+) -> Any:
+    user_data = user_in.model_dump(exclude_unset=True)
+    extra_data = {}
+    if "password" in user_data:
+        password = user_data["password"]
+        hashed_password = await get_password_hash_async(password)
+        extra_data["hashed_password"] = hashed_password
+    db_user.sqlmodel_update(user_data, update=extra_data)
+    session.add(db_user)
+    await session.commit()
+    invalidate_user_auth(user_id=db_user.id)
+    return db_user
+
+
+async def get_user_by_email_async(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(email_matches(email))
+    session_user = (await session.exec(statement)).first()
+    return session_user
+
+
+async def get_user_auth_async(
+    *, session: AsyncSession, user_id: uuid.UUID | str
+) -> UserAuth | None:
+    cached = user_auth_cache.get(str(user_id))
+    if cached is not None:
+        return UserAuth.model_validate_json(cached)
+    user = await session.get(User, user_id)
+    if not user:
+        return None
+    user_auth = UserAuth.model_validate(user)
+    user_auth_cache.set(str(user_id), user_auth.model_dump_json())
+    return user_auth
+
+
+async def authenticate_async(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email_async(session=session, email=email)
+    if not db_user:
+        return None
+    if not await verify_password_async(password, db_user.hashed_password):
+        return None
+    return db_user
+
+
+async def create_item_async(
+    *, session: AsyncSession, item_in: ItemCreate, owner_id: uuid.UUID
+) -> Item:
+    db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
+    session.add(db_item)
+    await session.commit()
+    invalidate_item_count(owner_id=owner_id)
+    return db_item
+
+
+async def create_items_bulk_async(
+    *, session: AsyncSession, items_in: list[ItemCreate], owner_id: uuid.UUID
+) -> list[Item]:
+    rows = [
+        Item.model_validate(item_in, update={"owner_id": owner_id}).model_dump(
+            exclude=SERVER_SET_FIELDS
+        )
+        for item_in in items_in
+    ]
+    statement = insert(Item).returning(Item, sort_by_parameter_order=True)
+    db_items = list(await session.scalars(statement, rows))
+    for db_item in db_items:
+        session.expunge(db_item)
+    await session.commit()
+    invalidate_item_count(owner_id=owner_id)
+    return db_items
+
+
+async def get_item_changes_async(
+    *,
+    session: AsyncSession,
+    owner_id: uuid.UUID | None,
+    after: tuple[datetime, uuid.UUID],
+    limit: int,
+) -> Sequence[Row[Any]]:
+    statement = _item_changes(owner_id=owner_id, after=after, limit=limit)
+    return (await session.execute(statement)).all()
+
+
+async def get_item_owners_async(
+    *, session: AsyncSession, ids: list[uuid.UUID]
+) -> dict[uuid.UUID, uuid.UUID]:
+    statement = select(Item.id, Item.owner_id).where(col(Item.id).in_(ids))
+    return dict((await session.exec(statement)).all())
+
+
+async def update_items_bulk_async(
+    *, session: AsyncSession, items_in: list[ItemBulkUpdate]
+) -> list[Item]:
+    rows = [item_in.model_dump(exclude_unset=True) for item_in in items_in]
+    # Rows with nothing but the id have no columns to SET
+    if changed_rows := [row for row in rows if len(row) > 1]:
+        await session.execute(update(Item), changed_rows)
+        await session.commit()
+    ids = [row["id"] for row in rows]
+    statement = select(Item).where(col(Item.id).in_(ids))
+    return _in_order((await session.exec(statement)).all(), ids)
+
+
+async def delete_items_bulk_async(
+    *, session: AsyncSession, ids: list[uuid.UUID]
+) -> None:
+    statement = (
+        delete(Item)
+        .where(col(Item.id).in_(ids))
+        .returning(col(Item.owner_id))
+        .execution_options(synchronize_session=False)
+    )
+    owner_ids = set(await session.scalars(statement))
+    await session.commit()
+    for owner_id in owner_ids:
+        invalidate_item_count(owner_id=owner_id)
+
+
+async def enqueue_email_async(
+    *, session: AsyncSession, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    assert settings.emails_enabled, "no provided configuration for email variables"
+    email = EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+    session.add(email)
+    await session.commit()
+    return email
+
+
+async def is_token_revoked_async(*, session: AsyncSession, token_id: uuid.UUID) -> bool:
+    if revoked_tokens.sync_due():
+        since = revoked_tokens.sync_since()
+        now = datetime.now(timezone.utc)
+        result = await session.execute(_revoked_since(since, now))
+        revoked_tokens.apply_sync(
+            result.scalars().all(), full=since is None, synced_at=now
+        )
+    if not revoked_tokens.might_contain(token_id):
+        return False
+    return await session.get(RevokedToken, token_id) is not None
+
+
+async def estimate_rows_async(*, session: AsyncSession, statement: Select[Any]) -> int:
+    explain, params = _explain(statement, session.get_bind().dialect)
+    connection = await session.connection()
+    return _plan_rows((await connection.exec_driver_sql(explain, params)).scalar_one())
+
+
+async def search_items_async(
+    *,
+    session: AsyncSession,
+    q: str,
+    owner_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Sequence[Item]:
+    statement = _filter_items(select(Item), owner_id=owner_id, q=q)
+    statement = statement.order_by(item_search_rank(q).desc(), col(Item.id))
+    return (await session.exec(statement.offset(skip).limit(limit))).all()
+
+
+async def count_items_async(
+    *, session: AsyncSession, owner_id: uuid.UUID | None = None, q: str | None = None
+) -> tuple[int | None, CountType]:
+    if settings.LIST_COUNT_STRATEGY == "none":
+        return None, "none"
+    if settings.LIST_COUNT_STRATEGY == "estimated":
+        statement = _filter_items(select(Item.id), owner_id=owner_id, q=q)
+        estimate = await estimate_rows_async(session=session, statement=statement)
+        return estimate, "estimated"
+    count_statement = _filter_items(
+        select(func.count()).select_from(Item), owner_id=owner_id, q=q
+    )
+    if q:
+        return (await session.exec(count_statement)).one(), "exact"
+    count = item_count_cache.get(owner_id)
+    if count is None:
+        count = (await session.exec(count_statement)).one()
+        item_count_cache.set(owner_id, count)
+    return count, "exact"
+
+
+async def count_users_async(*, session: AsyncSession) -> tuple[int | None, CountType]:
+    if settings.LIST_COUNT_STRATEGY == "none":
+        return None, "none"
+    if settings.LIST_COUNT_STRATEGY == "estimated":
+        statement = select(User.id)
+        estimate = await estimate_rows_async(session=session, statement=statement)
+        return estimate, "estimated"
+    count = (await session.exec(select(func.count()).select_from(User))).one()
+    return count, "exact"
@@ -0,0 +1,131 @@
+import logging
+import random
+import signal
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session, col, delete, or_, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.smtp import smtp_pool
+from app.models import EmailOutbox
+from app.utils import OutgoingEmail, send_emails_batch
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """
+    Seconds to wait before retrying an email that failed `attempts` times, doubling
+    each time up to the max, with jitter so that failures don't retry in lockstep.
+    """
+    delay = min(
+        settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS,
+    )
+    return random.uniform(delay / 2, delay)
+
+
+def send_due_emails(session: Session) -> int:
+    """
+    Send a batch of due emails over one SMTP session and record the outcome of
+    each, return the number of emails tried.
+
+    The batch stays locked until it is committed, other workers skip it. An email
+    is sent again if the worker dies before the commit.
+    """
+    now = datetime.now(timezone.utc)
+    statement = (
+        select(EmailOutbox)
+        .where(
+            col(EmailOutbox.sent_at).is_(None),
+            col(EmailOutbox.failed_at).is_(None),
+            col(EmailOutbox.next_attempt_at) <= now,
+            col(EmailOutbox.attempts) < settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        )
+        .order_by(col(EmailOutbox.next_attempt_at))
+        .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    emails = session.exec(statement).all()
+    if not emails:
+        return 0
+    errors = send_emails_batch(
+        [
+            OutgoingEmail(
+                email_to=email.email_to,
+                subject=email.subject,
+                html_content=email.html_content,
+            )
+            for email in emails
+        ]
+    )
+    sent_at = datetime.now(timezone.utc)
+    for email, error in zip(emails, errors, strict=True):
+        email.attempts += 1
+        if error:
+            logger.warning(
+                f"email {email.id} failed, attempt {email.attempts}: {error}"
+            )
+            email.last_error = str(error)
+            if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                # Out of the pending index, pruned later like sent emails
+                email.failed_at = sent_at
+            else:
+                email.next_attempt_at = now + timedelta(
+                    seconds=backoff_seconds(email.attempts)
+                )
+        else:
+            email.sent_at = sent_at
+        session.add(email)
+    session.commit()
+    return len(emails)
+
+
+def prune_outbox(session: Session) -> None:
+    """
+    Delete the emails sent or given up on more than
+    `EMAIL_OUTBOX_RETENTION_DAYS` ago.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.EMAIL_OUTBOX_RETENTION_DAYS
+    )
+    statement = delete(EmailOutbox).where(
+        or_(
+            col(EmailOutbox.sent_at) < cutoff,
+            col(EmailOutbox.failed_at) < cutoff,
+        )
+    )
+    session.exec(statement)  # type: ignore
+    session.commit()
+
+
+def main() -> None:
+    logger.info("Sending queued emails")
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    next_prune = 0.0
+    while not stopping.is_set():
+        try:
+            with Session(engine) as session:
+                if time.monotonic() >= next_prune:
+                    # Not retried before the next period when it fails
+                    next_prune = time.monotonic() + settings.EMAIL_OUTBOX_PRUNE_SECONDS
+                    prune_outbox(session)
+                tried = send_due_emails(session)
+        except Exception:
+            logger.exception("Sending queued emails failed")
+            tried = 0
+        # A full batch means more emails are probably due already
+        if tried < settings.EMAIL_OUTBOX_BATCH_SIZE:
+            stopping.wait(settings.EMAIL_OUTBOX_POLL_SECONDS)
+    smtp_pool.close()
+    logger.info("Stopped sending queued emails")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import logging
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import case, func
+from sqlmodel import Session, col, delete, select, update
+
+from app.core.db import engine
+from app.models import Item, User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def duplicate_users(session: Session) -> Sequence[Any]:
+    """
+    `(id, email, keeper_id, keeper_email)` of the users whose email only
+    differs in case from the one of another user, with the user they are
+    merged into: a superuser before others, then an active one.
+    """
+    email = func.lower(User.email)
+    ranked = select(
+        col(User.id),
+        col(User.email),
+        func.first_value(User.id)
+        .over(
+            partition_by=email,
+            order_by=(
+                col(User.is_superuser).desc(),
+                col(User.is_active).desc(),
+                col(User.id),
+            ),
+        )
+        .label("keeper_id"),
+    ).subquery()
+    keeper = select(User.id, User.email).subquery()
+    statement = (
+        select(
+            ranked.c.id,
+            ranked.c.email,
+            ranked.c.keeper_id,
+            keeper.c.email.label("keeper_email"),
+        )
+        .join(keeper, keeper.c.id == ranked.c.keeper_id)
+        .where(ranked.c.id != ranked.c.keeper_id)
+        .order_by(keeper.c.email, ranked.c.email)
+    )
+    return session.exec(statement).all()
+
+
+def merge_users(session: Session, duplicates: Sequence[Any]) -> None:
+    """
+    Move the items of each duplicate user to the user they are merged into,
+    then delete the duplicate. Each batch commits on its own, so rows stay
+    locked for one batch only.
+    """
+    for start in range(0, len(duplicates), BATCH_SIZE):
+        batch = duplicates[start : start + BATCH_SIZE]
+        keeper_ids: dict[uuid.UUID, uuid.UUID] = {
+            row.id: row.keeper_id for row in batch
+        }
+        statement = (
+            update(Item)
+            .where(col(Item.owner_id).in_(keeper_ids))
+            .values(owner_id=case(keeper_ids, value=col(Item.owner_id)))
+        )
+        session.exec(statement)  # type: ignore
+        session.exec(delete(User).where(col(User.id).in_(keeper_ids)))  # type: ignore
+        session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Merge the users whose emails only differ in case, which migration "
+            "3b7e91d4c2a6 refuses to make unique. Lists them unless --apply is "
+            "passed."
+        )
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="move their items and delete the duplicate users",
+    )
+    args = parser.parse_args()
+    with Session(engine) as session:
+        duplicates = duplicate_users(session)
+        for row in duplicates:
+            logger.info(f"{row.email} ({row.id}) is merged into {row.keeper_email}")
+        if not duplicates:
+            logger.info("No users to merge")
+        elif args.apply:
+            merge_users(session, duplicates)
+            logger.info(f"Merged {len(duplicates)} users")
+        else:
+            logger.info("Nothing changed, pass --apply to merge them")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
 import uuid
+from datetime import datetime, timezone
+from typing import Literal
 
 from pydantic import EmailStr
+from sqlalchemy import Column, DateTime, FetchedValue, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel
 
+# Text search configuration of `Item.search_vector` and of search queries
+SEARCH_CONFIG = "english"
+
+# Which kind of number the `count` of a page holds
+CountType = Literal["exact", "estimated", "none"]
+
 
 # Shared properties
 class UserBase(SQLModel):
-    email: EmailStr = Field(unique=True, index=True, max_length=255)
+    email: EmailStr = Field(max_length=255)
     is_active: bool = True
     is_superuser: bool = False
     full_name: str | None = Field(default=None, max_length=255)
@@ -41,19 +51,60 @@ class UpdatePassword(SQLModel):
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
+    __table_args__ = (
+        # Emails are unique and looked up whatever their case, see
+        # `crud.email_matches`
+        Index("ix_user_email_lower", text("lower(email)"), unique=True),
+    )
+    # INSERT and UPDATE return what the database set, instead of a SELECT
+    # when it is read
+    __mapper_args__ = {"eager_defaults": True}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
+    # Bumped by every UPDATE of the row, the ETag of what it looks like now
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": "1", "onupdate": text("version + 1")},
+    )
+    # Set by the database, `updated_at` by a trigger on every UPDATE
+    created_at: datetime | None = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": text("now()")},
+    )
+    updated_at: datetime | None = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={
+            "server_default": text("now()"),
+            "server_onupdate": FetchedValue(),
+        },
+    )
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
 
 
 # Properties to return via API, id is always required
 class UserPublic(UserBase):
     id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
+
+
+# Auth-relevant fields of a user, cached between requests
+class UserAuth(SQLModel):
+    id: uuid.UUID
+    is_active: bool
+    is_superuser: bool
 
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    count_type: CountType = "exact"
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -72,12 +123,62 @@ class ItemUpdate(ItemBase):
     title: str | None = Field(default=None, min_length=1, max_length=255)  # type: ignore
 
 
+# Properties to receive on bulk item update, one per item
+class ItemBulkUpdate(ItemUpdate):
+    id: uuid.UUID
+
+
 # Database model, database table inferred from class name
 class Item(ItemBase, table=True):
+    __table_args__ = (
+        # Keyset pagination of an owner's items walks (owner_id, id) in order
+        Index("ix_item_owner_id_id", "owner_id", "id"),
+        # Full-text matches on the search document, trigram and prefix matches
+        # on the title
+        Index("ix_item_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_item_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        # Changes since a point in time, of one owner or of all items, see
+        # `crud.get_item_changes`
+        Index("ix_item_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+        Index("ix_item_updated_at_id", "updated_at", "id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
+    # Bumped by every UPDATE of the row, the ETag of what it looks like now
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": "1", "onupdate": text("version + 1")},
+    )
+    # Set by the database, `updated_at` by a trigger on every UPDATE
+    created_at: datetime | None = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": text("now()")},
+    )
+    updated_at: datetime | None = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={
+            "server_default": text("now()"),
+            "server_onupdate": FetchedValue(),
+        },
+    )
+    # Set by a trigger from title and description, with the weights of
+    # migration 8c2e5d31a7f4, never written
+    search_vector: str | None = Field(
+        default=None, exclude=True, sa_column=Column(TSVECTOR)
+    )
     owner: User | None = Relationship(back_populates="items")
 
 
@@ -85,11 +186,117 @@ class Item(ItemBase, table=True):
 class ItemPublic(ItemBase):
     id: uuid.UUID
     owner_id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
 
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    count: int | None
+    count_type: CountType = "exact"
+    next_cursor: str | None = None
+
+
+# A row of a bulk request that was not applied, `index` is its position
+class BulkItemError(SQLModel):
+    index: int
+    id: uuid.UUID | None = None
+    detail: str
+
+
+class ItemsBulkPublic(SQLModel):
+    data: list[ItemPublic]
+    errors: list[BulkItemError] = []
+
+
+class ItemsBulkDeleted(SQLModel):
+    ids: list[uuid.UUID]
+    errors: list[BulkItemError] = []
+
+
+# Id of a deleted item, written by a trigger when the item is deleted and kept
+# for `ITEM_TOMBSTONE_RETENTION_DAYS` so syncing clients learn about it
+class ItemTombstone(SQLModel, table=True):
+    __tablename__ = "item_tombstone"
+    __table_args__ = (
+        Index(
+            "ix_item_tombstone_owner_id_deleted_at_id", "owner_id", "deleted_at", "id"
+        ),
+        Index("ix_item_tombstone_deleted_at_id", "deleted_at", "id"),
+    )
+
+    id: uuid.UUID = Field(primary_key=True)
+    # The owner may be deleted too, it isn't a foreign key
+    owner_id: uuid.UUID
+    deleted_at: datetime = Field(sa_type=DateTime(timezone=True))  # type: ignore
+
+
+# Items created, updated or deleted since the position of a sync
+class ItemChanges(SQLModel):
+    data: list[ItemPublic]
+    deleted: list[uuid.UUID]
+    # Pass as `cursor` for the following changes, now when `has_more` or in
+    # the next sync
+    next_cursor: str
+    has_more: bool
+
+
+# Database model of a queued email, sent by app.email_worker
+class EmailOutbox(SQLModel, table=True):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # The worker only looks for pending emails in the order they are due
+        Index(
+            "ix_email_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text("sent_at IS NULL AND failed_at IS NULL"),
+        ),
+        # And prunes the ones that are done
+        Index(
+            "ix_email_outbox_sent_at",
+            "sent_at",
+            postgresql_where=text("sent_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_email_outbox_failed_at",
+            "failed_at",
+            postgresql_where=text("failed_at IS NOT NULL"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str
+    html_content: str
+    attempts: int = 0
+    next_attempt_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    sent_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    # Set when the last attempt failed, the email is not tried again
+    failed_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    last_error: str | None = None
+
+
+# Ids of ended login sessions and of used refresh tokens, kept until every token
+# they cover has expired
+class RevokedToken(SQLModel, table=True):
+    __tablename__ = "revoked_token"
+
+    id: uuid.UUID = Field(primary_key=True)
+    expires_at: datetime = Field(sa_type=DateTime(timezone=True), index=True)  # type: ignore
+    revoked_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),  # type: ignore
+        index=True,
+    )
 
 
 # Generic message
@@ -101,11 +308,28 @@ class Message(SQLModel):
 class Token(SQLModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequest(SQLModel):
+    refresh_token: str
 
 
 # Contents of JWT token
 class TokenPayload(SQLModel):
     sub: str | None = None
+    # Login session, tokens issued before sessions existed have none
+    sid: uuid.UUID | None = None
+    type: Literal["access"] = "access"
+
+
+# Contents of a refresh token
+class RefreshTokenPayload(SQLModel):
+    sub: uuid.UUID
+    sid: uuid.UUID
+    jti: uuid.UUID
+    exp: int
+    type: Literal["refresh"]
 
 
 class NewPassword(SQLModel):
@@ -0,0 +1,31 @@
+import logging
+import signal
+import threading
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logger.info("Pruning item tombstones")
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    while not stopping.is_set():
+        try:
+            with Session(engine) as session:
+                crud.prune_item_tombstones(session=session)
+        except Exception:
+            logger.exception("Pruning item tombstones failed")
+        stopping.wait(settings.ITEM_TOMBSTONE_PRUNE_SECONDS)
+    logger.info("Stopped pruning item tombstones")
+
+
+if __name__ == "__main__":
+    main()
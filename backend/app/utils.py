@@ -1,21 +1,27 @@
 import logging
+import smtplib
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 from typing import Any
 
 import emails  # type: ignore
 import jwt
-from jinja2 import Template
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
 from app.core.config import settings
+from app.core.smtp import smtp_pool
+from app.core.templates import email_templates
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class EmailDeliveryError(Exception):
+    pass
+
+
 @dataclass
 class EmailData:
     html_content: str
@@ -23,11 +29,48 @@ class EmailData:
 
 
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
-    return html_content
+    return email_templates.get_template(template_name).render(context)
+
+
+@dataclass
+class OutgoingEmail:
+    email_to: str
+    subject: str = ""
+    html_content: str = ""
+
+
+def _deliver(smtp: Any, email: OutgoingEmail) -> EmailDeliveryError | None:
+    message = emails.Message(
+        subject=email.subject,
+        html=email.html_content,
+        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+    )
+    try:
+        response = message.send(to=email.email_to, smtp=smtp)
+    except (OSError, smtplib.SMTPException) as e:
+        error = EmailDeliveryError(str(e))
+    else:
+        logger.info(f"send email result: {response}")
+        if response.success:
+            return None
+        error = EmailDeliveryError(
+            f"{response.status_code} {response.status_text or response.error}"
+        )
+    # The session may be unusable, the next email connects again
+    smtp.close()
+    return error
+
+
+def send_emails_batch(
+    messages: Sequence[OutgoingEmail],
+) -> list[EmailDeliveryError | None]:
+    """
+    Send all `messages` over one pooled SMTP session, return the error of each
+    one, `None` for the ones that were sent.
+    """
+    assert settings.emails_enabled, "no provided configuration for email variables"
+    with smtp_pool.connection() as smtp:
+        return [_deliver(smtp, message) for message in messages]
 
 
 def send_email(
@@ -36,23 +79,11 @@ def send_email(
     subject: str = "",
     html_content: str = "",
 ) -> None:
-    assert settings.emails_enabled, "no provided configuration for email variables"
-    message = emails.Message(
-        subject=subject,
-        html=html_content,
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+    (error,) = send_emails_batch(
+        [OutgoingEmail(email_to=email_to, subject=subject, html_content=html_content)]
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
-    logger.info(f"send email result: {response}")
+    if error:
+        raise error
 
 
 def generate_test_email(email_to: str) -> EmailData:
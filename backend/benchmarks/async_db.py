@@ -0,0 +1,82 @@
+"""
+Throughput of `GET /items/` at a given number of concurrent connections.
+
+Start the backend with the stack under test, for example:
+
+    USE_ASYNC_DB=false fastapi run app/main.py
+    USE_ASYNC_DB=true fastapi run app/main.py
+
+then, from `./backend/`, run once against each:
+
+    python -m benchmarks.async_db --url http://localhost:8000 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.utils import logger, report
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    deadline: float,
+    samples: list[float],
+    errors: list[int],
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            r = await client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+            r.raise_for_status()
+        except httpx.HTTPError:
+            errors.append(1)
+            continue
+        samples.append((time.perf_counter() - start) * 1000)
+
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        r = await client.post(
+            f"{settings.API_V1_STR}/login/access-token",
+            data={
+                "username": settings.FIRST_SUPERUSER,
+                "password": settings.FIRST_SUPERUSER_PASSWORD,
+            },
+        )
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        samples: list[float] = []
+        errors: list[int] = []
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(
+                worker(client, headers, deadline, samples, errors)
+                for _ in range(args.concurrency)
+            )
+        )
+    report(f"GET /items/ x{args.concurrency}", samples)
+    logger.info(
+        f"  {len(samples) / args.duration:.1f} requests/s, {len(errors)} errors"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=30)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
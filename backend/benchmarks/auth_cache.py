@@ -0,0 +1,62 @@
+"""
+Count the DB round trips of authenticated requests with a cold and a warm user
+auth cache.
+
+Run from `./backend/` against a migrated database:
+
+    python -m benchmarks.auth_cache --requests 500
+"""
+
+import argparse
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import crud
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from benchmarks.utils import logger, report, timed
+from tests.utils.utils import get_superuser_token_headers
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_args: Any) -> None:
+        self.count += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    url = f"{settings.API_V1_STR}/items/"
+    with TestClient(app) as client:
+        headers = get_superuser_token_headers(client)
+
+        def cold() -> None:
+            # Only the in-process cache can be emptied from here
+            assert isinstance(crud.user_auth_cache, TTLCache)
+            crud.user_auth_cache.clear()
+            client.get(url, headers=headers)
+
+        def warm() -> None:
+            client.get(url, headers=headers)
+
+        for name, fn in [("cold auth cache", cold), ("warm auth cache", warm)]:
+            counter.count = 0
+            samples = timed(fn, repeat=args.requests, warmup=0)
+            report(f"GET /items/ {name}", samples)
+            logger.info(f"  {counter.count / args.requests:.2f} statements/request")
+    event.remove(engine, "before_cursor_execute", counter)
+
+
+if __name__ == "__main__":
+    main()
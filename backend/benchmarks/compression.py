@@ -0,0 +1,82 @@
+"""
+Compare bytes on the wire and compression time of an items list response with
+each encoding the compression middleware supports.
+
+Run from `./backend/`, no database needed, brotli and zstd are measured when
+their packages are installed:
+
+    python -m benchmarks.compression --limits 100 1000
+"""
+
+import argparse
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import partial
+
+from app.core.compression import OPTIONAL_PACKAGES, Compressor, compressor_factories
+from app.models import ItemPublic, ItemsPublic
+from benchmarks.utils import logger, report, timed
+
+
+def items_page(limit: int) -> bytes:
+    owner_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    items = [
+        ItemPublic(
+            id=uuid.uuid4(),
+            owner_id=owner_id,
+            title=f"Benchmark item {i}",
+            description=f"Description of benchmark item {i}",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(limit)
+    ]
+    page = ItemsPublic(data=items, count=limit * 10, next_cursor="cursor")
+    return page.model_dump_json().encode()
+
+
+def compress(body: bytes, factory: Callable[[], Compressor]) -> bytes:
+    compressor = factory()
+    return compressor.compress(body) + compressor.finish()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=4)
+    parser.add_argument("--zstd-level", type=int, default=3)
+    args = parser.parse_args()
+
+    encodings = ["gzip"]
+    for encoding, package in OPTIONAL_PACKAGES.items():
+        try:
+            __import__(package)
+        except ImportError:
+            logger.info(f"{package} is not installed, skipping {encoding}")
+        else:
+            encodings.append(encoding)
+    factories = compressor_factories(
+        encodings=encodings,
+        gzip_level=args.gzip_level,
+        brotli_quality=args.brotli_quality,
+        zstd_level=args.zstd_level,
+    )
+    for limit in args.limits:
+        body = items_page(limit)
+        logger.info(f"limit={limit}: identity {len(body):>9} bytes")
+        for encoding, factory in factories.items():
+            size = len(compress(body, factory))
+            samples = timed(partial(compress, body, factory), repeat=args.repeat)
+            logger.info(
+                f"  {encoding:<6} {size:>9} bytes "
+                f"({100 * size / len(body):5.1f}% of identity)"
+            )
+            report(f"  {encoding} compress limit={limit}", samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare the latency of sending an email inside the request with queueing it in
+the outbox, against a local SMTP server that takes `--smtp-delay` seconds per
+message, then time the worker draining the queue.
+
+Run from `./backend/` against a migrated database:
+
+    python -m benchmarks.email_outbox --smtp-delay 0.5
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete
+
+from app.core.config import settings
+from app.core.db import engine
+from app.email_worker import send_due_emails
+from app.main import app
+from app.models import EmailOutbox
+from app.utils import send_email
+from benchmarks.utils import logger, report, timed
+from tests.utils.smtp import local_smtp_server
+from tests.utils.utils import get_superuser_token_headers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--smtp-delay", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with local_smtp_server(delay=args.smtp_delay) as inbox:
+        report(
+            "send in the request",
+            timed(
+                lambda: send_email(
+                    email_to="bench@example.com", subject="Bench", html_content="Hi"
+                ),
+                repeat=args.repeat,
+            ),
+        )
+
+        with Session(engine) as session:
+            session.execute(delete(EmailOutbox))
+            session.commit()
+        url = f"{settings.API_V1_STR}/utils/test-email/"
+        with TestClient(app) as client:
+            headers = get_superuser_token_headers(client)
+            params = {"email_to": "bench@example.com"}
+            report(
+                "queue in the request",
+                timed(
+                    lambda: client.post(url, headers=headers, params=params),
+                    repeat=args.repeat,
+                ),
+            )
+
+        sent = len(inbox.messages)
+        start = time.perf_counter()
+        with Session(engine) as session:
+            while send_due_emails(session):
+                pass
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"worker sent {len(inbox.messages) - sent} queued emails "
+            f"in {elapsed:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare renders per second of the email templates when every render reads and
+compiles the template file, as before the template registry, and when the
+compiled templates are kept in memory.
+
+Run from `./backend/`, no database needed:
+
+    python -m benchmarks.email_templates --renders 2000
+"""
+
+import argparse
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from jinja2 import Template
+
+from app.core.templates import EMAIL_TEMPLATES_DIR, load_email_templates
+from app.utils import generate_new_account_email, generate_reset_password_email
+from benchmarks.utils import logger, report, timed
+
+
+def render_uncached(template_name: str, context: dict[str, Any]) -> str:
+    template_str = (EMAIL_TEMPLATES_DIR / template_name).read_text()
+    return Template(template_str).render(context)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    load_email_templates()
+    reset_context = {
+        "project_name": "Bench",
+        "username": "user@example.com",
+        "email": "user@example.com",
+        "valid_hours": 48,
+        "link": "http://localhost/reset-password?token=x",
+    }
+    account_context = {
+        "project_name": "Bench",
+        "username": "user@example.com",
+        "password": "secret",
+        "email": "user@example.com",
+        "link": "http://localhost",
+    }
+    cases: list[tuple[str, Callable[[], Any]]] = [
+        (
+            "reset_password compiled per render",
+            partial(render_uncached, "reset_password.html", reset_context),
+        ),
+        (
+            "generate_reset_password_email",
+            partial(
+                generate_reset_password_email,
+                email_to="user@example.com",
+                email="user@example.com",
+                token="x",
+            ),
+        ),
+        (
+            "new_account compiled per render",
+            partial(render_uncached, "new_account.html", account_context),
+        ),
+        (
+            "generate_new_account_email",
+            partial(
+                generate_new_account_email,
+                email_to="user@example.com",
+                username="user@example.com",
+                password="secret",
+            ),
+        ),
+    ]
+    for name, fn in cases:
+        samples = timed(fn, repeat=args.renders)
+        report(name, samples)
+        logger.info(f"  {1000 * len(samples) / sum(samples):.0f} renders/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Peak memory and throughput of streaming `GET /items/export` over many rows.
+
+Run from `./backend/` against a migrated database:
+
+    python -m benchmarks.export --rows 1000000
+"""
+
+import argparse
+import resource
+import sys
+import time
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from benchmarks.utils import get_superuser, logger, seed_items
+from tests.utils.utils import get_superuser_token_headers
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        superuser = get_superuser(session)
+        seed_items(session, owner_id=superuser.id, total=args.rows)
+
+    with TestClient(app) as client:
+        headers = get_superuser_token_headers(client)
+        baseline = peak_rss_mb()
+        lines = 0
+        size = 0
+        start = time.perf_counter()
+        with client.stream(
+            "GET",
+            f"{settings.API_V1_STR}/items/export",
+            headers=headers,
+            params={"format": args.format},
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                lines += 1
+                size += len(line) + 1
+        elapsed = time.perf_counter() - start
+
+    logger.info(f"exported {lines} lines, {size / 1024 / 1024:.1f} MiB")
+    logger.info(f"  {lines / elapsed:.0f} lines/s in {elapsed:.1f}s")
+    logger.info(
+        f"  peak RSS {peak_rss_mb():.1f} MiB, "
+        f"{peak_rss_mb() - baseline:.1f} MiB over the {baseline:.1f} MiB baseline"
+    )
+
+
+if __name__ == "__main__":
+    main()
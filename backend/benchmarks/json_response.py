@@ -0,0 +1,50 @@
+"""
+Measure requests per second of `GET /items/`, where most of the time goes into
+turning the page of items into JSON.
+
+Run from `./backend/` against a migrated database:
+
+    python -m benchmarks.json_response --limit 100 --requests 500
+"""
+
+import argparse
+from functools import partial
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from benchmarks.utils import get_superuser, logger, report, seed_items, timed
+from tests.utils.utils import get_superuser_token_headers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        superuser = get_superuser(session)
+        seed_items(session, owner_id=superuser.id, total=args.limit)
+
+    with TestClient(app) as client:
+        headers = get_superuser_token_headers(client)
+        samples = timed(
+            partial(
+                client.get,
+                f"{settings.API_V1_STR}/items/",
+                headers=headers,
+                params={"limit": args.limit},
+            ),
+            repeat=args.requests,
+            warmup=20,
+        )
+        report(f"GET /items/?limit={args.limit}", samples)
+        logger.info(f"  {1000 * len(samples) / sum(samples):.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Measure `GET /items/` latency while a storm of logins hashes passwords, with
+the login rate limits off and on.
+
+Run from `./backend/` against a migrated database:
+
+    python -m benchmarks.login_storm --logins 50
+"""
+
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+
+from app.api.rate_limit import rate_limit_backend
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimitBackend
+from app.core.security import hashing_pool
+from app.main import app
+from benchmarks.utils import logger, report
+
+
+async def sample_items(
+    client: httpx.AsyncClient, headers: dict[str, str], *, requests: int
+) -> list[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        r = await client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+        r.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def login(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+
+
+async def login_loop(client: httpx.AsyncClient, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        await login(client)
+
+
+async def run(args: argparse.Namespace) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark", timeout=None
+    ) as client:
+        token = (await login(client)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        samples = await sample_items(client, headers, requests=args.requests)
+        report("/items idle", samples)
+
+        for rate_limited in (False, True):
+            assert isinstance(rate_limit_backend, MemoryRateLimitBackend)
+            rate_limit_backend.clear()
+            with patch.object(settings, "RATE_LIMIT_ENABLED", rate_limited):
+                stop = asyncio.Event()
+                storm = [
+                    asyncio.create_task(login_loop(client, stop))
+                    for _ in range(args.logins)
+                ]
+                await asyncio.sleep(1)
+                samples = await sample_items(client, headers, requests=args.requests)
+                stats = hashing_pool.stats()
+                stop.set()
+                await asyncio.gather(*storm)
+            limits = "on" if rate_limited else "off"
+            report(
+                f"/items during {args.logins} concurrent logins, limits {limits}",
+                samples,
+            )
+            logger.info(f"hashing pool at the end of the storm: {stats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare the latency of a deep page of `GET /items/` with `skip` and with `cursor`.
+
+Run from `./backend/` against a migrated database:
+
+    python -m benchmarks.pagination --pages 1000 --limit 100
+"""
+
+import argparse
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, col, select
+
+from app.api.pagination import encode_cursor
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from app.models import Item
+from benchmarks.utils import get_superuser, report, seed_items, timed
+from tests.utils.utils import get_superuser_token_headers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    skip = (args.pages - 1) * args.limit
+    with Session(engine) as session:
+        superuser = get_superuser(session)
+        seed_items(session, owner_id=superuser.id, total=args.pages * args.limit)
+        # The cursor of page N is the id of the last item of page N - 1
+        last_id = session.exec(
+            select(Item.id).order_by(col(Item.id)).offset(skip - 1).limit(1)
+        ).one()
+
+    url = f"{settings.API_V1_STR}/items/"
+    with TestClient(app) as client:
+        headers = get_superuser_token_headers(client)
+        offset_params = {"skip": skip, "limit": args.limit}
+        cursor_params = {"cursor": encode_cursor(last_id), "limit": args.limit}
+        offset_page = client.get(url, headers=headers, params=offset_params).json()
+        cursor_page = client.get(url, headers=headers, params=cursor_params).json()
+        assert offset_page["data"] == cursor_page["data"]
+
+        report(
+            f"page {args.pages} skip/limit",
+            timed(
+                lambda: client.get(url, headers=headers, params=offset_params),
+                repeat=args.repeat,
+            ),
+        )
+        report(
+            f"page {args.pages} cursor",
+            timed(
+                lambda: client.get(url, headers=headers, params=cursor_params),
+                repeat=args.repeat,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure `GET /items/?q=` for full-text, prefix and misspelled searches, next to
+the same full-text match computed per row without the index.
+
+Run from `./backend/` against a migrated database, seeding takes a while:
+
+    python -m benchmarks.search --items 5000000
+"""
+
+import argparse
+import random
+import string
+from functools import partial
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, col, func, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from app.models import Item
+from benchmarks.utils import get_superuser, report, seed_items, timed
+from tests.utils.utils import get_superuser_token_headers
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+        for _ in range(size)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=5_000_000)
+    parser.add_argument("--words", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(args.words, rng)
+    with Session(engine) as session:
+        superuser = get_superuser(session)
+        seed_items(
+            session,
+            owner_id=superuser.id,
+            total=args.items,
+            make_title=lambda _: " ".join(rng.choices(vocabulary, k=3)),
+        )
+
+    word = vocabulary[len(vocabulary) // 2]
+    queries = {
+        "full-text": word,
+        "prefix": word[:4],
+        "misspelled": word[:-1],
+    }
+    url = f"{settings.API_V1_STR}/items/"
+    with TestClient(app) as client:
+        headers = get_superuser_token_headers(client)
+
+        def search(q: str) -> None:
+            client.get(url, headers=headers, params={"q": q, "limit": args.limit})
+
+        for name, q in queries.items():
+            report(
+                f"search {name} {q!r}", timed(partial(search, q), repeat=args.repeat)
+            )
+
+    with Session(engine) as session:
+        statement = (
+            select(func.count())
+            .select_from(Item)
+            .where(
+                func.to_tsvector("english", col(Item.title)).bool_op("@@")(
+                    func.plainto_tsquery("english", word)
+                )
+            )
+        )
+        report(
+            f"unindexed full-text {word!r}",
+            timed(lambda: session.exec(statement).one(), repeat=5),
+        )
+
+
+if __name__ == "__main__":
+    main()
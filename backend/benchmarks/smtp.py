@@ -0,0 +1,79 @@
+"""
+Compare email throughput with a new SMTP connection per email, with pooled
+connections and with one batch over a single session, against a local SMTP
+server that takes `--connect-delay` seconds to set up each connection.
+
+Run from `./backend/`, no database needed:
+
+    python -m benchmarks.smtp --emails 200 --connect-delay 0.05
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+import emails  # type: ignore
+
+from app.core.config import settings
+from app.core.smtp import smtp_options, smtp_pool
+from app.utils import OutgoingEmail, send_email, send_emails_batch
+from benchmarks.utils import logger
+from tests.utils.smtp import local_smtp_server
+
+
+def send_unpooled(batch: list[OutgoingEmail]) -> None:
+    # How every email was sent before the pool, one connection each
+    for email in batch:
+        message = emails.Message(
+            subject=email.subject,
+            html=email.html_content,
+            mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+        )
+        assert message.send(to=email.email_to, smtp=smtp_options()).success
+
+
+def send_pooled(batch: list[OutgoingEmail]) -> None:
+    for email in batch:
+        send_email(
+            email_to=email.email_to,
+            subject=email.subject,
+            html_content=email.html_content,
+        )
+
+
+def send_batch(batch: list[OutgoingEmail]) -> None:
+    assert not any(send_emails_batch(batch))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--connect-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    batch = [
+        OutgoingEmail(
+            email_to=f"user{i}@example.com", subject="Bench", html_content="<p>Hi</p>"
+        )
+        for i in range(args.emails)
+    ]
+    senders: dict[str, Callable[[list[OutgoingEmail]], None]] = {
+        "connection per email": send_unpooled,
+        "pooled send_email": send_pooled,
+        "send_emails_batch": send_batch,
+    }
+    with local_smtp_server(connect_delay=args.connect_delay) as inbox:
+        for name, send in senders.items():
+            smtp_pool.close()
+            connections = inbox.connections
+            start = time.perf_counter()
+            send(batch)
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"{name:<24} {args.emails / elapsed:8.1f} emails/s "
+                f"over {inbox.connections - connections} connections"
+            )
+
+
+if __name__ == "__main__":
+    main()
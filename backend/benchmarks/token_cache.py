@@ -0,0 +1,51 @@
+"""
+Measure the cost of the access token dependency per request when every request
+verifies the token and when the verified token is remembered.
+
+Run from `./backend/`, no database needed:
+
+    python -m benchmarks.token_cache --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Callable
+from datetime import timedelta
+
+from app.api.deps import get_token_payload
+from app.core import security
+from benchmarks.utils import logger
+
+
+async def measure(token: str, *, repeat: int, before: Callable[[], None]) -> float:
+    """
+    Await the dependency `repeat` times and return its mean cost in microseconds.
+    """
+    total = 0.0
+    for _ in range(repeat):
+        before()
+        start = time.perf_counter()
+        await get_token_payload(token)
+        total += time.perf_counter() - start
+    return total / repeat * 1_000_000
+
+
+async def run(args: argparse.Namespace) -> None:
+    token = security.create_access_token("user-id", expires_delta=timedelta(hours=1))
+    cold = await measure(
+        token, repeat=args.requests, before=security.verified_tokens.clear
+    )
+    logger.info(f"{'verify every request':<24} {cold:8.2f}µs/request")
+    warm = await measure(token, repeat=args.requests, before=lambda: None)
+    logger.info(f"{'verified token cached':<24} {warm:8.2f}µs/request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import logging
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import insert, text
+from sqlmodel import Session, func, select
+
+from app.core.config import settings
+from app.models import Item, User
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("benchmarks")
+
+
+def timed(fn: Callable[[], Any], *, repeat: int, warmup: int = 1) -> list[float]:
+    """
+    Call `fn` `repeat` times and return the latency of each call in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name: str, samples: list[float]) -> None:
+    if len(samples) > 1:
+        quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+        p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+    else:
+        p50 = p95 = p99 = samples[0]
+    logger.info(
+        f"{name:<40} n={len(samples):<6} p50={p50:8.2f}ms "
+        f"p95={p95:8.2f}ms p99={p99:8.2f}ms"
+    )
+
+
+def get_superuser(session: Session) -> User:
+    user = session.exec(
+        select(User).where(User.email == settings.FIRST_SUPERUSER)
+    ).first()
+    assert user, "run `python app/initial_data.py` first"
+    return user
+
+
+def seed_items(
+    session: Session,
+    *,
+    owner_id: uuid.UUID,
+    total: int,
+    batch_size: int = 10_000,
+    make_title: Callable[[int], str] = lambda i: f"Benchmark item {i}",
+) -> None:
+    """
+    Insert random items for `owner_id` until they own at least `total` items.
+    """
+    existing = session.exec(
+        select(func.count()).select_from(Item).where(Item.owner_id == owner_id)
+    ).one()
+    missing = total - existing
+    while missing > 0:
+        size = min(batch_size, missing)
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "title": make_title(i),
+                "description": "Seeded by benchmarks",
+                "owner_id": owner_id,
+            }
+            for i in range(size)
+        ]
+        session.execute(insert(Item), rows)
+        session.commit()
+        missing -= size
+    # Keep planner statistics in line with the freshly loaded rows
+    session.execute(text("ANALYZE item"))
+    session.commit()
+    logger.info(f"seeded {max(total - existing, 0)} items, {total} available")
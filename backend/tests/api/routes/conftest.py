@@ -0,0 +1,21 @@
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+
+from app.core.db import async_engine, engine
+from tests.utils.sql import forbid_seq_scans
+
+
+@pytest.fixture(autouse=True)
+def enforce_statement_budgets() -> Generator[None, None, None]:
+    # A route over its statement budget, or repeating a SELECT, fails the test
+    with patch("app.core.config.settings.SQL_STATEMENT_BUDGET_ACTION", "raise"):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def enforce_indexes() -> Generator[None, None, None]:
+    # A route reading a whole large table, for lack of an index, fails the test
+    with forbid_seq_scans(engine), forbid_seq_scans(async_engine.sync_engine):
+        yield
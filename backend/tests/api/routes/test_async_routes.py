@@ -0,0 +1,134 @@
+from collections.abc import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.api.routes import items_async, users_async
+from app.core.config import settings
+from app.models import UserCreate
+from tests.utils.item import create_random_item
+from tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture(scope="module")
+def async_client() -> Generator[TestClient, None, None]:
+    # The async routers are only mounted on the main app with USE_ASYNC_DB
+    app = FastAPI()
+    app.include_router(users_async.router, prefix=settings.API_V1_STR)
+    app.include_router(items_async.router, prefix=settings.API_V1_STR)
+    with TestClient(app) as c:
+        yield c
+
+
+def test_read_items_async(
+    async_client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/{item.id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["title"] == item.title
+
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"limit": 1},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert len(content["data"]) == 1
+    assert content["next_cursor"]
+
+
+def test_search_items_async(
+    async_client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"q": item.title},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["data"][0]["id"] == str(item.id)
+    assert content["count"] >= 1
+
+
+def test_create_update_delete_item_async(
+    async_client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = async_client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        json={"title": "Foo", "description": "Fighters"},
+    )
+    assert r.status_code == 200
+    item_id = r.json()["id"]
+
+    r = async_client.put(
+        f"{settings.API_V1_STR}/items/{item_id}",
+        headers=superuser_token_headers,
+        json={"title": "Bar"},
+    )
+    assert r.status_code == 200
+    assert r.json()["title"] == "Bar"
+    assert r.json()["description"] == "Fighters"
+
+    r = async_client.delete(
+        f"{settings.API_V1_STR}/items/{item_id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/{item_id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 404
+
+
+def test_register_and_update_user_async(
+    async_client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    email = random_email()
+    r = async_client.post(
+        f"{settings.API_V1_STR}/users/signup",
+        json={"email": email, "password": random_lower_string()},
+    )
+    assert r.status_code == 200
+    user_id = r.json()["id"]
+
+    r = async_client.patch(
+        f"{settings.API_V1_STR}/users/{user_id}",
+        headers=superuser_token_headers,
+        json={"full_name": "Async User"},
+    )
+    assert r.status_code == 200
+    assert r.json()["full_name"] == "Async User"
+    user = crud.get_user_by_email(session=db, email=email)
+    assert user
+    db.refresh(user)
+    assert user.full_name == "Async User"
+
+
+def test_read_users_async_normal_user(
+    async_client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = async_client.get(
+        f"{settings.API_V1_STR}/users/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_delete_user_async(
+    async_client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+    user = crud.create_user(session=db, user_create=user_in)
+    r = async_client.delete(
+        f"{settings.API_V1_STR}/users/{user.id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["message"] == "User deleted successfully"
@@ -0,0 +1,145 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.changes import CHANGES_MAX_LIMIT
+from app.core.config import settings
+from tests.utils.user import authentication_token_from_email
+from tests.utils.utils import random_email
+
+CHANGES_URL = f"{settings.API_V1_STR}/items/changes"
+
+
+@pytest.fixture
+def user_headers(client: TestClient, db: Session) -> dict[str, str]:
+    # A user of its own, so no other test's items show up in the changes
+    return authentication_token_from_email(client=client, email=random_email(), db=db)
+
+
+@pytest.fixture
+def no_overlap() -> Generator[None, None, None]:
+    with patch("app.core.config.settings.ITEM_CHANGES_OVERLAP_SECONDS", 0):
+        yield
+
+
+def create_item(client: TestClient, headers: dict[str, str], title: str) -> Any:
+    r = client.post(
+        f"{settings.API_V1_STR}/items/", headers=headers, json={"title": title}
+    )
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_item_timestamps(client: TestClient, user_headers: dict[str, str]) -> None:
+    item = create_item(client, user_headers, "Stamped")
+    assert item["created_at"] == item["updated_at"]
+    r = client.put(
+        f"{settings.API_V1_STR}/items/{item['id']}",
+        headers=user_headers,
+        json={"title": "Restamped"},
+    )
+    updated = r.json()
+    assert updated["created_at"] == item["created_at"]
+    assert updated["updated_at"] > item["updated_at"]
+
+
+def test_read_item_changes(client: TestClient, user_headers: dict[str, str]) -> None:
+    since = datetime.now(timezone.utc).isoformat()
+    kept = create_item(client, user_headers, "Kept")
+    deleted = create_item(client, user_headers, "Deleted")
+    client.delete(f"{settings.API_V1_STR}/items/{deleted['id']}", headers=user_headers)
+    r = client.get(CHANGES_URL, headers=user_headers, params={"since": since})
+    assert r.status_code == 200
+    changes = r.json()
+    assert changes["data"] == [kept]
+    assert changes["deleted"] == [deleted["id"]]
+    assert changes["has_more"] is False
+
+
+def test_read_item_changes_of_other_users(
+    client: TestClient,
+    user_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    since = datetime.now(timezone.utc).isoformat()
+    create_item(client, normal_user_token_headers, "Not mine")
+    r = client.get(CHANGES_URL, headers=user_headers, params={"since": since})
+    assert r.json()["data"] == []
+
+
+@pytest.mark.usefixtures("no_overlap")
+def test_read_item_changes_pages(
+    client: TestClient, user_headers: dict[str, str]
+) -> None:
+    since = datetime.now(timezone.utc).isoformat()
+    # Created in one transaction, they share their updated_at
+    r = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=user_headers,
+        json=[{"title": f"Item {i}"} for i in range(5)],
+    )
+    created_ids = {item["id"] for item in r.json()["data"]}
+    seen_ids: list[str] = []
+    params = {"since": since, "limit": "2"}
+    while True:
+        r = client.get(CHANGES_URL, headers=user_headers, params=params)
+        changes = r.json()
+        seen_ids += [item["id"] for item in changes["data"]]
+        params = {"cursor": changes["next_cursor"], "limit": "2"}
+        if not changes["has_more"]:
+            break
+    assert sorted(seen_ids) == sorted(created_ids)
+
+    # Caught up, the next sync starts after them
+    r = client.get(CHANGES_URL, headers=user_headers, params=params)
+    assert r.json()["data"] == []
+
+
+def test_read_item_changes_sends_recent_changes_again(
+    client: TestClient, user_headers: dict[str, str]
+) -> None:
+    since = datetime.now(timezone.utc).isoformat()
+    item = create_item(client, user_headers, "Recent")
+    r = client.get(CHANGES_URL, headers=user_headers, params={"since": since})
+    cursor = r.json()["next_cursor"]
+    r = client.get(CHANGES_URL, headers=user_headers, params={"cursor": cursor})
+    assert r.json()["data"] == [item]
+
+
+def test_read_item_changes_needs_a_position(
+    client: TestClient, user_headers: dict[str, str]
+) -> None:
+    r = client.get(CHANGES_URL, headers=user_headers)
+    assert r.status_code == 400
+    r = client.get(CHANGES_URL, headers=user_headers, params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_read_item_changes_older_than_tombstones(
+    client: TestClient, user_headers: dict[str, str]
+) -> None:
+    since = datetime.now(timezone.utc) - timedelta(
+        days=settings.ITEM_TOMBSTONE_RETENTION_DAYS + 1
+    )
+    r = client.get(
+        CHANGES_URL, headers=user_headers, params={"since": since.isoformat()}
+    )
+    assert r.status_code == 410
+
+
+@pytest.mark.parametrize("limit", [0, -1, CHANGES_MAX_LIMIT + 1])
+def test_read_item_changes_invalid_limit(
+    client: TestClient, user_headers: dict[str, str], limit: int
+) -> None:
+    # A limit under 1 would send the same cursor back forever
+    since = datetime.now(timezone.utc).isoformat()
+    r = client.get(
+        CHANGES_URL, headers=user_headers, params={"since": since, "limit": limit}
+    )
+    assert r.status_code == 422
@@ -1,9 +1,14 @@
+import csv
+import io
+import json
 import uuid
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 from app.core.config import settings
+from app.models import ItemPublic, ItemsPublic
 from tests.utils.item import create_random_item
 
 
@@ -40,6 +45,54 @@ def test_read_item(
     assert content["owner_id"] == str(item.owner_id)
 
 
+def test_read_item_not_modified(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    url = f"{settings.API_V1_STR}/items/{item.id}"
+    response = client.get(url, headers=superuser_token_headers)
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == settings.ITEMS_CACHE_CONTROL
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == settings.ITEMS_CACHE_CONTROL
+
+
+def test_read_item_etag_changes_on_update(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    url = f"{settings.API_V1_STR}/items/{item.id}"
+    etag = client.get(url, headers=superuser_token_headers).headers["ETag"]
+    client.put(url, headers=superuser_token_headers, json={"title": "Updated"})
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Updated"
+    assert response.headers["ETag"] != etag
+
+
+def test_read_items_not_modified(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    etag = client.get(url, headers=superuser_token_headers).headers["ETag"]
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": f'"other", {etag}'}
+    )
+    assert response.status_code == 304
+    create_random_item(db)
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
 def test_read_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -79,6 +132,180 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+def test_read_items_sends_public_fields(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/", headers=superuser_token_headers
+    )
+    page = ItemsPublic.model_validate(response.json())
+    assert page.data
+    for row in response.json()["data"]:
+        assert row.keys() == ItemPublic.model_fields.keys()
+    assert response.headers["Cache-Control"] == settings.ITEMS_CACHE_CONTROL
+    assert response.headers["ETag"]
+
+
+def test_read_items_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"limit": 2},
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["data"]) == 2
+    assert first_page["next_cursor"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+    )
+    assert response.status_code == 200
+    cursor_page = response.json()
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"limit": 2, "skip": 2},
+    )
+    offset_page = response.json()
+    assert cursor_page["data"] == offset_page["data"]
+    first_ids = {item["id"] for item in first_page["data"]}
+    assert not first_ids & {item["id"] for item in cursor_page["data"]}
+
+
+def test_read_items_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+    content = response.json()
+    assert content["detail"] == "Invalid cursor"
+
+
+def test_read_items_count_invalidated_on_create_and_delete(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    count = client.get(url, headers=normal_user_token_headers).json()["count"]
+    response = client.post(
+        url, headers=normal_user_token_headers, json={"title": "Counted"}
+    )
+    item_id = response.json()["id"]
+    content = client.get(url, headers=normal_user_token_headers).json()
+    assert content["count"] == count + 1
+    assert content["count_type"] == "exact"
+
+    client.delete(f"{url}{item_id}", headers=normal_user_token_headers)
+    content = client.get(url, headers=normal_user_token_headers).json()
+    assert content["count"] == count
+
+
+def test_read_items_estimated_count(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with patch("app.core.config.settings.LIST_COUNT_STRATEGY", "estimated"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count_type"] == "estimated"
+    assert isinstance(content["count"], int)
+
+
+def test_read_items_without_count(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with patch("app.core.config.settings.LIST_COUNT_STRATEGY", "none"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count_type"] == "none"
+    assert content["count"] is None
+
+
+def test_search_items(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    client.post(
+        url,
+        headers=normal_user_token_headers,
+        json={"title": "Observability handbook", "description": "Tracing metrics"},
+    )
+    client.post(url, headers=normal_user_token_headers, json={"title": "Groceries"})
+
+    # Full-text on the description, prefix and a typo on the title
+    for q in ["metric", "Observab", "Observabilty handbok"]:
+        response = client.get(url, headers=normal_user_token_headers, params={"q": q})
+        assert response.status_code == 200
+        content = response.json()
+        titles = [item["title"] for item in content["data"]]
+        assert "Observability handbook" in titles
+        assert "Groceries" not in titles
+        assert content["count"] == len(titles)
+        assert content["next_cursor"] is None
+
+
+def test_search_items_estimated_count(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with patch("app.core.config.settings.LIST_COUNT_STRATEGY", "estimated"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params={"q": 'it\'s a "search"'},
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count_type"] == "estimated"
+    assert isinstance(content["count"], int)
+
+
+def test_search_items_ranks_title_matches_first(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    client.post(
+        url,
+        headers=normal_user_token_headers,
+        json={"title": "Zoo trip", "description": "See the walruses"},
+    )
+    client.post(url, headers=normal_user_token_headers, json={"title": "Walrus"})
+    response = client.get(
+        url, headers=normal_user_token_headers, params={"q": "walrus"}
+    )
+    assert response.status_code == 200
+    titles = [item["title"] for item in response.json()["data"]]
+    assert titles.index("Walrus") < titles.index("Zoo trip")
+
+
+def test_search_items_with_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"q": "walrus", "cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -162,3 +389,182 @@ def test_delete_item_not_enough_permissions(
     assert response.status_code == 400
     content = response.json()
     assert content["detail"] == "Not enough permissions"
+
+
+def test_create_items_bulk(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = [{"title": f"Bulk {i}", "description": "Imported"} for i in range(3)]
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["title"] for item in content["data"]] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    assert content["errors"] == []
+    for item in content["data"]:
+        response = client.get(
+            f"{settings.API_V1_STR}/items/{item['id']}",
+            headers=superuser_token_headers,
+        )
+        assert response.status_code == 200
+
+
+def test_create_items_bulk_too_many(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with patch("app.core.config.settings.ITEMS_BULK_MAX_SIZE", 2):
+        response = client.post(
+            f"{settings.API_V1_STR}/items/bulk",
+            headers=superuser_token_headers,
+            json=[{"title": "Too many"}] * 3,
+        )
+    assert response.status_code == 413
+
+
+def test_update_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"title": "Mine", "description": "Kept"}],
+    )
+    own_item = response.json()["data"][0]
+    other_item = create_random_item(db)
+    missing_id = str(uuid.uuid4())
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[
+            {"id": own_item["id"], "title": "Updated"},
+            {"id": str(other_item.id), "title": "Not mine"},
+            {"id": missing_id, "title": "Missing"},
+        ],
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content["data"]) == 1
+    assert content["data"][0]["title"] == "Updated"
+    assert content["data"][0]["description"] == "Kept"
+    assert content["errors"] == [
+        {"index": 1, "id": str(other_item.id), "detail": "Not enough permissions"},
+        {"index": 2, "id": missing_id, "detail": "Item not found"},
+    ]
+
+
+def test_update_items_bulk_same_fields(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    # Rows setting the same fields are sent as one executemany UPDATE
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"title": f"Item {i}", "description": "Kept"} for i in range(3)],
+    )
+    ids = [item["id"] for item in response.json()["data"]]
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"id": id, "title": "Renamed"} for id in ids],
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["id"] for item in content["data"]] == ids
+    assert [item["title"] for item in content["data"]] == ["Renamed"] * 3
+    assert [item["description"] for item in content["data"]] == ["Kept"] * 3
+    assert content["errors"] == []
+
+
+def test_update_items_bulk_rejects_nulls_in_request_order(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"title": f"Item {i}", "description": "Kept"} for i in range(4)],
+    )
+    ids = [item["id"] for item in response.json()["data"]]
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[
+            {"id": ids[3], "title": "Third"},
+            {"id": ids[0], "title": None},
+            {"id": ids[2], "description": None},
+            {"id": ids[1], "title": "First"},
+        ],
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["id"] for item in content["data"]] == [ids[3], ids[2], ids[1]]
+    assert content["data"][1]["description"] is None
+    assert content["errors"] == [
+        {"index": 1, "id": ids[0], "detail": "title can't be null"}
+    ]
+
+
+def test_delete_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"title": "Delete me"}, {"title": "Delete me too"}],
+    )
+    own_ids = [item["id"] for item in response.json()["data"]]
+    other_item = create_random_item(db)
+    response = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[*own_ids, str(other_item.id)],
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["ids"] == own_ids
+    assert content["errors"] == [
+        {"index": 2, "id": str(other_item.id), "detail": "Not enough permissions"}
+    ]
+    for id in own_ids:
+        response = client.get(
+            f"{settings.API_V1_STR}/items/{id}",
+            headers=normal_user_token_headers,
+        )
+        assert response.status_code == 404
+
+
+def test_export_items_ndjson(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    client.post(url, headers=normal_user_token_headers, json={"title": "Export"})
+    count = client.get(url, headers=normal_user_token_headers).json()["count"]
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == count
+    assert set(rows[0]) == {"id", "title", "description", "owner_id"}
+    assert "Export" in {row["title"] for row in rows}
+
+
+def test_export_items_csv(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    client.post(url, headers=normal_user_token_headers, json={"title": "Export"})
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=normal_user_token_headers,
+        params={"format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows
+    assert list(rows[0]) == ["id", "title", "description", "owner_id"]
@@ -1,12 +1,21 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, col, select
 
+from app.api.rate_limit import (
+    login_account_limit,
+    login_ip_limit,
+    password_recovery_account_limit,
+)
+from app.core import security
 from app.core.config import settings
 from app.core.security import verify_password
 from app.crud import create_user
-from app.models import UserCreate
+from app.models import EmailOutbox, RevokedToken, UserCreate
 from app.utils import generate_password_reset_token
 from tests.utils.user import user_authentication_headers
 from tests.utils.utils import random_email, random_lower_string
@@ -22,6 +31,17 @@ def test_get_access_token(client: TestClient) -> None:
     assert r.status_code == 200
     assert "access_token" in tokens
     assert tokens["access_token"]
+    assert tokens["refresh_token"]
+
+
+def test_get_access_token_email_in_other_case(client: TestClient) -> None:
+    login_data = {
+        "username": settings.FIRST_SUPERUSER.upper(),
+        "password": settings.FIRST_SUPERUSER_PASSWORD,
+    }
+    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 200
+    assert r.json()["access_token"]
 
 
 def test_get_access_token_incorrect_password(client: TestClient) -> None:
@@ -33,6 +53,40 @@ def test_get_access_token_incorrect_password(client: TestClient) -> None:
     assert r.status_code == 400
 
 
+def test_login_is_rate_limited_per_account(client: TestClient) -> None:
+    login_data = {"username": random_email(), "password": "incorrect"}
+    with patch.object(login_account_limit, "limit", 2):
+        for _ in range(2):
+            r = client.post(
+                f"{settings.API_V1_STR}/login/access-token", data=login_data
+            )
+            assert r.status_code == 400
+        # Rejected before looking up the user or checking the password
+        with (
+            patch("app.crud.get_user_by_email") as get_user_by_email,
+            patch("app.api.routes.login.verify_password_async") as verify,
+        ):
+            r = client.post(
+                f"{settings.API_V1_STR}/login/access-token", data=login_data
+            )
+        get_user_by_email.assert_not_called()
+        verify.assert_not_called()
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) > 0
+
+
+def test_login_is_rate_limited_per_ip(client: TestClient) -> None:
+    with patch.object(login_ip_limit, "limit", 2):
+        statuses = [
+            client.post(
+                f"{settings.API_V1_STR}/login/access-token",
+                data={"username": random_email(), "password": "incorrect"},
+            ).status_code
+            for _ in range(3)
+        ]
+    assert statuses == [400, 400, 429]
+
+
 def test_use_access_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -45,8 +99,111 @@ def test_use_access_token(
     assert "email" in result
 
 
+def login(client: TestClient) -> dict[str, str]:
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+    tokens: dict[str, str] = r.json()
+    return tokens
+
+
+def refresh(client: TestClient, refresh_token: str) -> dict[str, str] | None:
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": refresh_token},
+    )
+    if r.status_code == 403:
+        return None
+    assert r.status_code == 200
+    tokens: dict[str, str] = r.json()
+    return tokens
+
+
+def is_accepted(client: TestClient, access_token: str) -> bool:
+    r = client.post(
+        f"{settings.API_V1_STR}/login/test-token",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    return r.status_code == 200
+
+
+def test_refresh_token_rotates(client: TestClient) -> None:
+    tokens = login(client)
+    refreshed = refresh(client, tokens["refresh_token"])
+    assert refreshed
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert is_accepted(client, refreshed["access_token"])
+    assert refresh(client, refreshed["refresh_token"])
+
+
+def test_reused_refresh_token_ends_the_session(client: TestClient) -> None:
+    tokens = login(client)
+    refreshed = refresh(client, tokens["refresh_token"])
+    assert refreshed
+    assert refresh(client, tokens["refresh_token"]) is None
+    assert refresh(client, refreshed["refresh_token"]) is None
+    assert not is_accepted(client, refreshed["access_token"])
+    # Other sessions of the user aren't affected
+    assert is_accepted(client, login(client)["access_token"])
+
+
+def test_tokens_only_work_for_their_purpose(client: TestClient) -> None:
+    tokens = login(client)
+    assert refresh(client, tokens["access_token"]) is None
+    assert not is_accepted(client, tokens["refresh_token"])
+
+
+def test_logout_revokes_the_session(client: TestClient) -> None:
+    tokens = login(client)
+    r = client.post(
+        f"{settings.API_V1_STR}/logout",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert r.status_code == 200
+    assert not is_accepted(client, tokens["access_token"])
+    assert refresh(client, tokens["refresh_token"]) is None
+
+
+def test_revocations_from_other_workers_are_synced(
+    client: TestClient, db: Session
+) -> None:
+    tokens = login(client)
+    assert is_accepted(client, tokens["access_token"])
+    session_id = security.decode_access_token(tokens["access_token"]).sid
+    assert session_id
+    # Revoked without going through this worker's store
+    db.add(
+        RevokedToken(
+            id=session_id,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=1),
+        )
+    )
+    db.commit()
+    with patch(
+        "app.core.revocation.time.monotonic",
+        return_value=time.monotonic() + settings.TOKEN_REVOCATION_SYNC_SECONDS,
+    ):
+        assert not is_accepted(client, tokens["access_token"])
+
+
+def test_unknown_session_is_not_revoked(client: TestClient) -> None:
+    token = security.create_access_token(
+        uuid.uuid4(), expires_delta=timedelta(minutes=5), session_id=uuid.uuid4()
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/login/test-token",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    # Passes the revocation check, the user doesn't exist
+    assert r.status_code == 404
+
+
 def test_recovery_password(
-    client: TestClient, normal_user_token_headers: dict[str, str]
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
     with (
         patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
@@ -59,6 +216,13 @@ def test_recovery_password(
         )
         assert r.status_code == 200
         assert r.json() == {"message": "Password recovery email sent"}
+    # Queued for the email worker, not sent by the request
+    queued = db.exec(
+        select(EmailOutbox).where(
+            EmailOutbox.email_to == email, col(EmailOutbox.sent_at).is_(None)
+        )
+    ).all()
+    assert any("Password recovery" in queued_email.subject for queued_email in queued)
 
 
 def test_recovery_password_user_not_exits(
@@ -72,6 +236,24 @@ def test_recovery_password_user_not_exits(
     assert r.status_code == 404
 
 
+def test_recovery_password_is_rate_limited(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    email = random_email()
+    with patch.object(password_recovery_account_limit, "limit", 1):
+        r = client.post(
+            f"{settings.API_V1_STR}/password-recovery/{email}",
+            headers=normal_user_token_headers,
+        )
+        assert r.status_code == 404
+        r = client.post(
+            f"{settings.API_V1_STR}/password-recovery/{email.upper()}",
+            headers=normal_user_token_headers,
+        )
+    assert r.status_code == 429
+    assert "Retry-After" in r.headers
+
+
 def test_reset_password(client: TestClient, db: Session) -> None:
     email = random_email()
     password = random_lower_string()
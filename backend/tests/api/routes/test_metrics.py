@@ -0,0 +1,39 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, text
+
+from app.core.config import settings
+
+
+def test_metrics(client: TestClient, superuser_token_headers: dict[str, str]) -> None:
+    client.get(f"{settings.API_V1_STR}/items/", headers=superuser_token_headers)
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        f'route="{settings.API_V1_STR}/items/",status="200"}}'
+    ) in r.text
+    assert 'http_requests_in_progress{method="GET"} 1' in r.text
+    assert 'db_queries_total{engine="sync"}' in r.text
+    assert 'db_pool_connections{engine="sync",state="checked_out"}' in r.text
+
+
+def test_metrics_token(client: TestClient) -> None:
+    with patch("app.core.config.settings.METRICS_TOKEN", "secret"):
+        assert client.get("/metrics").status_code == 401
+        r = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert r.status_code == 401
+        r = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+        assert r.status_code == 200
+
+
+def test_slow_query_log(db: Session, caplog: pytest.LogCaptureFixture) -> None:
+    with patch("app.core.config.settings.DB_SLOW_QUERY_SECONDS", 1e-9):
+        with caplog.at_level(logging.WARNING, logger="app.core.db"):
+            db.execute(text("SELECT pg_sleep(0.01)"))
+    assert "Slow query on the sync engine" in caplog.text
+    assert "pg_sleep" in caplog.text
@@ -0,0 +1,109 @@
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.api import deps
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import ReplicaSet
+from tests.utils.sql import count_statements
+
+DOWN_URI = "postgresql+psycopg://nobody@127.0.0.1:1/app"
+
+
+@pytest.fixture
+def replica() -> Generator[tuple[Engine, AsyncEngine], None, None]:
+    # Second engines on the test database stand in for a replica
+    sync_replica = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    async_replica = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    yield sync_replica, async_replica
+    sync_replica.dispose()
+
+
+@contextmanager
+def use_replicas(
+    sync_engines: list[Engine], async_engines: list[AsyncEngine]
+) -> Iterator[tuple[ReplicaSet[Engine], ReplicaSet[AsyncEngine]]]:
+    replicas = ReplicaSet(sync_engines, retry_seconds=30)
+    async_replicas = ReplicaSet(async_engines, retry_seconds=30)
+    with (
+        patch.object(deps, "replicas", replicas),
+        patch.object(deps, "async_replicas", async_replicas),
+    ):
+        yield replicas, async_replicas
+
+
+@contextmanager
+def replica_statements(
+    replica: tuple[Engine, AsyncEngine],
+) -> Iterator[list[str]]:
+    with count_statements(replica[0]) as statements:
+        with count_statements(replica[1].sync_engine) as async_statements:
+            yield statements
+    statements.extend(async_statements)
+
+
+def test_reads_go_to_replica(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    replica: tuple[Engine, AsyncEngine],
+) -> None:
+    with (
+        use_replicas([replica[0]], [replica[1]]),
+        patch("app.core.config.settings.DB_READ_YOUR_WRITES_SECONDS", 0),
+        replica_statements(replica) as statements,
+    ):
+        r = client.get(f"{settings.API_V1_STR}/items/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert statements
+
+
+def test_replica_down_is_skipped(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    replica: tuple[Engine, AsyncEngine],
+) -> None:
+    down = create_engine(DOWN_URI)
+    async_down = create_async_engine(DOWN_URI)
+    with (
+        use_replicas([down, replica[0]], [async_down, replica[1]]) as (
+            replicas,
+            async_replicas,
+        ),
+        patch("app.core.config.settings.DB_READ_YOUR_WRITES_SECONDS", 0),
+        replica_statements(replica) as statements,
+    ):
+        r = client.get(f"{settings.API_V1_STR}/users/", headers=superuser_token_headers)
+        if settings.USE_ASYNC_DB:
+            assert async_replicas.candidates() == [replica[1]]
+        else:
+            assert replicas.candidates() == [replica[0]]
+    assert r.status_code == 200
+    assert statements
+
+
+def test_reads_after_a_write_stay_on_primary(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    replica: tuple[Engine, AsyncEngine],
+) -> None:
+    assert isinstance(deps.recent_writers, TTLCache)
+    url = f"{settings.API_V1_STR}/items/"
+    with use_replicas([replica[0]], [replica[1]]):
+        r = client.post(url, headers=superuser_token_headers, json={"title": "New"})
+        assert r.status_code == 200
+        with replica_statements(replica) as statements:
+            r = client.get(url, headers=superuser_token_headers)
+        assert r.status_code == 200
+        assert statements == []
+
+        # Once the write is old enough, reads go back to the replica
+        deps.recent_writers.clear()
+        with replica_statements(replica) as statements:
+            client.get(url, headers=superuser_token_headers)
+        assert statements
@@ -0,0 +1,40 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.statement_budget import StatementBudgetExceeded
+
+
+def test_over_budget_fails(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with patch("app.core.config.settings.SQL_STATEMENT_BUDGET", 0):
+        with pytest.raises(StatementBudgetExceeded):
+            client.post(
+                f"{settings.API_V1_STR}/items/",
+                headers=superuser_token_headers,
+                json={"title": "Over budget"},
+            )
+
+
+def test_over_budget_is_logged(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    with (
+        patch("app.core.config.settings.SQL_STATEMENT_BUDGET_ACTION", "log"),
+        patch("app.core.config.settings.SQL_STATEMENT_BUDGET", 0),
+        caplog.at_level(logging.WARNING, logger="app.core.statement_budget"),
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            json={"title": "Over budget"},
+        )
+    assert r.status_code == 200
+    assert f"POST {settings.API_V1_STR}/items/ sent" in caplog.text
+    assert "its budget is 0" in caplog.text
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import EmailOutbox
+from tests.utils.utils import random_email
+
+
+def test_test_email_is_queued(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    email_to = random_email()
+    with patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"):
+        r = client.post(
+            f"{settings.API_V1_STR}/utils/test-email/",
+            headers=superuser_token_headers,
+            params={"email_to": email_to},
+        )
+    assert r.status_code == 201
+    email = db.exec(select(EmailOutbox).where(EmailOutbox.email_to == email_to)).one()
+    assert email.sent_at is None
+    assert email.attempts == 0
+
+
+def test_password_hashing_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/password-hashing-stats/",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["max_workers"] == settings.PASSWORD_HASH_WORKERS
+    # Logging in the superuser already went through the pool
+    assert stats["completed"] >= 1
+    assert stats["queued"] >= 0
+
+
+def test_password_hashing_stats_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/password-hashing-stats/",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 403
+
+
+def test_db_pool_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool-stats/",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    sync_pool = stats["sync"]
+    assert sync_pool["size"] == settings.DB_POOL_SIZE
+    # This request holds a connection to authenticate the superuser
+    assert sync_pool["checkout_wait"]["count"] >= 1
+    checkout_wait = sync_pool["checkout_wait"]
+    assert checkout_wait["buckets"]["+Inf"] == checkout_wait["count"]
+    assert "async" in stats
@@ -0,0 +1,107 @@
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import async_engine, engine
+from app.crud import revoked_tokens
+from tests.utils.item import create_random_item
+from tests.utils.sql import count_statements
+from tests.utils.user import create_random_user
+from tests.utils.utils import random_email, random_lower_string
+
+# The engine of the routers mounted on the app
+routes_engine = async_engine.sync_engine if settings.USE_ASYNC_DB else engine
+
+
+def verbs(statements: list[str]) -> list[str]:
+    return [statement.split(None, 1)[0].upper() for statement in statements]
+
+
+@pytest.fixture(autouse=True)
+def no_revocation_sync() -> Generator[None, None, None]:
+    # The periodic read of revoked tokens would land in the counted statements
+    with patch.object(revoked_tokens, "sync_due", return_value=False):
+        yield
+
+
+def warm_up_auth(client: TestClient, headers: dict[str, str]) -> None:
+    # Loads the caller into the user auth cache so it adds no statement
+    client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+
+
+def test_create_item_statements(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    warm_up_auth(client, superuser_token_headers)
+    with count_statements(routes_engine) as statements:
+        r = client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            json={"title": "Counted"},
+        )
+    assert r.status_code == 200
+    assert verbs(statements) == ["INSERT"]
+
+
+def test_update_item_statements(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    # Read before counting, the commit in create_random_item expired it
+    item_id = create_random_item(db).id
+    warm_up_auth(client, superuser_token_headers)
+    with count_statements(routes_engine) as statements:
+        r = client.put(
+            f"{settings.API_V1_STR}/items/{item_id}",
+            headers=superuser_token_headers,
+            json={"title": "Counted"},
+        )
+    assert r.status_code == 200
+    assert verbs(statements) == ["SELECT", "UPDATE"]
+
+
+def test_create_user_statements(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    warm_up_auth(client, superuser_token_headers)
+    with count_statements(routes_engine) as statements:
+        r = client.post(
+            f"{settings.API_V1_STR}/users/",
+            headers=superuser_token_headers,
+            json={"email": random_email(), "password": random_lower_string()},
+        )
+    assert r.status_code == 200
+    # The SELECT checks that the email is not taken
+    assert verbs(statements) == ["SELECT", "INSERT"]
+
+
+def test_update_user_statements(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user_id = create_random_user(db).id
+    warm_up_auth(client, superuser_token_headers)
+    with count_statements(routes_engine) as statements:
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/{user_id}",
+            headers=superuser_token_headers,
+            json={"full_name": "Counted"},
+        )
+    assert r.status_code == 200
+    assert verbs(statements) == ["SELECT", "UPDATE"]
+
+
+def test_update_user_me_statements(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    with count_statements(routes_engine) as statements:
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me",
+            headers=normal_user_token_headers,
+            json={"full_name": "Counted"},
+        )
+    assert r.status_code == 200
+    # The SELECT loads the current user
+    assert verbs(statements) == ["SELECT", "UPDATE"]
@@ -4,10 +4,12 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
+from app.api.rate_limit import rate_limit_backend
 from app.core.config import settings
 from app.core.db import engine, init_db
+from app.core.rate_limit import MemoryRateLimitBackend
 from app.main import app
-from app.models import Item, User
+from app.models import EmailOutbox, Item, ItemTombstone, RevokedToken, User
 from tests.utils.user import authentication_token_from_email
 from tests.utils.utils import get_superuser_token_headers
 
@@ -17,13 +19,27 @@ def db() -> Generator[Session, None, None]:
     with Session(engine) as session:
         init_db(session)
         yield session
+        statement = delete(EmailOutbox)
+        session.execute(statement)
+        statement = delete(RevokedToken)
+        session.execute(statement)
         statement = delete(Item)
         session.execute(statement)
+        # Written by the deletion of the items
+        statement = delete(ItemTombstone)
+        session.execute(statement)
         statement = delete(User)
         session.execute(statement)
         session.commit()
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits() -> None:
+    # Every test logs in as often as it needs
+    assert isinstance(rate_limit_backend, MemoryRateLimitBackend)
+    rate_limit_backend.clear()
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
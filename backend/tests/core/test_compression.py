@@ -0,0 +1,171 @@
+import asyncio
+import json
+import sys
+import zlib
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.types import Message
+
+from app.core.compression import (
+    CompressionMiddleware,
+    choose_encoding,
+    compressor_factories,
+)
+from app.core.config import settings
+
+BIG = {"data": [{"title": f"Item {i}", "description": "x" * 20} for i in range(100)]}
+
+
+def big(_: Request) -> Response:
+    return JSONResponse(BIG, headers={"ETag": '"v1"'})
+
+
+def small(_: Request) -> Response:
+    return JSONResponse({"ok": True})
+
+
+def image(_: Request) -> Response:
+    return Response(b"\0" * 4096, media_type="image/png")
+
+
+def stream(_: Request) -> Response:
+    def lines() -> Iterator[str]:
+        for i in range(3):
+            yield json.dumps({"line": i}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def make_client(*encodings: str) -> TestClient:
+    app = Starlette(
+        routes=[
+            Route("/big", big),
+            Route("/small", small),
+            Route("/image", image),
+            Route("/stream", stream),
+        ]
+    )
+    app.add_middleware(
+        CompressionMiddleware,
+        factories=compressor_factories(
+            encodings=encodings, gzip_level=6, brotli_quality=4, zstd_level=3
+        ),
+        minimum_size=1024,
+        content_types=["application/json", "application/x-ndjson"],
+    )
+    return TestClient(app)
+
+
+def test_choose_encoding() -> None:
+    assert choose_encoding("gzip, br", ["zstd", "br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.5", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding("identity", ["gzip"]) is None
+    assert choose_encoding("", ["gzip"]) is None
+
+
+def test_large_response_is_compressed() -> None:
+    client = make_client("gzip")
+    r = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert r.headers["Vary"] == "Accept-Encoding"
+    assert int(r.headers["Content-Length"]) < len(json.dumps(BIG))
+    assert r.headers["ETag"] == 'W/"v1"'
+    assert r.json() == BIG
+
+
+def test_uncompressed_without_accept_encoding() -> None:
+    client = make_client("gzip")
+    r = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in r.headers
+    assert r.headers["ETag"] == '"v1"'
+    assert r.json() == BIG
+
+
+def test_small_response_is_not_compressed() -> None:
+    client = make_client("gzip")
+    r = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in r.headers
+    assert r.headers["Vary"] == "Accept-Encoding"
+
+
+def test_other_content_types_are_not_compressed() -> None:
+    client = make_client("gzip")
+    r = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in r.headers
+    assert len(r.content) == 4096
+
+
+def test_streamed_chunks_decode_as_they_arrive() -> None:
+    middleware = CompressionMiddleware(
+        StreamingResponse(
+            (json.dumps({"line": i}) + "\n" for i in range(3)),
+            media_type="application/x-ndjson",
+        ),
+        factories=compressor_factories(
+            encodings=["gzip"], gzip_level=6, brotli_quality=4, zstd_level=3
+        ),
+        minimum_size=1024,
+        content_types=["application/x-ndjson"],
+    )
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        # The client stays connected for the whole stream
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+
+    start, *bodies = messages
+    headers = Headers(raw=start["headers"])
+    assert headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in headers
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    lines = [decompressor.decompress(message["body"]) for message in bodies]
+    assert lines[:3] == [json.dumps({"line": i}).encode() + b"\n" for i in range(3)]
+
+
+@pytest.mark.parametrize(
+    ("encoding", "package"), [("br", "brotli"), ("zstd", "zstandard")]
+)
+def test_optional_encodings(encoding: str, package: str) -> None:
+    pytest.importorskip(package)
+    client = make_client(encoding, "gzip")
+    r = client.get("/big", headers={"Accept-Encoding": f"gzip, {encoding}"})
+    assert r.headers["Content-Encoding"] == encoding
+    assert r.json() == BIG
+
+
+def test_missing_package_fails_at_startup() -> None:
+    with patch.dict(sys.modules, {"brotli": None}):
+        with pytest.raises(RuntimeError, match="brotli"):
+            compressor_factories(
+                encodings=["br"], gzip_level=6, brotli_quality=4, zstd_level=3
+            )
+
+
+def test_api_responses_are_compressed(
+    client: TestClient,
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/health-check/",
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert "Content-Encoding" not in r.headers
+    r = client.get(
+        f"{settings.API_V1_STR}/openapi.json", headers={"Accept-Encoding": "gzip"}
+    )
+    assert r.headers["Content-Encoding"] == "gzip"
@@ -0,0 +1,29 @@
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+
+DEPLOYED = {
+    "ENVIRONMENT": "staging",
+    "SECRET_KEY": "not-the-default",
+    "POSTGRES_PASSWORD": "not-the-default",
+    "FIRST_SUPERUSER_PASSWORD": "not-the-default",
+}
+
+
+def make_settings(**values: Any) -> Settings:
+    return Settings(**DEPLOYED | values)
+
+
+def test_deployed_metrics_need_a_token() -> None:
+    with pytest.raises(ValidationError, match="METRICS_TOKEN"):
+        make_settings(METRICS_ENABLED=True, METRICS_TOKEN=None)
+    assert make_settings(METRICS_ENABLED=True, METRICS_TOKEN="secret").METRICS_TOKEN
+    assert not make_settings(METRICS_ENABLED=False, METRICS_TOKEN=None).METRICS_TOKEN
+
+
+def test_local_metrics_need_no_token() -> None:
+    settings = make_settings(ENVIRONMENT="local", METRICS_TOKEN=None)
+    assert settings.METRICS_ENABLED
@@ -0,0 +1,23 @@
+from unittest.mock import patch
+
+from app.core.db import ReplicaSet
+
+
+def test_replicas_take_turns() -> None:
+    replicas = ReplicaSet(["a", "b", "c"], retry_seconds=30)
+    assert [replicas.candidates()[0] for _ in range(4)] == ["a", "b", "c", "a"]
+    assert replicas.candidates() == ["b", "c", "a"]
+
+
+def test_replica_down_is_skipped_until_retry() -> None:
+    replicas = ReplicaSet(["a", "b"], retry_seconds=30)
+    with patch("app.core.db.time.monotonic", return_value=100.0):
+        replicas.mark_down("a")
+        assert replicas.candidates() == ["b"]
+        assert replicas.candidates() == ["b"]
+    with patch("app.core.db.time.monotonic", return_value=130.0):
+        assert sorted(replicas.candidates()) == ["a", "b"]
+
+
+def test_no_replicas() -> None:
+    assert ReplicaSet([], retry_seconds=30).candidates() == []
@@ -0,0 +1,71 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from app.core.metrics import MultiprocessStore, Registry, merge, render_prometheus
+
+
+def test_render_prometheus() -> None:
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ["path"])
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=[0.1, 1])
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    latency.labels().observe(0.05)
+    latency.labels().observe(5)
+
+    text = render_prometheus(registry.collect())
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{path="/a\\"b"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_sum 5.05" in text
+    assert "latency_seconds_count 2" in text
+
+
+def test_labels_must_match() -> None:
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ["path"])
+    with pytest.raises(ValueError):
+        requests.labels()
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Again.")
+
+
+def test_merge_adds_up_workers() -> None:
+    workers = []
+    for _ in range(2):
+        registry = Registry()
+        registry.counter("requests_total", "Requests.").labels().inc()
+        registry.gauge("in_progress", "In progress.").labels().inc()
+        registry.histogram("latency_seconds", "Latency.").labels().observe(0.5)
+        workers.append(registry.collect())
+
+    merged = merge([(workers[0], True), (workers[1], False)])
+    text = render_prometheus(merged)
+    assert "requests_total 2" in text
+    assert 'latency_seconds_bucket{le="0.5"} 2' in text
+    assert "latency_seconds_count 2" in text
+    # The gauge of the worker that exited is left out
+    assert "in_progress 1" in text
+
+
+def test_multiprocess_store(tmp_path: Path) -> None:
+    registry = Registry()
+    registry.counter("requests_total", "Requests.").labels().inc()
+    other = Registry()
+    other.counter("requests_total", "Requests.").labels().inc(4)
+    # Left by a worker that is no longer running
+    (tmp_path / "99999999.json").write_text(
+        json.dumps({"pid": 99999999, "metrics": other.collect()})
+    )
+
+    store = MultiprocessStore(tmp_path, flush_seconds=5)
+    assert store.flush_due()
+    store.write(registry.collect())
+    assert not store.flush_due()
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+    assert "requests_total 5" in render_prometheus(store.read())
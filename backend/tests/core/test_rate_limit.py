@@ -0,0 +1,50 @@
+from app.core.rate_limit import MemoryRateLimitBackend, RateLimit
+
+
+def rate_limit(*, limit: int, window: float = 60) -> RateLimit:
+    return RateLimit(
+        name="test",
+        limit=limit,
+        window=window,
+        backend=MemoryRateLimitBackend(maxsize=100),
+    )
+
+
+def test_hits_under_the_limit_are_allowed() -> None:
+    limit = rate_limit(limit=3)
+    assert [limit.hit("key", now=600) for _ in range(3)] == [None, None, None]
+
+
+def test_hit_over_the_limit_waits_for_the_window() -> None:
+    limit = rate_limit(limit=3)
+    for _ in range(3):
+        limit.hit("key", now=600)
+    assert limit.hit("key", now=610) == 80
+
+
+def test_keys_are_limited_separately() -> None:
+    limit = rate_limit(limit=1)
+    assert limit.hit("first", now=600) is None
+    assert limit.hit("second", now=600) is None
+    assert limit.hit("first", now=600) is not None
+
+
+def test_previous_window_slides_out() -> None:
+    limit = rate_limit(limit=4)
+    for _ in range(4):
+        limit.hit("key", now=650)
+    # Half of the previous window still counts: 4 * 0.5 + 1
+    assert limit.hit("key", now=690) is None
+    assert limit.hit("key", now=690) is None
+    # 2 + 3 is over the limit until the first window has slid out
+    assert limit.hit("key", now=690) == 30
+    assert limit.hit("key", now=720) is None
+
+
+def test_memory_backend_drops_least_recently_used_keys() -> None:
+    backend = MemoryRateLimitBackend(maxsize=2)
+    backend.incr("first", 60)
+    backend.incr("second", 60)
+    backend.incr("third", 60)
+    assert backend.get("first") == 0
+    assert backend.get("third") == 1
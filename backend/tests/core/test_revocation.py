@@ -0,0 +1,49 @@
+import uuid
+from datetime import datetime, timezone
+
+from app.core.revocation import BloomFilter, RevocationStore
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(capacity=1_000, error_rate=0.01)
+    keys = [uuid.uuid4().bytes for _ in range(1_000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+
+
+def test_bloom_filter_false_positive_rate() -> None:
+    bloom = BloomFilter(capacity=1_000, error_rate=0.01)
+    for _ in range(1_000):
+        bloom.add(uuid.uuid4().bytes)
+    false_positives = sum(uuid.uuid4().bytes in bloom for _ in range(10_000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_counts_keys_once() -> None:
+    bloom = BloomFilter(capacity=10, error_rate=0.01)
+    key = uuid.uuid4().bytes
+    bloom.add(key)
+    bloom.add(key)
+    assert bloom.count == 1
+
+
+def test_store_reads_everything_first_then_what_changed() -> None:
+    store = RevocationStore(capacity=100, error_rate=0.01, sync_seconds=60)
+    assert store.sync_due()
+    assert store.sync_since() is None
+    synced_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    token_id = uuid.uuid4()
+    store.apply_sync([token_id], full=True, synced_at=synced_at)
+    assert store.might_contain(token_id)
+    assert not store.sync_due()
+    since = store.sync_since()
+    assert since is not None and since < synced_at
+
+
+def test_store_full_sync_drops_pruned_ids() -> None:
+    store = RevocationStore(capacity=100, error_rate=0.01, sync_seconds=60)
+    pruned = uuid.uuid4()
+    store.add(pruned)
+    store.apply_sync([], full=True, synced_at=datetime.now(timezone.utc))
+    assert not store.might_contain(pruned)
@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import jwt
+import pytest
+from jwt.exceptions import InvalidTokenError
+
+from app.core import security
+
+
+def test_verified_token_skips_the_signature_check() -> None:
+    token = security.create_access_token("user-id", expires_delta=timedelta(hours=1))
+    with patch("app.core.security.jwt.decode", wraps=jwt.decode) as decode:
+        first = security.decode_access_token(token)
+        second = security.decode_access_token(token)
+    assert first.sub == second.sub == "user-id"
+    assert decode.call_count == 1
+
+
+def test_cached_token_is_verified_again_after_exp() -> None:
+    token = security.create_access_token("user-id", expires_delta=timedelta(hours=1))
+    security.decode_access_token(token)
+    with (
+        patch("app.core.security.jwt.decode", wraps=jwt.decode) as decode,
+        patch("app.core.security.time") as clock,
+    ):
+        clock.time.return_value = time.time() + 2 * 3600
+        security.decode_access_token(token)
+    assert decode.call_count == 1
+
+
+def test_invalid_token_is_not_cached() -> None:
+    token = security.create_access_token("user-id", expires_delta=timedelta(hours=1))
+    tampered = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+    for _ in range(2):
+        with pytest.raises(InvalidTokenError):
+            security.decode_access_token(tampered)
+
+
+def test_expired_token_is_rejected() -> None:
+    token = security.create_access_token("user-id", expires_delta=timedelta(hours=-1))
+    with pytest.raises(InvalidTokenError):
+        security.decode_access_token(token)
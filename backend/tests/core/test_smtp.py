@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from app.core.smtp import smtp_pool
+from app.utils import OutgoingEmail, send_email, send_emails_batch
+from tests.utils.smtp import free_port, local_smtp_server
+
+
+def batch(size: int) -> list[OutgoingEmail]:
+    return [
+        OutgoingEmail(
+            email_to=f"user{i}@example.com", subject="Batch", html_content="<p>Hi</p>"
+        )
+        for i in range(size)
+    ]
+
+
+def test_send_emails_batch_uses_one_connection() -> None:
+    with local_smtp_server() as inbox:
+        assert send_emails_batch(batch(3)) == [None, None, None]
+        assert [message.rcpt_tos for message in inbox.messages] == [
+            ["user0@example.com"],
+            ["user1@example.com"],
+            ["user2@example.com"],
+        ]
+        assert inbox.connections == 1
+
+
+def test_connections_are_reused_between_sends() -> None:
+    with local_smtp_server() as inbox:
+        send_email(email_to="first@example.com", html_content="<p>Hi</p>")
+        send_email(email_to="second@example.com", html_content="<p>Hi</p>")
+        assert len(inbox.messages) == 2
+        assert inbox.connections == 1
+
+
+def test_idle_connections_are_not_reused() -> None:
+    with local_smtp_server() as inbox:
+        send_email(email_to="first@example.com", html_content="<p>Hi</p>")
+        with patch.object(smtp_pool, "max_idle_seconds", -1):
+            send_email(email_to="second@example.com", html_content="<p>Hi</p>")
+        assert inbox.connections == 2
+
+
+def test_reconnect_when_the_server_drops_the_connection() -> None:
+    with local_smtp_server(max_messages_per_connection=2) as inbox:
+        assert send_emails_batch(batch(5)) == [None] * 5
+        assert len(inbox.messages) == 5
+        assert inbox.connections == 3
+
+
+def test_send_emails_batch_reports_failures() -> None:
+    with (
+        local_smtp_server(),
+        # Nothing listens on this port
+        patch("app.core.config.settings.SMTP_PORT", free_port()),
+    ):
+        errors = send_emails_batch(batch(2))
+    assert all(errors)
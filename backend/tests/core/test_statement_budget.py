@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import pytest
+from starlette.types import Scope
+
+from app.core.statement_budget import (
+    RequestStatements,
+    StatementBudgetExceeded,
+    statement_budget,
+)
+
+
+@statement_budget(2)
+def endpoint() -> None:
+    pass
+
+
+def request_scope() -> Scope:
+    return {"type": "http", "method": "GET", "endpoint": endpoint}
+
+
+def test_declared_budget() -> None:
+    statements = RequestStatements(request_scope())
+    assert statements.budget == 2
+    statements.record("INSERT INTO item VALUES (%(id)s)")
+    statements.record("UPDATE item SET title = %(title)s")
+    assert statements.problem() is None
+    statements.record("DELETE FROM item")
+    assert statements.problem() == (
+        "GET unmatched sent 3 SQL statements, its budget is 2"
+    )
+
+
+def test_default_budget() -> None:
+    with patch("app.core.config.settings.SQL_STATEMENT_BUDGET", 1):
+        statements = RequestStatements({"type": "http", "method": "GET"})
+        assert statements.budget == 1
+
+
+def test_repeated_select_is_reported() -> None:
+    select = "SELECT item.id FROM item WHERE item.owner_id = %(owner_id)s"
+    with (
+        patch("app.core.config.settings.SQL_STATEMENT_BUDGET", 100),
+        patch("app.core.config.settings.SQL_REPEATED_SELECT_THRESHOLD", 3),
+    ):
+        statements = RequestStatements(request_scope())
+        # Only the endpoint's own declared budget would fail here
+        statements.scope.pop("endpoint")
+        for _ in range(2):
+            statements.record(select)
+        assert statements.problem() is None
+        statements.record(select)
+        problem = statements.problem()
+    assert problem
+    assert "same SELECT 3 times" in problem
+    assert select in problem
+
+
+def test_raise_as_soon_as_over_budget() -> None:
+    statements = RequestStatements(request_scope())
+    with patch("app.core.config.settings.SQL_STATEMENT_BUDGET_ACTION", "raise"):
+        statements.record("SELECT 1")
+        statements.record("SELECT 2")
+        with pytest.raises(StatementBudgetExceeded):
+            statements.record("SELECT 3")
@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+from app.core.templates import create_template_environment, email_templates
+from app.utils import generate_new_account_email
+
+
+def write_template(path: Path, content: str, mtime: float) -> None:
+    path.write_text(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_email_templates_are_compiled_once() -> None:
+    template = email_templates.get_template("new_account.html")
+    assert email_templates.get_template("new_account.html") is template
+
+
+def test_generate_new_account_email_renders_context() -> None:
+    email_data = generate_new_account_email(
+        email_to="new@example.com", username="new@example.com", password="secret"
+    )
+    assert "new@example.com" in email_data.html_content
+    assert "secret" in email_data.html_content
+
+
+def test_templates_reload_when_changed(tmp_path: Path) -> None:
+    environment = create_template_environment(tmp_path, auto_reload=True)
+    write_template(tmp_path / "hello.html", "Hello {{ name }}", mtime=1_000)
+    assert environment.get_template("hello.html").render(name="Ann") == "Hello Ann"
+    write_template(tmp_path / "hello.html", "Bye {{ name }}", mtime=2_000)
+    assert environment.get_template("hello.html").render(name="Ann") == "Bye Ann"
+
+
+def test_templates_are_not_reloaded_without_auto_reload(tmp_path: Path) -> None:
+    environment = create_template_environment(tmp_path, auto_reload=False)
+    write_template(tmp_path / "hello.html", "Hello {{ name }}", mtime=1_000)
+    assert environment.get_template("hello.html").render(name="Ann") == "Hello Ann"
+    write_template(tmp_path / "hello.html", "Bye {{ name }}", mtime=2_000)
+    assert environment.get_template("hello.html").render(name="Ann") == "Hello Ann"
@@ -0,0 +1,29 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.models import ItemTombstone
+
+
+def test_prune_item_tombstones(db: Session) -> None:
+    now = datetime.now(timezone.utc)
+    retention = timedelta(days=settings.ITEM_TOMBSTONE_RETENTION_DAYS)
+    expired_id, recent_id = uuid.uuid4(), uuid.uuid4()
+    db.add_all(
+        [
+            ItemTombstone(
+                id=expired_id,
+                owner_id=uuid.uuid4(),
+                deleted_at=now - retention - timedelta(days=1),
+            ),
+            ItemTombstone(id=recent_id, owner_id=uuid.uuid4(), deleted_at=now),
+        ]
+    )
+    db.commit()
+    crud.prune_item_tombstones(session=db)
+    db.expire_all()
+    assert db.get(ItemTombstone, expired_id) is None
+    assert db.get(ItemTombstone, recent_id) is not None
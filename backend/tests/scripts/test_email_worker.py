@@ -0,0 +1,109 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, delete, select
+
+from app import crud
+from app.core.config import settings
+from app.email_worker import backoff_seconds, prune_outbox, send_due_emails
+from app.models import EmailOutbox
+from tests.utils.smtp import Inbox, free_port, local_smtp_server
+
+
+@pytest.fixture
+def inbox(db: Session) -> Generator[Inbox, None, None]:
+    # Start from an empty outbox, other tests queue emails too
+    db.execute(delete(EmailOutbox))
+    db.commit()
+    with local_smtp_server() as inbox:
+        yield inbox
+
+
+def queue_email(db: Session, email_to: str = "queued@example.com") -> EmailOutbox:
+    return crud.enqueue_email(
+        session=db, email_to=email_to, subject="Queued", html_content="<p>Hi</p>"
+    )
+
+
+def test_send_due_emails(db: Session, inbox: Inbox) -> None:
+    email = queue_email(db)
+    assert send_due_emails(db) == 1
+    assert [message.rcpt_tos for message in inbox.messages] == [["queued@example.com"]]
+    db.refresh(email)
+    assert email.sent_at is not None
+    assert email.attempts == 1
+    # Sent emails are not sent again
+    assert send_due_emails(db) == 0
+    assert len(inbox.messages) == 1
+
+
+def test_send_due_emails_retries_with_backoff(db: Session, inbox: Inbox) -> None:
+    email = queue_email(db)
+    # Nothing listens on this port
+    with patch("app.core.config.settings.SMTP_PORT", free_port()):
+        assert send_due_emails(db) == 1
+    db.refresh(email)
+    assert email.sent_at is None
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > datetime.now(timezone.utc)
+    # Not due again until the backoff is over
+    assert send_due_emails(db) == 0
+
+    email.next_attempt_at = datetime.now(timezone.utc)
+    db.add(email)
+    db.commit()
+    assert send_due_emails(db) == 1
+    db.refresh(email)
+    assert email.sent_at is not None
+    assert email.attempts == 2
+    assert len(inbox.messages) == 1
+
+
+def test_send_due_emails_gives_up(db: Session, inbox: Inbox) -> None:
+    email = queue_email(db)
+    with (
+        patch("app.core.config.settings.EMAIL_OUTBOX_MAX_ATTEMPTS", 1),
+        patch("app.core.config.settings.SMTP_PORT", free_port()),
+    ):
+        assert send_due_emails(db) == 1
+    db.refresh(email)
+    assert email.attempts == 1
+    assert email.failed_at is not None
+    # Not tried again, even with more attempts allowed
+    email.next_attempt_at = datetime.now(timezone.utc)
+    db.add(email)
+    db.commit()
+    assert send_due_emails(db) == 0
+    assert inbox.messages == []
+
+
+@pytest.mark.usefixtures("inbox")
+def test_prune_outbox(db: Session) -> None:
+    long_ago = datetime.now(timezone.utc) - timedelta(
+        days=settings.EMAIL_OUTBOX_RETENTION_DAYS + 1
+    )
+    sent, failed, pending, recent = (
+        queue_email(db, f"{name}@example.com")
+        for name in ("sent", "failed", "pending", "recent")
+    )
+    sent.sent_at = long_ago
+    failed.failed_at = long_ago
+    recent.sent_at = datetime.now(timezone.utc)
+    db.add_all([sent, failed, recent])
+    db.commit()
+    prune_outbox(db)
+    remaining = db.exec(select(EmailOutbox.email_to)).all()
+    assert sorted(remaining) == ["pending@example.com", "recent@example.com"]
+
+
+def test_backoff_seconds() -> None:
+    with (
+        patch("app.core.config.settings.EMAIL_OUTBOX_BACKOFF_SECONDS", 10),
+        patch("app.core.config.settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", 60),
+    ):
+        assert 5 <= backoff_seconds(1) <= 10
+        assert 20 <= backoff_seconds(3) <= 40
+        assert 30 <= backoff_seconds(10) <= 60
@@ -0,0 +1,54 @@
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, col, select
+
+from app.core.db import engine
+from app.merge_duplicate_users import duplicate_users, merge_users
+from app.models import Item, User
+from tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture
+def session() -> Generator[Session, None, None]:
+    # Emails differing in case can only exist without the unique index, which
+    # comes back with the rollback
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        connection.execute(text("SET LOCAL lock_timeout = '5s'"))
+        connection.execute(text("DROP INDEX ix_user_email_lower"))
+        with Session(connection, join_transaction_mode="create_savepoint") as session:
+            yield session
+        transaction.rollback()
+
+
+def add_user(session: Session, email: str, *, is_superuser: bool = False) -> User:
+    user = User(email=email, hashed_password="x", is_superuser=is_superuser)
+    session.add(user)
+    session.commit()
+    return user
+
+
+def test_merge_duplicate_users(session: Session) -> None:
+    email = random_email()
+    duplicate = add_user(session, email.upper())
+    keeper = add_user(session, email, is_superuser=True)
+    other = add_user(session, random_email())
+    item = Item(title=random_lower_string(), owner_id=duplicate.id)
+    session.add(item)
+    session.commit()
+    duplicate_id, keeper_id, item_id = duplicate.id, keeper.id, item.id
+
+    duplicates = duplicate_users(session)
+    assert [(row.id, row.keeper_id) for row in duplicates] == [
+        (duplicate_id, keeper_id)
+    ]
+    merge_users(session, duplicates)
+
+    users = session.exec(
+        select(User.id).where(col(User.id).in_([duplicate_id, keeper_id, other.id]))
+    ).all()
+    assert sorted(users) == sorted([keeper_id, other.id])
+    assert session.get(Item, item_id).owner_id == keeper_id  # type: ignore[union-attr]
+    assert duplicate_users(session) == []
@@ -0,0 +1,130 @@
+import socketserver
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from unittest.mock import patch
+
+
+@dataclass
+class ReceivedEmail:
+    mail_from: str
+    rcpt_tos: list[str]
+    data: bytes
+
+
+@dataclass
+class Inbox:
+    # Seconds per message, stands in for a slow mail server
+    delay: float = 0
+    # Seconds before greeting a new connection, stands in for TLS and login
+    connect_delay: float = 0
+    # Drop the connection after this many messages, like servers that cap them
+    max_messages_per_connection: int | None = None
+    messages: list[ReceivedEmail] = field(default_factory=list)
+    connections: int = 0
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Just enough SMTP for smtplib: no TLS, no auth, one recipient list per
+    message.
+    """
+
+    server: "_SMTPServer"
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        inbox = self.server.inbox
+        inbox.connections += 1
+        mail_from, rcpt_tos = "", []
+        received = 0
+        time.sleep(inbox.connect_delay)
+        self.reply("220 localhost SMTP stand-in")
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb, _, argument = command.partition(" ")
+            verb = verb.upper()
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from = argument.partition(":")[2].strip("<> ")
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_tos.append(argument.partition(":")[2].strip("<> "))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                time.sleep(inbox.delay)
+                inbox.messages.append(ReceivedEmail(mail_from, rcpt_tos, data))
+                mail_from, rcpt_tos = "", []
+                self.reply("250 Message accepted for delivery")
+                received += 1
+                if received == inbox.max_messages_per_connection:
+                    return
+            elif verb == "RSET":
+                mail_from, rcpt_tos = "", []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, inbox: Inbox) -> None:
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.inbox = inbox
+
+
+def free_port() -> int:
+    with socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler) as s:
+        port: int = s.server_address[1]
+        return port
+
+
+@contextmanager
+def local_smtp_server(
+    delay: float = 0,
+    connect_delay: float = 0,
+    max_messages_per_connection: int | None = None,
+) -> Generator[Inbox, None, None]:
+    """
+    Run a local SMTP server and point the email settings at it.
+    """
+    inbox = Inbox(
+        delay=delay,
+        connect_delay=connect_delay,
+        max_messages_per_connection=max_messages_per_connection,
+    )
+    server = _SMTPServer(inbox)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    try:
+        with (
+            patch("app.core.config.settings.SMTP_HOST", host),
+            patch("app.core.config.settings.SMTP_PORT", port),
+            patch("app.core.config.settings.SMTP_TLS", False),
+            patch("app.core.config.settings.SMTP_SSL", False),
+            patch("app.core.config.settings.SMTP_USER", None),
+            patch("app.core.config.settings.SMTP_PASSWORD", None),
+            patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+        ):
+            yield inbox
+    finally:
+        server.shutdown()
+        server.server_close()
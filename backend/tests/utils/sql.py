@@ -0,0 +1,101 @@
+from collections.abc import Collection, Generator, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from app.core.statement_budget import current_statements
+
+# Tables that grow with use, where a sequential scan gets slower with every row
+LARGE_TABLES = frozenset({"user", "item", "revoked_token", "email_outbox"})
+
+
+class SequentialScan(Exception):
+    pass
+
+
+@contextmanager
+def count_statements(engine: Engine) -> Generator[list[str], None, None]:
+    """
+    Collect the SQL statements `engine` sends while the block runs.
+
+    COMMIT is not a statement here, it goes through the DBAPI connection.
+    """
+    statements: list[str] = []
+
+    def before_cursor_execute(
+        _conn: Any, _cursor: Any, statement: str, *_args: Any
+    ) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _scanned_tables(plan: dict[str, Any]) -> Iterator[str]:
+    if plan["Node Type"] == "Seq Scan":
+        yield plan["Relation Name"]
+    elif (
+        plan["Node Type"] in ("Index Scan", "Index Only Scan")
+        and "Filter" in plan
+        and "Index Cond" not in plan
+    ):
+        # Walks the whole index for its order and filters every row
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _scanned_tables(child)
+
+
+@contextmanager
+def forbid_seq_scans(
+    engine: Engine, tables: Collection[str] = LARGE_TABLES
+) -> Generator[None, None, None]:
+    """
+    Raise `SequentialScan` when a request sends a statement whose query plan
+    reads one of `tables` from start to end: a sequential scan, or an index
+    scan without an index condition that filters the rows it walks.
+
+    Test tables hold a few rows, a sequential scan is the cheapest plan for all
+    of them. Statements are explained with sequential scans disabled, the
+    planner then uses one only when no index can answer the statement, and
+    otherwise may walk an index whose order doesn't help the filter.
+    """
+
+    def before_cursor_execute(
+        conn: Any,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        _context: Any,
+        executemany: bool,
+    ) -> None:
+        # Statements of the tests themselves don't matter
+        if current_statements.get() is None:
+            return
+        if statement.lstrip()[:6].upper() not in ("SELECT", "UPDATE", "DELETE"):
+            return
+        # Each row of an executemany runs the same plan
+        if executemany:
+            parameters = parameters[0]
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = cursor.fetchone()[0][0]["Plan"]
+            cursor.execute("RESET enable_seqscan")
+        finally:
+            cursor.close()
+        scanned = sorted(set(_scanned_tables(plan)) & set(tables))
+        if scanned:
+            raise SequentialScan(
+                f"Full scan on {', '.join(scanned)}, no index answers: {statement}"
+            )
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,40 @@
+import uuid
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import text
+
+from app.core.db import engine
+from app.core.statement_budget import RequestStatements, current_statements
+from tests.utils.sql import SequentialScan, forbid_seq_scans
+
+
+@pytest.fixture(autouse=True)
+def in_request() -> Generator[None, None, None]:
+    # Only the statements of a request are explained
+    token = current_statements.set(RequestStatements({"type": "http"}))
+    yield
+    current_statements.reset(token)
+
+
+def run(statement: str, **parameters: object) -> None:
+    with forbid_seq_scans(engine), engine.connect() as conn:
+        conn.execute(text(statement), parameters)
+
+
+def test_index_condition_passes() -> None:
+    run("SELECT id FROM item WHERE id = :id", id=uuid.uuid4())
+    # Every row walked is returned, up to the limit
+    run("SELECT id FROM item ORDER BY id LIMIT 10")
+
+
+def test_filter_without_index_is_flagged() -> None:
+    # Walks the primary key for its order, filtering each row on the way
+    with pytest.raises(SequentialScan, match="item"):
+        run(
+            "SELECT id FROM item WHERE description = :description "
+            "ORDER BY id LIMIT 10",
+            description="unindexed",
+        )
+    with pytest.raises(SequentialScan, match="item"):
+        run("SELECT id FROM item WHERE description = :description", description="x")
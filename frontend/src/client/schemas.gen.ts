@@ -55,6 +55,34 @@ export const Body_login_login_access_tokenSchema = {
     title: 'Body_login-login_access_token'
 } as const;
 
+export const BulkItemErrorSchema = {
+    properties: {
+        index: {
+            type: 'integer',
+            title: 'Index'
+        },
+        id: {
+            anyOf: [
+                {
+                    type: 'string',
+                    format: 'uuid'
+                },
+                {
+                    type: 'null'
+                }
+            ],
+            title: 'Id'
+        },
+        detail: {
+            type: 'string',
+            title: 'Detail'
+        }
+    },
+    type: 'object',
+    required: ['index', 'detail'],
+    title: 'BulkItemError'
+} as const;
+
 export const HTTPValidationErrorSchema = {
     properties: {
         detail: {
@@ -69,6 +97,75 @@ export const HTTPValidationErrorSchema = {
     title: 'HTTPValidationError'
 } as const;
 
+export const ItemBulkUpdateSchema = {
+    properties: {
+        title: {
+            anyOf: [
+                {
+                    type: 'string',
+                    maxLength: 255,
+                    minLength: 1
+                },
+                {
+                    type: 'null'
+                }
+            ],
+            title: 'Title'
+        },
+        description: {
+            anyOf: [
+                {
+                    type: 'string',
+                    maxLength: 255
+                },
+                {
+                    type: 'null'
+                }
+            ],
+            title: 'Description'
+        },
+        id: {
+            type: 'string',
+            format: 'uuid',
+            title: 'Id'
+        }
+    },
+    type: 'object',
+    required: ['id'],
+    title: 'ItemBulkUpdate'
+} as const;
+
+export const ItemChangesSchema = {
+    properties: {
+        data: {
+            items: {
+                '$ref': '#/components/schemas/ItemPublic'
+            },
+            type: 'array',
+            title: 'Data'
+        },
+        deleted: {
+            items: {
+                type: 'string',
+                format: 'uuid'
+            },
+            type: 'array',
+            title: 'Deleted'
+        },
+        next_cursor: {
+            type: 'string',
+            title: 'Next Cursor'
+        },
+        has_more: {
+            type: 'boolean',
+            title: 'Has More'
+        }
+    },
+    type: 'object',
+    required: ['data', 'deleted', 'next_cursor', 'has_more'],
+    title: 'ItemChanges'
+} as const;
+
 export const ItemCreateSchema = {
     properties: {
         title: {
@@ -124,10 +221,20 @@ export const ItemPublicSchema = {
             type: 'string',
             format: 'uuid',
             title: 'Owner Id'
+        },
+        created_at: {
+            type: 'string',
+            format: 'date-time',
+            title: 'Created At'
+        },
+        updated_at: {
+            type: 'string',
+            format: 'date-time',
+            title: 'Updated At'
         }
     },
     type: 'object',
-    required: ['title', 'id', 'owner_id'],
+    required: ['title', 'id', 'owner_id', 'created_at', 'updated_at'],
     title: 'ItemPublic'
 } as const;
 
@@ -163,6 +270,53 @@ export const ItemUpdateSchema = {
     title: 'ItemUpdate'
 } as const;
 
+export const ItemsBulkDeletedSchema = {
+    properties: {
+        ids: {
+            items: {
+                type: 'string',
+                format: 'uuid'
+            },
+            type: 'array',
+            title: 'Ids'
+        },
+        errors: {
+            items: {
+                '$ref': '#/components/schemas/BulkItemError'
+            },
+            type: 'array',
+            title: 'Errors',
+            default: []
+        }
+    },
+    type: 'object',
+    required: ['ids'],
+    title: 'ItemsBulkDeleted'
+} as const;
+
+export const ItemsBulkPublicSchema = {
+    properties: {
+        data: {
+            items: {
+                '$ref': '#/components/schemas/ItemPublic'
+            },
+            type: 'array',
+            title: 'Data'
+        },
+        errors: {
+            items: {
+                '$ref': '#/components/schemas/BulkItemError'
+            },
+            type: 'array',
+            title: 'Errors',
+            default: []
+        }
+    },
+    type: 'object',
+    required: ['data'],
+    title: 'ItemsBulkPublic'
+} as const;
+
 export const ItemsPublicSchema = {
     properties: {
         data: {
@@ -173,8 +327,32 @@ export const ItemsPublicSchema = {
             title: 'Data'
         },
         count: {
-            type: 'integer',
+            anyOf: [
+                {
+                    type: 'integer'
+                },
+                {
+                    type: 'null'
+                }
+            ],
             title: 'Count'
+        },
+        count_type: {
+            type: 'string',
+            enum: ['exact', 'estimated', 'none'],
+            title: 'Count Type',
+            default: 'exact'
+        },
+        next_cursor: {
+            anyOf: [
+                {
+                    type: 'string'
+                },
+                {
+                    type: 'null'
+                }
+            ],
+            title: 'Next Cursor'
         }
     },
     type: 'object',
@@ -237,6 +415,18 @@ export const PrivateUserCreateSchema = {
     title: 'PrivateUserCreate'
 } as const;
 
+export const RefreshTokenRequestSchema = {
+    properties: {
+        refresh_token: {
+            type: 'string',
+            title: 'Refresh Token'
+        }
+    },
+    type: 'object',
+    required: ['refresh_token'],
+    title: 'RefreshTokenRequest'
+} as const;
+
 export const TokenSchema = {
     properties: {
         access_token: {
@@ -247,6 +437,17 @@ export const TokenSchema = {
             type: 'string',
             title: 'Token Type',
             default: 'bearer'
+        },
+        refresh_token: {
+            anyOf: [
+                {
+                    type: 'string'
+                },
+                {
+                    type: 'null'
+                }
+            ],
+            title: 'Refresh Token'
         }
     },
     type: 'object',
@@ -350,10 +551,20 @@ export const UserPublicSchema = {
             type: 'string',
             format: 'uuid',
             title: 'Id'
+        },
+        created_at: {
+            type: 'string',
+            format: 'date-time',
+            title: 'Created At'
+        },
+        updated_at: {
+            type: 'string',
+            format: 'date-time',
+            title: 'Updated At'
         }
     },
     type: 'object',
-    required: ['email', 'id'],
+    required: ['email', 'id', 'created_at', 'updated_at'],
     title: 'UserPublic'
 } as const;
 
@@ -486,8 +697,32 @@ export const UsersPublicSchema = {
             title: 'Data'
         },
         count: {
-            type: 'integer',
+            anyOf: [
+                {
+                    type: 'integer'
+                },
+                {
+                    type: 'null'
+                }
+            ],
             title: 'Count'
+        },
+        count_type: {
+            type: 'string',
+            enum: ['exact', 'estimated', 'none'],
+            title: 'Count Type',
+            default: 'exact'
+        },
+        next_cursor: {
+            anyOf: [
+                {
+                    type: 'string'
+                },
+                {
+                    type: 'null'
+                }
+            ],
+            title: 'Next Cursor'
         }
     },
     type: 'object',
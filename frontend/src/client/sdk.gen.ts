@@ -3,15 +3,23 @@
 import type { CancelablePromise } from './core/CancelablePromise';
 import { OpenAPI } from './core/OpenAPI';
 import { request as __request } from './core/request';
-import type { ItemsReadItemsData, ItemsReadItemsResponse, ItemsCreateItemData, ItemsCreateItemResponse, ItemsReadItemData, ItemsReadItemResponse, ItemsUpdateItemData, ItemsUpdateItemResponse, ItemsDeleteItemData, ItemsDeleteItemResponse, LoginLoginAccessTokenData, LoginLoginAccessTokenResponse, LoginTestTokenResponse, LoginRecoverPasswordData, LoginRecoverPasswordResponse, LoginResetPasswordData, LoginResetPasswordResponse, LoginRecoverPasswordHtmlContentData, LoginRecoverPasswordHtmlContentResponse, PrivateCreateUserData, PrivateCreateUserResponse, UsersReadUsersData, UsersReadUsersResponse, UsersCreateUserData, UsersCreateUserResponse, UsersReadUserMeResponse, UsersDeleteUserMeResponse, UsersUpdateUserMeData, UsersUpdateUserMeResponse, UsersUpdatePasswordMeData, UsersUpdatePasswordMeResponse, UsersRegisterUserData, UsersRegisterUserResponse, UsersReadUserByIdData, UsersReadUserByIdResponse, UsersUpdateUserData, UsersUpdateUserResponse, UsersDeleteUserData, UsersDeleteUserResponse, UtilsTestEmailData, UtilsTestEmailResponse, UtilsHealthCheckResponse } from './types.gen';
+import type { ItemsReadItemsData, ItemsReadItemsResponse, ItemsCreateItemData, ItemsCreateItemResponse, ItemsExportItemsData, ItemsExportItemsResponse, ItemsReadItemChangesData, ItemsReadItemChangesResponse, ItemsCreateItemsBulkData, ItemsCreateItemsBulkResponse, ItemsDeleteItemsBulkData, ItemsDeleteItemsBulkResponse, ItemsUpdateItemsBulkData, ItemsUpdateItemsBulkResponse, ItemsReadItemData, ItemsReadItemResponse, ItemsUpdateItemData, ItemsUpdateItemResponse, ItemsDeleteItemData, ItemsDeleteItemResponse, LoginLoginAccessTokenData, LoginLoginAccessTokenResponse, LoginRefreshAccessTokenData, LoginRefreshAccessTokenResponse, LoginLogoutResponse, LoginTestTokenResponse, LoginRecoverPasswordData, LoginRecoverPasswordResponse, LoginResetPasswordData, LoginResetPasswordResponse, LoginRecoverPasswordHtmlContentData, LoginRecoverPasswordHtmlContentResponse, PrivateCreateUserData, PrivateCreateUserResponse, UsersReadUsersData, UsersReadUsersResponse, UsersCreateUserData, UsersCreateUserResponse, UsersReadUserMeResponse, UsersDeleteUserMeResponse, UsersUpdateUserMeData, UsersUpdateUserMeResponse, UsersUpdatePasswordMeData, UsersUpdatePasswordMeResponse, UsersRegisterUserData, UsersRegisterUserResponse, UsersExportUsersData, UsersExportUsersResponse, UsersReadUserByIdData, UsersReadUserByIdResponse, UsersUpdateUserData, UsersUpdateUserResponse, UsersDeleteUserData, UsersDeleteUserResponse, UtilsTestEmailData, UtilsTestEmailResponse, UtilsPasswordHashingStatsResponse, UtilsDbPoolStatsResponse, UtilsHealthCheckResponse } from './types.gen';
 
 export class ItemsService {
     /**
      * Read Items
      * Retrieve items.
+     *
+     * Pass the `next_cursor` of a page as `cursor` to fetch the following page by
+     * keyset instead of `skip`, this stays fast no matter how deep the page is.
+     *
+     * Pass `q` to search titles and descriptions, matches come best first and are
+     * paged with `skip`.
      * @param data The data for the request.
      * @param data.skip
      * @param data.limit
+     * @param data.cursor
+     * @param data.q
      * @returns ItemsPublic Successful Response
      * @throws ApiError
      */
@@ -21,7 +29,9 @@ export class ItemsService {
             url: '/api/v1/items/',
             query: {
                 skip: data.skip,
-                limit: data.limit
+                limit: data.limit,
+                cursor: data.cursor,
+                q: data.q
             },
             errors: {
                 422: 'Validation Error'
@@ -49,6 +59,120 @@ export class ItemsService {
         });
     }
     
+    /**
+     * Export Items
+     * Stream all items as NDJSON or CSV, memory use doesn't grow with the number
+     * of items.
+     * @param data The data for the request.
+     * @param data.format
+     * @returns unknown Successful Response
+     * @throws ApiError
+     */
+    public static exportItems(data: ItemsExportItemsData = {}): CancelablePromise<ItemsExportItemsResponse> {
+        return __request(OpenAPI, {
+            method: 'GET',
+            url: '/api/v1/items/export',
+            query: {
+                format: data.format
+            },
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
+    /**
+     * Read Item Changes
+     * Items created or updated since `since`, and the ids of the items deleted
+     * since then, oldest change first.
+     *
+     * Pass the `next_cursor` of the response as `cursor` to get the following
+     * changes, right away when `has_more` or in the next sync. The last minute of
+     * changes can be sent again, apply them by id.
+     * @param data The data for the request.
+     * @param data.since
+     * @param data.cursor
+     * @param data.limit
+     * @returns ItemChanges Successful Response
+     * @throws ApiError
+     */
+    public static readItemChanges(data: ItemsReadItemChangesData = {}): CancelablePromise<ItemsReadItemChangesResponse> {
+        return __request(OpenAPI, {
+            method: 'GET',
+            url: '/api/v1/items/changes',
+            query: {
+                since: data.since,
+                cursor: data.cursor,
+                limit: data.limit
+            },
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
+    /**
+     * Create Items Bulk
+     * Create many items in one transaction.
+     * @param data The data for the request.
+     * @param data.requestBody
+     * @returns ItemsBulkPublic Successful Response
+     * @throws ApiError
+     */
+    public static createItemsBulk(data: ItemsCreateItemsBulkData): CancelablePromise<ItemsCreateItemsBulkResponse> {
+        return __request(OpenAPI, {
+            method: 'POST',
+            url: '/api/v1/items/bulk',
+            body: data.requestBody,
+            mediaType: 'application/json',
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
+    /**
+     * Delete Items Bulk
+     * Delete many items in one transaction, items that can't be deleted are
+     * reported in `errors` by their position in the request.
+     * @param data The data for the request.
+     * @param data.requestBody
+     * @returns ItemsBulkDeleted Successful Response
+     * @throws ApiError
+     */
+    public static deleteItemsBulk(data: ItemsDeleteItemsBulkData): CancelablePromise<ItemsDeleteItemsBulkResponse> {
+        return __request(OpenAPI, {
+            method: 'DELETE',
+            url: '/api/v1/items/bulk',
+            body: data.requestBody,
+            mediaType: 'application/json',
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
+    /**
+     * Update Items Bulk
+     * Update many items in one transaction, items that can't be updated are
+     * reported in `errors` by their position in the request.
+     * @param data The data for the request.
+     * @param data.requestBody
+     * @returns ItemsBulkPublic Successful Response
+     * @throws ApiError
+     */
+    public static updateItemsBulk(data: ItemsUpdateItemsBulkData): CancelablePromise<ItemsUpdateItemsBulkResponse> {
+        return __request(OpenAPI, {
+            method: 'PATCH',
+            url: '/api/v1/items/bulk',
+            body: data.requestBody,
+            mediaType: 'application/json',
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
     /**
      * Read Item
      * Get item by ID.
@@ -137,6 +261,41 @@ export class LoginService {
         });
     }
     
+    /**
+     * Refresh Access Token
+     * Exchange a refresh token for a new access token and refresh token, a
+     * refresh token can only be used once
+     * @param data The data for the request.
+     * @param data.requestBody
+     * @returns Token Successful Response
+     * @throws ApiError
+     */
+    public static refreshAccessToken(data: LoginRefreshAccessTokenData): CancelablePromise<LoginRefreshAccessTokenResponse> {
+        return __request(OpenAPI, {
+            method: 'POST',
+            url: '/api/v1/login/refresh-token',
+            body: data.requestBody,
+            mediaType: 'application/json',
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
+    /**
+     * Logout
+     * End the login session of the access token, its access and refresh tokens
+     * stop working
+     * @returns Message Successful Response
+     * @throws ApiError
+     */
+    public static logout(): CancelablePromise<LoginLogoutResponse> {
+        return __request(OpenAPI, {
+            method: 'POST',
+            url: '/api/v1/logout'
+        });
+    }
+    
     /**
      * Test Token
      * Test access token
@@ -239,9 +398,13 @@ export class UsersService {
     /**
      * Read Users
      * Retrieve users.
+     *
+     * Pass the `next_cursor` of a page as `cursor` to fetch the following page by
+     * keyset instead of `skip`.
      * @param data The data for the request.
      * @param data.skip
      * @param data.limit
+     * @param data.cursor
      * @returns UsersPublic Successful Response
      * @throws ApiError
      */
@@ -251,7 +414,8 @@ export class UsersService {
             url: '/api/v1/users/',
             query: {
                 skip: data.skip,
-                limit: data.limit
+                limit: data.limit,
+                cursor: data.cursor
             },
             errors: {
                 422: 'Validation Error'
@@ -365,6 +529,28 @@ export class UsersService {
         });
     }
     
+    /**
+     * Export Users
+     * Stream all users as NDJSON or CSV, memory use doesn't grow with the number
+     * of users.
+     * @param data The data for the request.
+     * @param data.format
+     * @returns unknown Successful Response
+     * @throws ApiError
+     */
+    public static exportUsers(data: UsersExportUsersData = {}): CancelablePromise<UsersExportUsersResponse> {
+        return __request(OpenAPI, {
+            method: 'GET',
+            url: '/api/v1/users/export',
+            query: {
+                format: data.format
+            },
+            errors: {
+                422: 'Validation Error'
+            }
+        });
+    }
+    
     /**
      * Read User By Id
      * Get a specific user by id.
@@ -454,6 +640,32 @@ export class UtilsService {
         });
     }
     
+    /**
+     * Password Hashing Stats
+     * Queue depth and throughput of the password hashing pool.
+     * @returns number Successful Response
+     * @throws ApiError
+     */
+    public static passwordHashingStats(): CancelablePromise<UtilsPasswordHashingStatsResponse> {
+        return __request(OpenAPI, {
+            method: 'GET',
+            url: '/api/v1/utils/password-hashing-stats/'
+        });
+    }
+    
+    /**
+     * Db Pool Stats
+     * Connections in use and checkout wait times of the database pools.
+     * @returns unknown Successful Response
+     * @throws ApiError
+     */
+    public static dbPoolStats(): CancelablePromise<UtilsDbPoolStatsResponse> {
+        return __request(OpenAPI, {
+            method: 'GET',
+            url: '/api/v1/utils/db-pool-stats/'
+        });
+    }
+    
     /**
      * Health Check
      * @returns boolean Successful Response
@@ -9,10 +9,29 @@ export type Body_login_login_access_token = {
     client_secret?: (string | null);
 };
 
+export type BulkItemError = {
+    index: number;
+    id?: (string | null);
+    detail: string;
+};
+
 export type HTTPValidationError = {
     detail?: Array<ValidationError>;
 };
 
+export type ItemBulkUpdate = {
+    title?: (string | null);
+    description?: (string | null);
+    id: string;
+};
+
+export type ItemChanges = {
+    data: Array<ItemPublic>;
+    deleted: Array<string>;
+    next_cursor: string;
+    has_more: boolean;
+};
+
 export type ItemCreate = {
     title: string;
     description?: (string | null);
@@ -23,11 +42,25 @@ export type ItemPublic = {
     description?: (string | null);
     id: string;
     owner_id: string;
+    created_at: string;
+    updated_at: string;
+};
+
+export type ItemsBulkDeleted = {
+    ids: Array<string>;
+    errors?: Array<BulkItemError>;
+};
+
+export type ItemsBulkPublic = {
+    data: Array<ItemPublic>;
+    errors?: Array<BulkItemError>;
 };
 
 export type ItemsPublic = {
     data: Array<ItemPublic>;
-    count: number;
+    count: (number | null);
+    count_type?: 'exact' | 'estimated' | 'none';
+    next_cursor?: (string | null);
 };
 
 export type ItemUpdate = {
@@ -51,9 +84,14 @@ export type PrivateUserCreate = {
     is_verified?: boolean;
 };
 
+export type RefreshTokenRequest = {
+    refresh_token: string;
+};
+
 export type Token = {
     access_token: string;
     token_type?: string;
+    refresh_token?: (string | null);
 };
 
 export type UpdatePassword = {
@@ -75,6 +113,8 @@ export type UserPublic = {
     is_superuser?: boolean;
     full_name?: (string | null);
     id: string;
+    created_at: string;
+    updated_at: string;
 };
 
 export type UserRegister = {
@@ -85,7 +125,9 @@ export type UserRegister = {
 
 export type UsersPublic = {
     data: Array<UserPublic>;
-    count: number;
+    count: (number | null);
+    count_type?: 'exact' | 'estimated' | 'none';
+    next_cursor?: (string | null);
 };
 
 export type UserUpdate = {
@@ -108,7 +150,9 @@ export type ValidationError = {
 };
 
 export type ItemsReadItemsData = {
+    cursor?: (string | null);
     limit?: number;
+    q?: (string | null);
     skip?: number;
 };
 
@@ -120,6 +164,38 @@ export type ItemsCreateItemData = {
 
 export type ItemsCreateItemResponse = (ItemPublic);
 
+export type ItemsExportItemsData = {
+    format?: 'ndjson' | 'csv';
+};
+
+export type ItemsExportItemsResponse = (unknown);
+
+export type ItemsReadItemChangesData = {
+    cursor?: (string | null);
+    limit?: number;
+    since?: (string | null);
+};
+
+export type ItemsReadItemChangesResponse = (ItemChanges);
+
+export type ItemsCreateItemsBulkData = {
+    requestBody: Array<ItemCreate>;
+};
+
+export type ItemsCreateItemsBulkResponse = (ItemsBulkPublic);
+
+export type ItemsDeleteItemsBulkData = {
+    requestBody: Array<string>;
+};
+
+export type ItemsDeleteItemsBulkResponse = (ItemsBulkDeleted);
+
+export type ItemsUpdateItemsBulkData = {
+    requestBody: Array<ItemBulkUpdate>;
+};
+
+export type ItemsUpdateItemsBulkResponse = (ItemsBulkPublic);
+
 export type ItemsReadItemData = {
     id: string;
 };
@@ -145,6 +221,14 @@ export type LoginLoginAccessTokenData = {
 
 export type LoginLoginAccessTokenResponse = (Token);
 
+export type LoginRefreshAccessTokenData = {
+    requestBody: RefreshTokenRequest;
+};
+
+export type LoginRefreshAccessTokenResponse = (Token);
+
+export type LoginLogoutResponse = (Message);
+
 export type LoginTestTokenResponse = (UserPublic);
 
 export type LoginRecoverPasswordData = {
@@ -172,6 +256,7 @@ export type PrivateCreateUserData = {
 export type PrivateCreateUserResponse = (UserPublic);
 
 export type UsersReadUsersData = {
+    cursor?: (string | null);
     limit?: number;
     skip?: number;
 };
@@ -206,6 +291,12 @@ export type UsersRegisterUserData = {
 
 export type UsersRegisterUserResponse = (UserPublic);
 
+export type UsersExportUsersData = {
+    format?: 'ndjson' | 'csv';
+};
+
+export type UsersExportUsersResponse = (unknown);
+
 export type UsersReadUserByIdData = {
     userId: string;
 };
@@ -231,4 +322,12 @@ export type UtilsTestEmailData = {
 
 export type UtilsTestEmailResponse = (Message);
 
+export type UtilsPasswordHashingStatsResponse = ({
+    [key: string]: (number);
+});
+
+export type UtilsDbPoolStatsResponse = ({
+    [key: string]: unknown;
+});
+
 export type UtilsHealthCheckResponse = (boolean);
\ No newline at end of file
@@ -43,6 +43,7 @@ const useAuth = () => {
       formData: data,
     })
     localStorage.setItem("access_token", response.access_token)
+    localStorage.setItem("refresh_token", response.refresh_token || "")
   }
 
   const loginMutation = useMutation({
@@ -53,8 +54,12 @@ const useAuth = () => {
     onError: handleError.bind(showErrorToast),
   })
 
-  const logout = () => {
+  const logout = async () => {
+    // End the session on the server too, logging out locally still works
+    // when that fails
+    await LoginService.logout().catch(() => {})
     localStorage.removeItem("access_token")
+    localStorage.removeItem("refresh_token")
     navigate({ to: "/login" })
   }
 
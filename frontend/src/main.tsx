@@ -7,20 +7,70 @@ import {
 import { createRouter, RouterProvider } from "@tanstack/react-router"
 import { StrictMode } from "react"
 import ReactDOM from "react-dom/client"
-import { ApiError, OpenAPI } from "./client"
+import { ApiError, LoginService, OpenAPI } from "./client"
 import { ThemeProvider } from "./components/theme-provider"
 import { Toaster } from "./components/ui/sonner"
 import "./index.css"
 import { routeTree } from "./routeTree.gen"
 
 OpenAPI.BASE = import.meta.env.VITE_API_URL
-OpenAPI.TOKEN = async () => {
+
+// Access tokens are short-lived, renew them with the refresh token shortly
+// before they expire
+const expiresSoon = (token: string) => {
+  try {
+    const payload = token.split(".")[1].replace(/-/g, "+").replace(/_/g, "/")
+    return JSON.parse(atob(payload)).exp * 1000 - Date.now() < 60_000
+  } catch {
+    return false
+  }
+}
+
+const refreshTokens = async () => {
+  // Another tab may have refreshed while this one waited for the lock
+  if (!expiresSoon(localStorage.getItem("access_token") || "")) {
+    return
+  }
+  const refreshToken = localStorage.getItem("refresh_token")
+  if (!refreshToken) {
+    return
+  }
+  try {
+    const response = await LoginService.refreshAccessToken({
+      requestBody: { refresh_token: refreshToken },
+    })
+    localStorage.setItem("access_token", response.access_token)
+    localStorage.setItem("refresh_token", response.refresh_token || "")
+  } catch {
+    // The session ended, the request fails and handleApiError logs out
+  }
+}
+
+let refreshing: Promise<void> | null = null
+
+OpenAPI.TOKEN = async ({ url }) => {
+  const token = localStorage.getItem("access_token") || ""
+  if (url === "/api/v1/login/refresh-token" || !expiresSoon(token)) {
+    return token
+  }
+  // A refresh token works only once and every tab reads it from localStorage:
+  // concurrent requests share one refresh, and tabs take turns with a lock
+  if (!refreshing) {
+    const refresh = navigator.locks
+      ? navigator.locks.request("refresh_tokens", refreshTokens)
+      : refreshTokens()
+    refreshing = refresh.finally(() => {
+      refreshing = null
+    })
+  }
+  await refreshing
   return localStorage.getItem("access_token") || ""
 }
 
 const handleApiError = (error: Error) => {
   if (error instanceof ApiError && [401, 403].includes(error.status)) {
     localStorage.removeItem("access_token")
+    localStorage.removeItem("refresh_token")
     window.location.href = "/login"
   }
 }